@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+API Gateway - SDV Testbench
+Accès partagé à l'API Kubernetes pour l'orchestrateur : pool de connexions
+dimensionné, keep-alive TCP, délai maximal par requête et reprise des
+erreurs transitoires (429, 5xx, coupures réseau) avec attente exponentielle
+aléatoire, ainsi que des conflits (409) sur les patchs. Un create n'est
+repris que sur 429 (refusé avant traitement). Un appel en échec
+est ainsi repris dans le cycle au lieu d'attendre la réconciliation
+suivante.
+"""
+
+import time
+import socket
+import random
+import logging
+import functools
+
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError
+
+from telemetry import API_VERBS
+
+logger = logging.getLogger(__name__)
+
+# Statuts repris: limitation de débit et erreurs serveur
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Verbes non idempotents: après un 5xx ou une coupure, la requête a pu être
+# appliquée et une reprise reviendrait en 409 AlreadyExists
+NON_IDEMPOTENT_VERBS = frozenset({'create'})
+
+# Keep-alive TCP: connexions mortes détectées en ~30 s (options Linux si disponibles)
+KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 15), ('TCP_KEEPINTVL', 5), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+]
+
+def create_api_client(pool_maxsize=8, keepalive=True, configuration=None):
+    """ApiClient depuis le kubeconfig (ou ``configuration``), avec un pool de
+    ``pool_maxsize`` connexions par hôte et le keep-alive TCP"""
+    if configuration is None:
+        config.load_kube_config()
+        configuration = client.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = pool_maxsize
+    api_client = client.ApiClient(configuration)
+    if keepalive:
+        # Appliqué aux pools créés par urllib3 pour chaque hôte
+        pool_kw = api_client.rest_client.pool_manager.connection_pool_kw
+        pool_kw['socket_options'] = HTTPConnection.default_socket_options + KEEPALIVE_OPTIONS
+    return api_client
+
+class GatewayApi:
+    """Proxy d'une API Kubernetes dont les appels passent par ``ApiGateway.call``.
+
+    Les appels ``watch=True`` sont transmis tels quels (flux longs, repris
+    par le cache informer).
+    """
+
+    def __init__(self, api, gateway):
+        self._api = api
+        self._gateway = gateway
+
+    def __getattr__(self, name):
+        attribute = getattr(self._api, name)
+        verb = name.split('_', 1)[0]
+        if not callable(attribute) or verb not in API_VERBS:
+            return attribute
+
+        gateway = self._gateway
+
+        # wraps: watch.Watch lit le type de retour dans la docstring
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            if kwargs.get('watch'):
+                return attribute(*args, **kwargs)
+            return gateway.call(verb, attribute, *args, **kwargs)
+
+        setattr(self, name, call)
+        return call
+
+class ApiGateway:
+    """Politique d'appel commune: délai par requête et reprises bornées.
+
+    Une erreur transitoire est reprise jusqu'à ``max_attempts`` tentatives,
+    après une attente tirée uniformément dans [0, min(``backoff_cap``,
+    ``backoff_base`` × 2^n)] (ou l'en-tête Retry-After d'un 429), sans
+    dépasser ``max_elapsed`` secondes au total. Un 409 sur un patch est
+    repris ``conflict_retries`` fois. Un create n'est repris que sur 429.
+    Les autres erreurs (404, 409 d'un create, 5xx ou coupure d'un
+    create...) remontent immédiatement à l'appelant.
+    """
+
+    def __init__(self, request_timeout=(3.05, 10), max_attempts=4, backoff_base=0.1, backoff_cap=2.0,
+                 max_elapsed=5.0, conflict_retries=3, telemetry=None, sleep=time.sleep, seed=None):
+        self.request_timeout = request_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_elapsed = max_elapsed
+        self.conflict_retries = conflict_retries
+        self.telemetry = telemetry
+        self.sleep = sleep
+        self.retries = {}  # (verbe, cause) -> nombre de reprises
+        self._rng = random.Random(seed)
+
+    def wrap(self, api):
+        return GatewayApi(api, self)
+
+    def _reason(self, verb, error):
+        """Cause de reprise d'une erreur, ou None si elle n'est pas reprise"""
+        if verb in NON_IDEMPOTENT_VERBS:
+            # Seul un 429 garantit que la requête n'a pas été traitée
+            if isinstance(error, ApiException) and error.status == 429:
+                return '429'
+            return None
+        if isinstance(error, ApiException):
+            if error.status in RETRYABLE_STATUS:
+                return str(error.status)
+            if error.status == 409 and verb == 'patch':
+                return 'conflict'
+            return None
+        if isinstance(error, HTTPError):
+            return 'network'
+        return None
+
+    def _delay(self, attempt, error):
+        """Attente avant la tentative suivante (Retry-After d'un 429 prioritaire)"""
+        if isinstance(error, ApiException) and error.status == 429 and error.headers:
+            retry_after = error.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def call(self, verb, func, *args, **kwargs):
+        if self.request_timeout is not None:
+            kwargs.setdefault('_request_timeout', self.request_timeout)
+
+        start_time = time.monotonic()
+        attempt = 0
+        conflicts = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except (ApiException, HTTPError) as e:
+                reason = self._reason(verb, e)
+                if reason is None:
+                    raise
+                if reason == 'conflict':
+                    conflicts += 1
+                    if conflicts > self.conflict_retries:
+                        raise
+                    delay = 0
+                else:
+                    attempt += 1
+                    if attempt >= self.max_attempts:
+                        raise
+                    delay = self._delay(attempt - 1, e)
+                if time.monotonic() - start_time + delay > self.max_elapsed:
+                    raise
+
+                self.retries[(verb, reason)] = self.retries.get((verb, reason), 0) + 1
+                if self.telemetry is not None:
+                    self.telemetry.k8s_api_retries.labels(verb, reason).inc()
+                logger.warning(f" Appel {func.__name__} repris ({reason}), attente {delay * 1000:.0f} ms")
+                if delay:
+                    self.sleep(delay)
@@ -7,18 +7,30 @@ Nécessite un cluster Kubernetes activé (utiliser run_baseline_local.sh)
 
 import time
 import random
-import json
+import math
 import logging
 import threading
 import yaml
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from kubernetes import client, config
+from kubernetes import client
 from kubernetes.client.rest import ApiException
 import psutil
 import subprocess
 import os
 import sys
 
+import placement
+from metrics_provider import FakeMetricsProvider, MetricsProvider, create_metrics_provider
+from timeseries import MetricSeries
+from cluster_cache import ClusterStateCache, is_pod_ready
+from telemetry import Telemetry
+from api_gateway import ApiGateway, create_api_client
+from manifests import ManifestRenderer, ServerSideApply
+from state_predictor import MarkovPredictor
+from warm_pool import WarmPool, CRITICAL_APPS, ROLE_LABEL, ROLE_ACTIVE, ROLE_STANDBY
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,24 +44,51 @@ logger = logging.getLogger(__name__)
 
 class VehicleStateManager:
     """Initialise l'état avec "parking" avec un intervalle de changement d'état 
-    de 10 secondes"""
-    def __init__(self):
+    de 10 secondes. Les transitions suivent la chaîne de Markov de
+    vehicle_simulator (voir state_predictor.py). ``clock`` date les
+    changements d'état (horloge virtuelle en simulation)"""
+    def __init__(self, predictor=None, clock=time.time):
         self.states = ['driving', 'parking', 'charging', 'emergency']
         self.current_state = 'parking'
         self.state_change_interval = 10  # secondes
         self.running = True
+        self.listeners = []  # Callbacks pour les changements d'état
+        self.predictor = predictor or MarkovPredictor(change_interval=self.state_change_interval)
+        self.parameters = None  # Paramètres véhicule relayés par VehicleSimulator, s'il y en a
+        self.clock = clock
+        self.last_change = clock()
+
+    """Ajoute un callback appelé lors des changements d'état (même signature
+    que VehicleSimulator.add_state_listener, sans paramètres véhicule)"""
+    def add_state_listener(self, callback):
+        self.listeners.append(callback)
+    
+    """Notifie tous les listeners d'un changement d'état"""
+    def _notify_listeners(self, old_state, new_state):
+        for callback in self.listeners:
+            try:
+                callback(old_state, new_state, None)
+            except Exception as e:
+                logger.error(f"Erreur dans listener: {e}")
 
     """Retourne l'état actuel du véhicule"""
     def get_current_state(self):
         return self.current_state
     
-    """Change l'état du véhicule de manière aléatoire"""
+    """Change l'état du véhicule selon les probabilités de transition"""
     def change_state_randomly(self):
+        probabilities = self.predictor.next_state_probabilities(self.current_state, self.parameters)
+        return self.set_state(random.choices(list(probabilities), weights=list(probabilities.values()))[0])
+    
+    """Impose l'état du véhicule (scénarios rejoués, banc de mesure) et notifie les listeners"""
+    def set_state(self, new_state):
         old_state = self.current_state
-        self.current_state = random.choice(self.states)
-        if old_state != self.current_state:
-            logger.info(f" État véhicule changé: {old_state} → {self.current_state}")
-        return self.current_state
+        self.current_state = new_state
+        if old_state != new_state:
+            self.last_change = self.clock()
+            logger.info(f" État véhicule changé: {old_state} → {new_state}")
+            self._notify_listeners(old_state, new_state)
+        return new_state
     
     """Démarre le monitoring d'état en arrière-plan"""
     def start_state_monitor(self):
@@ -67,46 +106,150 @@ class VehicleStateManager:
 """Moniteur de ressources pour les nœuds du cluster"""
 class ResourceMonitor:
     
+    # Valeurs prudentes si un nœud est absent du relevé
+    DEFAULT_RESOURCES = {'cpu_available': 50, 'memory_available': 50, 'network_bandwidth': 5}
     
-    def __init__(self):
-        self.nodes_resources = {}
+    def __init__(self, provider=None):
+        self.provider = provider or FakeMetricsProvider()
         
-    """Récupère les ressources disponibles d'un nœud"""
+    """Récupère les ressources disponibles d'un nœud (relevé groupé en cache)"""
     def get_node_resources(self, node_name):
         
         try:
-            # Simulation des ressources (en production, utiliser metrics-server)
-            cpu_percent = random.uniform(20, 80)  # Simulation CPU usage
-            memory_percent = random.uniform(30, 70)  # Simulation memory usage
-            
-            return {
-                'cpu_available': 100 - cpu_percent,
-                'memory_available': 100 - memory_percent,
-                'network_bandwidth': random.uniform(5, 10)  # Mbps disponible
-            }
+            resources = self.provider.get_node_resources(node_name)
+            if resources is None:
+                logger.warning(f"Nœud {node_name} absent du relevé de métriques")
+                return dict(self.DEFAULT_RESOURCES)
+            return resources
         except Exception as e:
             logger.error(f"Erreur récupération ressources {node_name}: {e}")
-            return {'cpu_available': 50, 'memory_available': 50, 'network_bandwidth': 5}
+            return dict(self.DEFAULT_RESOURCES)
     
     """Vérifie si un nœud peut héberger une application"""
     def check_resource_constraints(self, node_name, app_requirements):
         
         resources = self.get_node_resources(node_name)
-        
-        can_deploy = (
-            resources['cpu_available'] >= app_requirements.get('cpu', 10) and
-            resources['memory_available'] >= app_requirements.get('memory', 10) and
-            resources['network_bandwidth'] >= app_requirements.get('bandwidth', 1)
-        )
-        
-        return can_deploy, resources
+        return self.fits(resources, app_requirements), resources
+    
+    """Vérifie des ressources déjà relevées contre les besoins d'une application"""
+    @staticmethod
+    def fits(resources, app_requirements):
+        return placement.fits(resources, app_requirements)
+    
+    """Relève les ressources de plusieurs nœuds en une passe (un seul appel fournisseur)"""
+    def get_resources_snapshot(self, node_names):
+        return {node_name: self.get_node_resources(node_name) for node_name in node_names}
 
 """Gestionnaire des applications SDV"""
 class ApplicationManager:
     
+    # Pas de quantification des ressources (clé du cache de plans)
+    RESOURCE_QUANTUM = {'cpu_available': 5, 'memory_available': 5, 'network_bandwidth': 0.5}
+    PLAN_CACHE_SIZE = 64
+    
+    # Applications nécessaires selon l'état du véhicule
+    STATE_APPS = {
+        'driving': {
+            'safety': ['emergency-brake', 'collision-avoidance', 'lane-keeping', 
+                      'adaptive-cruise', 'driver-monitoring', 'traffic-sign-detection',
+                      'pedestrian-detection', 'vehicle-tracking'],
+            'comfort': ['climate-control', 'navigation-basic', 'voice-commands'],
+            'infotainment': ['music-streaming']
+        },
+        'parking': {
+            'safety': ['emergency-brake', 'driver-monitoring', 'emergency-call'],
+            'comfort': ['climate-control', 'seat-adjustment', 'lighting-control',
+                       'mirror-adjustment', 'parking-assist'],
+            'infotainment': ['media-player', 'social-media', 'web-browser', 'news-reader']
+        },
+        'charging': {
+            'safety': ['emergency-call', 'airbag-control'],
+            'comfort': ['climate-control', 'seat-adjustment', 'ambient-lighting', 'massage-seats'],
+            'infotainment': ['streaming-video', 'games-engine', 'video-calls', 'ar-navigation', 'weather-app']
+        },
+        'emergency': {
+            'safety': ['emergency-brake', 'collision-avoidance', 'driver-monitoring',
+                      'emergency-call', 'airbag-control'],
+            'comfort': [],
+            'infotainment': []
+        }
+    }
+    
     def __init__(self):
         self.apps_config = self._load_apps_configuration()
         self.deployed_apps = {}
+        self._plan_cache = OrderedDict()
+        self._plan_cache_lock = threading.Lock()  # Partagé entre véhicules en mode flotte
+        self._build_indexes()
+    
+    """Construit l'index nom → app et les candidats pré-triés par état"""
+    def _build_indexes(self):
+        self.apps_by_name = {app['name']: app for app in self.apps_config}
+        self.state_candidates = {
+            state: self._sorted_candidates(state) for state in self.STATE_APPS
+        }
+        self._plan_cache.clear()
+    
+    """Recharge le catalogue d'applications et invalide les plans en cache"""
+    def reload_catalog(self):
+        self.apps_config = self._load_apps_configuration()
+        self._build_indexes()
+    
+    """Liste (zone, app) requise pour un état, triée par Global UX Value"""
+    def _sorted_candidates(self, vehicle_state):
+        candidates = []
+        for zone, app_names in self.get_apps_for_state(vehicle_state).items():
+            for app_name in app_names:
+                app_config = self.apps_by_name.get(app_name)
+                if app_config:
+                    candidates.append((zone, app_config))
+        
+        # Sort by Global UX Value (lower is higher priority)
+        candidates.sort(key=lambda x: x[1]['global_ux_value'])
+        return candidates
+    
+    """Retourne les candidats pré-calculés d'un état (lookup O(1))"""
+    def get_candidates_for_state(self, vehicle_state):
+        candidates = self.state_candidates.get(vehicle_state)
+        if candidates is None:
+            candidates = self._sorted_candidates(vehicle_state)
+        return candidates
+    
+    """Quantifie un relevé de ressources (arrondi inférieur, donc prudent)"""
+    def quantize_resources(self, resources_snapshot):
+        quantized = {}
+        for node_name, resources in resources_snapshot.items():
+            quantized[node_name] = {
+                key: math.floor(value / self.RESOURCE_QUANTUM[key]) * self.RESOURCE_QUANTUM[key]
+                for key, value in resources.items() if key in self.RESOURCE_QUANTUM
+            }
+        return quantized
+    
+    """Clé de cache: (état, relevé de ressources quantifié)"""
+    @staticmethod
+    def plan_key(vehicle_state, quantized_snapshot):
+        return (vehicle_state, tuple(
+            (node_name, tuple(sorted(resources.items())))
+            for node_name, resources in sorted(quantized_snapshot.items())
+        ))
+    
+    def get_cached_plan(self, key):
+        with self._plan_cache_lock:
+            plan = self._plan_cache.get(key)
+            if plan is not None:
+                self._plan_cache.move_to_end(key)
+            return plan
+    
+    def store_plan(self, key, plan):
+        with self._plan_cache_lock:
+            self._plan_cache[key] = plan
+            self._plan_cache.move_to_end(key)
+            while len(self._plan_cache) > self.PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+    
+    def invalidate_plans(self):
+        with self._plan_cache_lock:
+            self._plan_cache.clear()
 
     """Charge la configuration des 30 applications"""   
     def _load_apps_configuration(self):
@@ -172,60 +315,198 @@ class ApplicationManager:
     
     def get_apps_for_state(self, vehicle_state):
         """Retourne les applications nécessaires selon l'état du véhicule"""
-        state_mapping = {
-            'driving': {
-                'safety': ['emergency-brake', 'collision-avoidance', 'lane-keeping', 
-                          'adaptive-cruise', 'driver-monitoring', 'traffic-sign-detection',
-                          'pedestrian-detection', 'vehicle-tracking'],
-                'comfort': ['climate-control', 'navigation-basic', 'voice-commands'],
-                'infotainment': ['music-streaming']
-            },
-            'parking': {
-                'safety': ['emergency-brake', 'driver-monitoring', 'emergency-call'],
-                'comfort': ['climate-control', 'seat-adjustment', 'lighting-control',
-                           'mirror-adjustment', 'parking-assist'],
-                'infotainment': ['media-player', 'social-media', 'web-browser', 'news-reader']
-            },
-            'charging': {
-                'safety': ['emergency-call', 'airbag-control'],
-                'comfort': ['climate-control', 'seat-adjustment', 'ambient-lighting', 'massage-seats'],
-                'infotainment': ['streaming-video', 'games-engine', 'video-calls', 'ar-navigation', 'weather-app']
-            },
-            'emergency': {
-                'safety': ['emergency-brake', 'collision-avoidance', 'driver-monitoring',
-                          'emergency-call', 'airbag-control'],
-                'comfort': [],
-                'infotainment': []
-            }
-        }
-        
-        return state_mapping.get(vehicle_state, {'safety': [], 'comfort': [], 'infotainment': []})
+        return self.STATE_APPS.get(vehicle_state, {'safety': [], 'comfort': [], 'infotainment': []})
 
 """Orchestrateur principal AXIL pour SDV"""
 class AXILOrchestrator:
    
     
-    def __init__(self):
-        self.vehicle_state_manager = VehicleStateManager()
-        self.resource_monitor = ResourceMonitor()
-        self.app_manager = ApplicationManager()
+    def __init__(self, apply_concurrency=4, cycle_interval=8, replan_debounce=0.2,
+                 placement_strategy='knapsack', metrics_provider='metrics-server', metrics_ttl=5.0,
+                 metrics_retention=3600, metrics_port=None,
+                 k8s_apps=None, k8s_core=None, custom_api=None, cluster_cache=None,
+                 namespace="default", app_manager=None, telemetry=None, warm_pool=None, predictor=None,
+                 cleanup_propagation=None, api_gateway=None, clock=time.time):
+        """Les clients Kubernetes et le cache peuvent être injectés (simulation
+        sans cluster, voir simulation.py; flotte, voir fleet.py); sinon ils
+        sont créés depuis le kubeconfig. ``metrics_provider`` est un nom de
+        fournisseur ou une instance de MetricsProvider, ``placement_strategy``
+        un nom ou une instance de PlacementStrategy. ``warm_pool`` active les
+        Deployments en attente (True ou une instance de WarmPool, voir
+        warm_pool.py), choisis par ``predictor`` (MarkovPredictor par défaut,
+        voir state_predictor.py). ``cleanup_propagation`` ('Background',
+        'Foreground' ou 'Orphan') est la politique de suppression des pods
+        lors du nettoyage (défaut du serveur si None). ``api_gateway``
+        (ApiGateway, voir api_gateway.py) fixe le délai des requêtes et la
+        reprise des erreurs transitoires. ``clock`` date les changements
+        d'état du véhicule (horloge virtuelle en simulation)."""
+        self.namespace = namespace
+        self.cleanup_propagation = cleanup_propagation
+        if predictor is None and isinstance(warm_pool, WarmPool):
+            predictor = warm_pool.predictor
+        self.predictor = predictor or MarkovPredictor(history_capacity=metrics_retention)
+        self.vehicle_state_manager = VehicleStateManager(self.predictor, clock)
+        self.app_manager = app_manager or ApplicationManager()
+        if isinstance(placement_strategy, placement.PlacementStrategy):
+            self.placement = placement_strategy
+        else:
+            self.placement = placement.get_strategy(placement_strategy)
+        if warm_pool is True:
+            warm_pool = WarmPool(self.app_manager, self.predictor)
+        self.warm_pool = warm_pool or None
         self.metrics = {
             'deployments': 0,
+            'unchanged': 0,
             'failures': 0,
-            'optimization_time': [],
-            'network_health': [],
-            'resource_usage': []
+            'optimization_time': MetricSeries(metrics_retention),
+            'network_health': MetricSeries(metrics_retention),
+            'resource_usage': MetricSeries(metrics_retention),
+            'transition_ready_time': MetricSeries(metrics_retention),
+            'critical_ready_time': MetricSeries(metrics_retention),
+            'cancelled': 0,
+            'activations': 0,
+            'cleaned': 0,
+            'cleanup_time': MetricSeries(metrics_retention)
         }
+        self._metrics_lock = threading.Lock()
+        
+        # Instrumentation Prometheus (no-op sans prometheus-client)
+        self.telemetry = telemetry or Telemetry()
+        if metrics_port is not None:
+            self.telemetry.serve(metrics_port)
+        
+        # Replanification événementielle sur changement d'état véhicule
+        self.cycle_interval = cycle_interval  # Réconciliation périodique de secours
+        self.replan_debounce = replan_debounce
+        self._replan_event = threading.Event()
+        self._state_generation = 0
+        self._transition_times = {}  # génération -> instant du changement d'état
+        self.vehicle_state_manager.add_state_listener(self._on_state_change)
+        
+        # Pool borné pour pousser le plan de déploiement en parallèle
+        # (apply_concurrency <= 1: application séquentielle dans le thread appelant)
+        self.apply_concurrency = apply_concurrency
+        self._apply_executor = None
+        if apply_concurrency > 1:
+            self._apply_executor = ThreadPoolExecutor(
+                max_workers=apply_concurrency,
+                thread_name_prefix="axil-apply"
+            )
         
         # Initialisation Kubernetes
-        try:
-            config.load_kube_config()
-            self.k8s_apps = client.AppsV1Api()
-            self.k8s_core = client.CoreV1Api()
-            logger.info(" Connexion Kubernetes établie")
-        except Exception as e:
-            logger.error(f" Erreur connexion Kubernetes: {e}")
-            sys.exit(1)
+        if k8s_apps is None or k8s_core is None:
+            try:
+                # Pool de connexions dimensionné pour les applications parallèles
+                api_client = create_api_client(pool_maxsize=max(apply_concurrency * 2, 4))
+                k8s_apps = client.AppsV1Api(api_client)
+                k8s_core = client.CoreV1Api(api_client)
+                custom_api = custom_api or client.CustomObjectsApi(api_client)
+                logger.info(" Connexion Kubernetes établie")
+            except Exception as e:
+                logger.error(f" Erreur connexion Kubernetes: {e}")
+                raise RuntimeError(f"Connexion Kubernetes impossible: {e}") from e
+        # Chaque tentative est mesurée, les reprises se font dans le cycle
+        self.api_gateway = api_gateway or ApiGateway(telemetry=self.telemetry)
+        self.k8s_apps = self.api_gateway.wrap(self.telemetry.instrument(k8s_apps))
+        self.k8s_core = self.api_gateway.wrap(self.telemetry.instrument(k8s_core))
+        
+        # Manifestes rendus depuis le template et appliqués en server-side apply
+        # (l'API simulée fournit son propre apply_namespaced_deployment)
+        self.manifests = ManifestRenderer(namespace)
+        if not hasattr(k8s_apps, 'apply_namespaced_deployment'):
+            k8s_apps = ServerSideApply(k8s_apps.api_client)
+        self.k8s_apply = self.api_gateway.wrap(self.telemetry.instrument(k8s_apps))
+        
+        # Métriques de nœuds: un relevé groupé par cycle, mis en cache (TTL)
+        if isinstance(metrics_provider, MetricsProvider):
+            provider = metrics_provider
+        else:
+            provider = create_metrics_provider(
+                metrics_provider, self.k8s_core,
+                self.api_gateway.wrap(self.telemetry.instrument(custom_api)) if custom_api is not None else None,
+                ttl=metrics_ttl
+            )
+        self.resource_monitor = ResourceMonitor(provider)
+        
+        # Cache informer partagé: statut et nettoyage sans aller-retour API
+        if cluster_cache is None:
+            cluster_cache = ClusterStateCache(self.k8s_core, self.k8s_apps, namespace=namespace)
+            cluster_cache.start()
+            if not cluster_cache.wait_for_sync(timeout=10):
+                logger.warning(" Cache cluster non synchronisé après 10s")
+        self.cluster_cache = cluster_cache
+    
+    def _on_state_change(self, old_state, new_state, parameters):
+        """Listener d'état: invalide le plan en cours et déclenche une replanification"""
+        self.predictor.record_transition(old_state, new_state, self.vehicle_state_manager.parameters)
+        with self._metrics_lock:
+            self._state_generation += 1
+            self._transition_times[self._state_generation] = time.time()
+        self._replan_event.set()
+    
+    def is_stale(self, generation):
+        """Vrai si un changement d'état a eu lieu depuis la génération donnée"""
+        return generation is not None and generation != self._state_generation
+    
+    def replan_requested(self):
+        """Vrai si un changement d'état attend sa replanification (ordonnanceur externe, voir fleet.py)"""
+        return self._replan_event.is_set()
+    
+    def acknowledge_replan(self):
+        """Consomme la demande de replanification avant de lancer le cycle"""
+        self._replan_event.clear()
+    
+    def plan_ready(self, app_names):
+        """Vrai si chaque application du plan a au moins un pod Ready (depuis le cache)"""
+        for app_name in app_names:
+            pods = self.cluster_cache.get_pods(namespace=self.namespace, app=app_name)
+            if not any(is_pod_ready(pod) for pod in pods):
+                return False
+        return True
+    
+    def record_transition_ready(self, ready_time, app_count, critical=False):
+        """Enregistre un délai changement d'état → plan Ready (ou ses seules applications critiques)"""
+        metric, histogram = ('critical_ready_time', self.telemetry.critical_ready_seconds) if critical else \
+            ('transition_ready_time', self.telemetry.transition_ready_seconds)
+        with self._metrics_lock:
+            self.metrics[metric].append(ready_time)
+        histogram.observe(ready_time)
+        logger.info(f" Transition → Ready{' (critiques)' if critical else ''}: {ready_time:.2f}s ({app_count} applications)")
+    
+    def critical_apps(self, app_names):
+        """Applications critiques d'un plan (emergency-brake, airbag-control)"""
+        critical = self.warm_pool.critical_apps if self.warm_pool is not None else CRITICAL_APPS
+        return [name for name in app_names if name in critical]
+    
+    def _track_transition_ready(self, generation, transition_time, app_names, critical=False):
+        """Mesure le délai changement d'état → tous les pods du plan Ready"""
+        def all_ready():
+            return self.is_stale(generation) or self.plan_ready(app_names)
+        
+        def tracker():
+            if not self.cluster_cache.wait_until(all_ready, timeout=120):
+                logger.warning(f" Pods non Ready 120s après le changement d'état (génération {generation})")
+                return
+            if self.is_stale(generation):
+                return
+            self.record_transition_ready(time.time() - transition_time, len(app_names), critical)
+        
+        threading.Thread(target=tracker, name=f"axil-ready-{generation}", daemon=True).start()
+    
+    def _track_app_starts(self, generation, transition_time, started):
+        """Mesure le délai transition → Ready de chaque application démarrée
+        (``started``: {application: True si activée depuis le pool d'attente})"""
+        pending = dict(started)
+        
+        def all_started():
+            for app_name in [name for name in pending if self.plan_ready([name])]:
+                self.predictor.record_start(pending.pop(app_name), time.time() - transition_time)
+            return self.is_stale(generation) or not pending
+        
+        def tracker():
+            self.cluster_cache.wait_until(all_started, timeout=120)
+        
+        threading.Thread(target=tracker, name=f"axil-starts-{generation}", daemon=True).start()
     
     """Algorithme d'optimisation des déploiements selon l'état du véhicule"""
     def optimize_deployments(self):
@@ -233,146 +514,184 @@ class AXILOrchestrator:
         start_time = time.time()
         
         current_state = self.vehicle_state_manager.get_current_state()
-        required_apps = self.app_manager.get_apps_for_state(current_state)
+        candidates = self.app_manager.get_candidates_for_state(current_state)
         
         logger.info(f"Optimisation pour état: {current_state}")
         
-        deployment_plan = {}
-        total_network_usage = 0
-        
-        # Planification par ordre de priorité
-        all_required_apps = []
-        for zone, app_names in required_apps.items():
-            for app_name in app_names:
-                app_config = next((app for app in self.app_manager.apps_config 
-                                 if app['name'] == app_name), None)
-                if app_config:
-                    all_required_apps.append((zone, app_config))
-        
-        # Sort by Global UX Value (lower is higher priority)
-        all_required_apps.sort(key=lambda x: x[1]['global_ux_value'])
-        
-        # Déploiement avec contraintes
-        for zone, app_config in all_required_apps:
-            node_name = f"node-{zone}"
-            
-            # Vérifier les contraintes réseau globales (10Mbps TAS limit)
-            if total_network_usage + app_config['bandwidth'] > 10:
-                logger.warning(f"App {app_config['name']} ignorée: limite réseau TAS atteinte")
-                continue
-            
-            # Vérifier les contraintes de ressources du nœud
-            can_deploy, resources = self.resource_monitor.check_resource_constraints(
-                node_name, app_config
-            )
-            
-            if can_deploy:
-                if zone not in deployment_plan:
-                    deployment_plan[zone] = []
-                deployment_plan[zone].append(app_config)
-                total_network_usage += app_config['bandwidth']
-                logger.info(f"✓ {app_config['name']} planifié sur {zone}")
-            else:
-                logger.warning(f"⚠️  {app_config['name']} rejeté: ressources insuffisantes sur {zone}")
+        # Un seul relevé par nœud, quantifié pour servir de clé de cache
+        node_names = sorted({f"node-{zone}" for zone, _ in candidates})
+        snapshot = self.app_manager.quantize_resources(
+            self.resource_monitor.get_resources_snapshot(node_names)
+        )
+        # Bande passante des applications critiques à garder démarrées, retirée du budget TAS
+        reserved = 0.0
+        if self.warm_pool is not None:
+            reserved = self.warm_pool.reserved_bandwidth(current_state, self.vehicle_state_manager.parameters)
+            self.telemetry.standby_reserved.set(reserved)
+        plan_key = self.app_manager.plan_key(current_state, snapshot) + (reserved,)
+        cached_plan = self.app_manager.get_cached_plan(plan_key)
+        
+        if cached_plan is not None:
+            deployment_plan, total_network_usage = cached_plan
+            logger.info(f" Plan en cache réutilisé pour {current_state}")
+        else:
+            deployment_plan, total_network_usage = self._solve_placement(candidates, snapshot, reserved)
+            self.app_manager.store_plan(plan_key, (deployment_plan, total_network_usage))
         
         optimization_time = time.time() - start_time
         self.metrics['optimization_time'].append(optimization_time)
+        self.telemetry.optimization_seconds.observe(optimization_time)
+        self.telemetry.observe_bandwidth(current_state, total_network_usage)
         
         logger.info(f" Temps d'optimisation: {optimization_time:.2f}s")
         logger.info(f" Utilisation réseau totale: {total_network_usage:.1f}/10.0 Mbps")
         
         return deployment_plan, total_network_usage
     
-    def deploy_applications(self, deployment_plan):
-        """Déploie les applications selon le plan d'optimisation"""
-        deployed_count = 0
+    def _solve_placement(self, candidates, snapshot, reserved_bandwidth=0.0):
+        """Calcule le plan avec la stratégie de placement configurée"""
+        result = self.placement.solve(candidates, snapshot, reserved_bandwidth)
+        deployment_plan = result['plan']
+        
+        placed = {app['name'] for apps in deployment_plan.values() for app in apps}
+        for zone, app_config in candidates:
+            if app_config['name'] in placed:
+                logger.info(f"✓ {app_config['name']} planifié sur {zone}")
+            else:
+                logger.warning(f"⚠️  {app_config['name']} non planifié (limite réseau TAS ou ressources sur {zone})")
         
+        logger.info(f" Placement {result['strategy']}: {result['placed']}/{len(candidates)} applications"
+                    f"{'' if result['optimal'] else ' (solution non prouvée optimale)'}")
+        return deployment_plan, result['network_usage']
+    
+    def deploy_applications(self, deployment_plan, generation=None):
+        """Déploie les applications selon le plan d'optimisation.
+
+        Réconciliation incrémentale : le plan désiré est comparé aux
+        Deployments existants via le label ``spec-hash``. Seules les
+        applications absentes ou modifiées donnent lieu à un appel d'écriture.
+        Les applications safety sont appliquées en premier, puis le reste du
+        plan, chaque vague étant poussée en parallèle sur le pool
+        ``apply_concurrency``. Si ``generation`` est fourni, les applications
+        pas encore appliquées sont annulées dès qu'un changement d'état rend
+        le plan obsolète. Retourne {application: action}.
+        """
+        live_hashes = self._get_live_spec_hashes()
+        
+        safety_wave = []
+        other_wave = []
         for zone, apps in deployment_plan.items():
             for app_config in apps:
-                try:
-                    if self._deploy_single_app(app_config, zone):
-                        deployed_count += 1
-                        self.metrics['deployments'] += 1
-                except Exception as e:
-                    logger.error(f"✗ Erreur déploiement {app_config['name']}: {e}")
-                    self.metrics['failures'] += 1
-        
-        logger.info(f" Applications déployées: {deployed_count}")
-        return deployed_count
-    
-    def _deploy_single_app(self, app_config, zone):
-        """Déploie une application sur un nœud spécifique"""
+                if app_config['category'] == 'safety':
+                    safety_wave.append((zone, app_config))
+                else:
+                    other_wave.append((zone, app_config))
+        
+        results = {}
+        for wave in (safety_wave, other_wave):
+            if self.is_stale(generation):
+                break
+            if self._apply_executor is None:
+                for zone, app_config in wave:
+                    results[app_config['name']] = self._apply_app(app_config, zone, live_hashes, generation)
+                continue
+            futures = {
+                self._apply_executor.submit(self._apply_app, app_config, zone, live_hashes, generation): app_config['name']
+                for zone, app_config in wave
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        deployed_count = sum(1 for action in results.values() if action in ('created', 'patched', 'activated'))
+        unchanged_count = sum(1 for action in results.values() if action == 'unchanged')
+        failed_count = sum(1 for action in results.values() if action is None)
+        
+        activated_count = sum(1 for action in results.values() if action == 'activated')
+        logger.info(f" Applications déployées: {deployed_count} (dont {activated_count} activées depuis "
+                    f"l'attente), inchangées: {unchanged_count}, échecs: {failed_count}")
+        if self.is_stale(generation):
+            logger.info(" Plan obsolète (changement d'état): application interrompue")
+        return results
+    
+    def _apply_app(self, app_config, zone, live_hashes, generation=None):
+        """Applique une application et met à jour les métriques (thread-safe)"""
+        if self.is_stale(generation):
+            with self._metrics_lock:
+                self.metrics['cancelled'] += 1
+            return 'cancelled'
+        
+        start_time = time.perf_counter()
+        try:
+            action = self._deploy_single_app(app_config, zone, live_hashes)
+        except Exception as e:
+            logger.error(f"✗ Erreur déploiement {app_config['name']}: {e}")
+            action = None
+        self.telemetry.apply_seconds.labels(app_config['name'], action or 'failed').observe(
+            time.perf_counter() - start_time
+        )
+        
+        with self._metrics_lock:
+            if action == 'unchanged':
+                self.metrics['unchanged'] += 1
+            elif action:
+                self.metrics['deployments'] += 1
+                if action == 'activated':
+                    self.metrics['activations'] += 1
+            else:
+                self.metrics['failures'] += 1
+        return action
+    
+    def _get_live_spec_hashes(self):
+        """Retourne {nom Deployment: spec-hash} pour les Deployments existants"""
+        live_hashes = {}
+        for deployment in self.cluster_cache.get_deployments(namespace=self.namespace):
+            labels = deployment.metadata.labels or {}
+            live_hashes[deployment.metadata.name] = labels.get('spec-hash')
+        return live_hashes
+    
+    def _render(self, app_config, zone, role=ROLE_ACTIVE, replicas=1):
+        """Manifeste rendu depuis le template (cache: ni rendu ni sérialisation
+        pour une application inchangée)"""
+        return self.manifests.render(app_config, zone, role=role, replicas=replicas)
+    
+    def _render_standby(self, app_config, zone, mode):
+        """Manifeste en attente: même template de pod que l'application active,
+        seuls le label de rôle et (mode ``scaled``) le nombre de réplicas changent"""
+        return self._render(app_config, zone, role=ROLE_STANDBY, replicas=0 if mode == 'scaled' else 1)
+    
+    def _deploy_single_app(self, app_config, zone, live_hashes):
+        """Réconcilie une application sur un nœud spécifique (server-side apply).
+
+        Retourne 'created', 'patched', 'activated', 'unchanged', ou None en cas d'erreur.
+        """
         app_name = app_config['name']
+        manifest = self._render(app_config, zone)
         
-        # Création du manifeste Kubernetes
-        deployment = client.V1Deployment(
-            metadata=client.V1ObjectMeta(
-                name=f"sdv-{app_name}",
-                namespace="default",
-                labels={
-                    "app": app_name,
-                    "zone": zone,
-                    "category": app_config['category'],
-                    "priority": str(app_config['priority'])
-                }
-            ),
-            spec=client.V1DeploymentSpec(
-                replicas=1,
-                selector=client.V1LabelSelector(
-                    match_labels={"app": app_name}
-                ),
-                template=client.V1PodTemplateSpec(
-                    metadata=client.V1ObjectMeta(
-                        labels={"app": app_name, "zone": zone}
-                    ),
-                    spec=client.V1PodSpec(
-                        node_selector={"zone": zone},
-                        containers=[
-                            client.V1Container(
-                                name=app_name,
-                                image="busybox:latest",
-                                command=["sh", "-c"],
-                                args=[f"while true; do echo '[{datetime.now()}] {app_name} running on {zone}'; sleep 5; done"],
-                                resources=client.V1ResourceRequirements(
-                                    requests={
-                                        "cpu": f"{app_config['cpu']}m",
-                                        "memory": f"{app_config['memory']}Mi"
-                                    },
-                                    limits={
-                                        "cpu": f"{app_config['cpu']*2}m",
-                                        "memory": f"{app_config['memory']*2}Mi"
-                                    }
-                                )
-                            )
-                        ]
-                    )
-                )
-            )
-        )
+        # Application déjà à jour: aucun appel d'écriture
+        if live_hashes.get(manifest.name) == manifest.spec_hash:
+            logger.debug(f" {app_name} inchangé sur {zone}")
+            return 'unchanged'
         
         try:
-            # Supprimer l'ancien déploiement s'il existe
-            try:
-                self.k8s_apps.delete_namespaced_deployment(
-                    name=f"sdv-{app_name}",
-                    namespace="default"
-                )
-                time.sleep(1)
-            except ApiException:
-                pass  # L'app n'existait pas
-            
-            # Créer le nouveau déploiement
-            self.k8s_apps.create_namespaced_deployment(
-                namespace="default",
-                body=deployment
+            self.k8s_apply.apply_namespaced_deployment(
+                name=manifest.name,
+                namespace=self.namespace,
+                body=manifest.body
             )
-            
-            logger.debug(f" {app_name} déployé sur {zone}")
-            return True
-            
         except ApiException as e:
             logger.error(f" Erreur K8s pour {app_name}: {e}")
-            return False
+            return None
+        
+        existed = manifest.name in live_hashes
+        live_hashes[manifest.name] = manifest.spec_hash
+        if self.warm_pool is not None and self.warm_pool.pop_standby(manifest.name):
+            logger.debug(f" {app_name} activé depuis l'attente sur {zone}")
+            return 'activated'
+        if existed:
+            logger.debug(f" {app_name} mis à jour sur {zone}")
+            return 'patched'
+        logger.debug(f" {app_name} déployé sur {zone}")
+        return 'created'
     
     def collect_metrics(self):
         """Collecte les métriques de performance"""
@@ -382,8 +701,8 @@ class AXILOrchestrator:
             self.metrics['network_health'].append(network_health)
             
             # Métriques de ressources
-            pods = self.k8s_core.list_pod_for_all_namespaces()
-            running_pods = len([p for p in pods.items if p.status.phase == "Running"])
+            pods = self.cluster_cache.get_pods(namespace=self.namespace)
+            running_pods = len([p for p in pods if p.status.phase == "Running"])
             resource_usage = min(100, (running_pods / 30) * 100)  # % d'utilisation
             self.metrics['resource_usage'].append(resource_usage)
             
@@ -392,10 +711,15 @@ class AXILOrchestrator:
         except Exception as e:
             logger.error(f"Erreur collecte métriques: {e}")
     
-    def cleanup_unused_apps(self):
-        """Nettoie les applications non nécessaires"""
+    def cleanup_unused_apps(self, standby=()):
+        """Nettoie les applications non nécessaires (hors ``standby``, candidats du pool d'attente).
+
+        L'ensemble à supprimer est calculé depuis le cache, puis supprimé en
+        un seul appel deletecollection par sélecteur de labels. Retourne le
+        nombre de Deployments supprimés.
+        """
         try:
-            deployments = self.k8s_apps.list_namespaced_deployment(namespace="default")
+            deployments = self.cluster_cache.get_deployments(namespace=self.namespace)
             current_state = self.vehicle_state_manager.get_current_state()
             required_apps = self.app_manager.get_apps_for_state(current_state)
             
@@ -404,31 +728,94 @@ class AXILOrchestrator:
             for app_list in required_apps.values():
                 all_required.extend(app_list)
             
-            cleaned = 0
-            for deployment in deployments.items:
-                if deployment.metadata.name.startswith("sdv-"):
-                    app_name = deployment.metadata.name[4:]  # Enlever "sdv-"
-                    if app_name not in all_required:
-                        self.k8s_apps.delete_namespaced_deployment(
-                            name=deployment.metadata.name,
-                            namespace="default"
-                        )
-                        cleaned += 1
-                        logger.info(f"  App {app_name} supprimée (non requise)")
+            # Les applications du pool d'attente sont rétrogradées, pas supprimées
+            all_required.extend(app_config['name'] for _, app_config, _, _ in standby)
             
-            if cleaned > 0:
-                logger.info(f" {cleaned} applications nettoyées")
+            stale_apps = sorted(
+                deployment.metadata.name[4:]  # Enlever "sdv-"
+                for deployment in deployments
+                if deployment.metadata.name.startswith("sdv-") and deployment.metadata.name[4:] not in all_required
+            )
+            if not stale_apps:
+                return 0
+            
+            # Un seul appel; le label axil-role, posé uniquement par le template,
+            # exclut les Deployments statiques (k8s-manifests) de même label app
+            start_time = time.perf_counter()
+            kwargs = {'propagation_policy': self.cleanup_propagation} if self.cleanup_propagation else {}
+            self.k8s_apps.delete_collection_namespaced_deployment(
+                namespace=self.namespace,
+                label_selector=f"app in ({','.join(stale_apps)}),{ROLE_LABEL}",
+                **kwargs
+            )
+            cleanup_time = time.perf_counter() - start_time
+            
+            if self.warm_pool is not None:
+                for app_name in stale_apps:
+                    self.warm_pool.forget(f"sdv-{app_name}")
+            with self._metrics_lock:
+                self.metrics['cleaned'] += len(stale_apps)
+                self.metrics['cleanup_time'].append(cleanup_time)
+            self.telemetry.cleanup_seconds.observe(cleanup_time)
+            
+            logger.info(f"  Apps supprimées (non requises): {', '.join(stale_apps)}")
+            logger.info(f" {len(stale_apps)} applications nettoyées en {cleanup_time * 1000:.1f} ms")
+            return len(stale_apps)
                 
         except Exception as e:
             logger.error(f"Erreur nettoyage: {e}")
+            return 0
+    
+    def standby_candidates(self, network_usage):
+        """Candidats du pool d'attente dans la marge TAS laissée par le plan courant"""
+        state_manager = self.vehicle_state_manager
+        current_state = state_manager.get_current_state()
+        predicted, expected_in = self.predictor.predict(
+            current_state, state_manager.parameters, state_manager.clock() - state_manager.last_change
+        )
+        bandwidth_budget = max(0.0, self.placement.bandwidth_limit - network_usage)
+        logger.info(f" Prédiction: {', '.join(f'{state} ({p:.0%})' for state, p in predicted)} "
+                    f"dans ~{expected_in:.0f}s, marge TAS {bandwidth_budget:.1f} Mbps")
+        return self.warm_pool.candidates(current_state, state_manager.parameters, bandwidth_budget)
+    
+    def maintain_warm_pool(self, standby, generation=None):
+        """Crée ou rétrograde les Deployments en attente (``standby_candidates``).
+
+        Comme le plan, le pool est réconcilié par spec-hash: un Deployment
+        déjà dans l'état d'attente voulu ne coûte aucun appel API.
+        """
+        live_hashes = self._get_live_spec_hashes()
+        prepared = 0
+        
+        for zone, app_config, mode, probability in standby:
+            if self.is_stale(generation):
+                break
+            manifest = self._render_standby(app_config, zone, mode)
+            
+            try:
+                if live_hashes.get(manifest.name) != manifest.spec_hash:
+                    self.k8s_apply.apply_namespaced_deployment(
+                        name=manifest.name,
+                        namespace=self.namespace,
+                        body=manifest.body
+                    )
+                    prepared += 1
+                    logger.debug(f" {app_config['name']} en attente ({mode}, p={probability:.2f})")
+                self.warm_pool.mark_standby(manifest.name, mode)
+            except ApiException as e:
+                logger.error(f" Erreur mise en attente de {app_config['name']}: {e}")
+        
+        if prepared:
+            logger.info(f" Pool d'attente: {prepared} applications préparées "
+                        f"({self.warm_pool.standby_count()} en attente)")
     
     def print_status(self):
         """Affiche le statut du système"""
         current_state = self.vehicle_state_manager.get_current_state()
         
         try:
-            pods = self.k8s_core.list_pod_for_all_namespaces()
-            running_pods = len([p for p in pods.items if p.status.phase == "Running" and p.metadata.name.startswith("sdv-")])
+            pods = self.cluster_cache.get_pods(namespace=self.namespace)
+            running_pods = len([p for p in pods if p.status.phase == "Running" and p.metadata.name.startswith("sdv-")])
             
             avg_opt_time = sum(self.metrics['optimization_time'][-5:]) / min(5, len(self.metrics['optimization_time'])) if self.metrics['optimization_time'] else 0
             
@@ -438,6 +825,8 @@ class AXILOrchestrator:
             print(f" Temps optimisation moyen: {avg_opt_time:.2f}s")
             print(f" Déploiements réussis: {self.metrics['deployments']}")
             print(f" Échecs: {self.metrics['failures']}")
+            if self.metrics['transition_ready_time']:
+                print(f" Transition → Ready: {self.metrics['transition_ready_time'][-1]:.2f}s")
             if self.metrics['network_health']:
                 print(f" Santé réseau: {self.metrics['network_health'][-1]:.1f}%")
             print(f"{'='*60}\n")
@@ -445,6 +834,73 @@ class AXILOrchestrator:
         except Exception as e:
             logger.error(f"Erreur affichage statut: {e}")
     
+    def run_cycle(self, cycle_number, track_ready=True):
+        """Un cycle d'orchestration: plan, application, nettoyage, métriques.
+
+        Retourne la génération traitée, l'instant du changement d'état (None
+        pour un cycle périodique), les applications qu'elle a démarrées
+        ({application: activée depuis le pool d'attente}), les applications
+        du plan, si le plan est devenu obsolète pendant l'application et la
+        durée du cycle. Avec
+        ``track_ready=False``, la mesure transition → Ready est laissée à
+        l'appelant (flotte, simulation).
+        """
+        cycle_start = time.perf_counter()
+        generation = self._state_generation
+        with self._metrics_lock:
+            transition_time = self._transition_times.pop(generation, None)
+            # Générations remplacées avant leur cycle: plus jamais traitées
+            for superseded in [g for g in self._transition_times if g < generation]:
+                del self._transition_times[superseded]
+        
+        trigger = "changement d'état" if transition_time is not None else "périodique"
+        logger.info(f"\n === CYCLE {cycle_number} ({trigger}) ===")
+        
+        # Optimisation et déploiement
+        deployment_plan, network_usage = self.optimize_deployments()
+        actions = self.deploy_applications(deployment_plan, generation)
+        app_names = [app['name'] for apps in deployment_plan.values() for app in apps]
+        
+        # Applications démarrées par la transition: depuis le pool d'attente ou à froid
+        started = {}
+        if transition_time is not None:
+            started = {
+                app_name: action == 'activated'
+                for app_name, action in actions.items() if action in ('created', 'activated')
+            }
+            if self.warm_pool is not None:
+                activated = sum(started.values())
+                self.predictor.record_prefetch(activated, len(started) - activated)
+        
+        stale = self.is_stale(generation)
+        if not stale:
+            if transition_time is not None and track_ready:
+                self._track_transition_ready(generation, transition_time, app_names)
+                self._track_transition_ready(generation, transition_time, self.critical_apps(app_names),
+                                             critical=True)
+                self._track_app_starts(generation, transition_time, started)
+            
+            # Nettoyage des apps non nécessaires, puis pré-création pour les
+            # prochains états probables
+            standby = self.standby_candidates(network_usage) if self.warm_pool is not None else ()
+            self.cleanup_unused_apps(standby)
+            if standby:
+                self.maintain_warm_pool(standby, generation)
+            
+            # Collecte des métriques
+            self.collect_metrics()
+        
+        duration = time.perf_counter() - cycle_start
+        self.telemetry.cycle_seconds.observe(duration)
+        return {
+            'generation': generation,
+            'transition_time': transition_time,
+            'started': started,
+            'app_names': app_names,
+            'stale': stale,
+            'duration': duration
+        }
+    
     def run(self):
         """Boucle principale AXIL - Test de 60 secondes avec changements toutes les 10s"""
         logger.info(" AXIL Orchestrator démarré - Test SDV de 60 secondes")
@@ -456,57 +912,93 @@ class AXILOrchestrator:
         test_duration = 60  # 60 secondes comme dans la thèse
         cycle_count = 0
         
+        # Premier cycle immédiat
+        self._replan_event.set()
+        
         try:
             while time.time() - start_time < test_duration:
-                cycle_count += 1
-                cycle_start = time.time()
+                # Attendre un changement d'état, ou la réconciliation périodique
+                remaining = test_duration - (time.time() - start_time)
+                triggered = self._replan_event.wait(timeout=max(0, min(self.cycle_interval, remaining)))
+                if time.time() - start_time >= test_duration:
+                    break
+                if triggered:
+                    # Anti-rebond: regrouper les changements d'état rapprochés
+                    time.sleep(self.replan_debounce)
+                    self._replan_event.clear()
                 
-                logger.info(f"\n === CYCLE {cycle_count} ===")
-                
-                # Optimisation et déploiement
-                deployment_plan, network_usage = self.optimize_deployments()
-                self.deploy_applications(deployment_plan)
-                
-                # Nettoyage des apps non nécessaires
-                self.cleanup_unused_apps()
-                
-                # Collecte des métriques
-                self.collect_metrics()
+                cycle_count += 1
+                cycle = self.run_cycle(cycle_count)
                 
                 # Affichage du statut
-                self.print_status()
-                
-                # Attendre le prochain cycle (environ 5-10 secondes)
-                cycle_time = time.time() - cycle_start
-                sleep_time = max(0, 8 - cycle_time)  # Cycle toutes les ~8 secondes
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                if not cycle['stale']:
+                    self.print_status()
             
         except KeyboardInterrupt:
             logger.info(" Arrêt demandé par l'utilisateur")
         
         finally:
             self.vehicle_state_manager.running = False
+            if self._apply_executor is not None:
+                self._apply_executor.shutdown(wait=True)
+            self.cluster_cache.stop()
             
-            # Rapport final
-            total_time = time.time() - start_time
-            logger.info(f"\n === RAPPORT FINAL SDV TESTBENCH ===")
-            logger.info(f" Durée totale: {total_time:.1f}s")
-            logger.info(f" Cycles exécutés: {cycle_count}")
-            logger.info(f" Déploiements totaux: {self.metrics['deployments']}")
-            logger.info(f" Échecs: {self.metrics['failures']}")
+            self.final_report(time.time() - start_time, cycle_count)
+    
+    def final_report(self, total_time, cycle_count):
+        """Journalise le rapport final (partagé avec la simulation sans cluster)"""
+        logger.info(f"\n === RAPPORT FINAL SDV TESTBENCH ===")
+        logger.info(f" Durée totale: {total_time:.1f}s")
+        logger.info(f" Cycles exécutés: {cycle_count}")
+        logger.info(f" Déploiements totaux: {self.metrics['deployments']}")
+        logger.info(f" Échecs: {self.metrics['failures']}")
+        if self.metrics['optimization_time']:
             logger.info(f" Temps optimisation moyen: {sum(self.metrics['optimization_time'])/len(self.metrics['optimization_time']):.2f}s")
-            
-            if self.metrics['network_health']:
-                avg_network = sum(self.metrics['network_health']) / len(self.metrics['network_health'])
-                logger.info(f" Santé réseau moyenne: {avg_network:.1f}%")
-            
-            logger.info("Test SDV terminé")
+        
+        if self.metrics['transition_ready_time']:
+            ready_times = self.metrics['transition_ready_time']
+            logger.info(f" Transition → Ready moyen: {sum(ready_times)/len(ready_times):.2f}s "
+                        f"(max {max(ready_times):.2f}s, {len(ready_times)} transitions)")
+        if self.metrics['critical_ready_time']:
+            critical_times = self.metrics['critical_ready_time']
+            logger.info(f" Transition → applications critiques Ready moyen: "
+                        f"{sum(critical_times)/len(critical_times):.2f}s (max {max(critical_times):.2f}s)")
+        prediction = self.predictor.report()
+        if prediction['prediction_accuracy'] is not None:
+            logger.info(f" Prédictions d'état justes: {prediction['prediction_accuracy']:.0%}")
+        if prediction['hit_rate'] is not None:
+            logger.info(f" Préchargement: {prediction['hit_rate']:.0%} de succès "
+                        f"({prediction['hits']}/{prediction['hits'] + prediction['misses']})")
+        if prediction['latency_saved'] is not None:
+            logger.info(f" Latence gagnée par le préchargement: {prediction['latency_saved_per_hit']:.2f}s "
+                        f"par activation ({prediction['latency_saved']:.1f}s au total)")
+        if self.warm_pool is not None:
+            logger.info(f" Activations depuis le pool d'attente: {self.metrics['activations']}")
+        if self.api_gateway.retries:
+            retries = ', '.join(f"{verb}/{reason}: {count}"
+                                for (verb, reason), count in sorted(self.api_gateway.retries.items()))
+            logger.info(f" Appels API repris: {retries}")
+        if self.metrics['cleanup_time']:
+            cleanup_times = self.metrics['cleanup_time']
+            logger.info(f" Nettoyage: {self.metrics['cleaned']} Deployments supprimés en {len(cleanup_times)} appels "
+                        f"({1000 * sum(cleanup_times) / len(cleanup_times):.1f} ms en moyenne)")
+        
+        if self.metrics['network_health']:
+            avg_network = sum(self.metrics['network_health']) / len(self.metrics['network_health'])
+            logger.info(f" Santé réseau moyenne: {avg_network:.1f}%")
+        
+        logger.info("Test SDV terminé")
 
 if __name__ == '__main__':
     print(" AXIL Orchestrator pour SDV Testbench")
     print("Basé sur la thèse - Test de 60 secondes avec changements d'état")
     print("Ctrl+C pour arrêter\n")
     
-    orchestrator = AXILOrchestrator()
+    try:
+        orchestrator = AXILOrchestrator(
+            metrics_port=int(os.environ.get('AXIL_METRICS_PORT', 8000)),
+            cleanup_propagation=os.environ.get('AXIL_CLEANUP_PROPAGATION')
+        )
+    except RuntimeError:
+        sys.exit(1)
     orchestrator.run()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Cluster State Cache - SDV Testbench
+Cache local de l'état du cluster (pods et Deployments) dans le style des
+informers Kubernetes : une liste initiale, puis application des événements
+watch avec reprise sur resourceVersion. Les requêtes de statut et de
+nettoyage de l'orchestrateur sont servies depuis la mémoire, sans aller-retour
+vers l'API server.
+"""
+
+import time
+import functools
+import logging
+import threading
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+class ClusterStateCache:
+    """Cache informer des pods et Deployments, indexé par namespace et labels.
+
+    Les pods sont suivis sur tous les namespaces; les Deployments sur
+    ``namespace``, ou sur tous les namespaces si ``namespace`` vaut None
+    (mode flotte, un namespace par véhicule).
+    """
+
+    INDEX_LABELS = ('app', 'zone', 'category')
+    KINDS = ('pods', 'deployments')
+
+    def __init__(self, k8s_core, k8s_apps, namespace="default",
+                 index_labels=INDEX_LABELS, watch_timeout=300):
+        self.k8s_core = k8s_core
+        self.k8s_apps = k8s_apps
+        self.namespace = namespace
+        self.index_labels = tuple(index_labels)
+        self.watch_timeout = watch_timeout
+        self.running = False
+
+        # Stockage: kind -> {(namespace, name): objet}
+        self._stores = {kind: {} for kind in self.KINDS}
+        # Index: kind -> label -> valeur -> {(namespace, name)}
+        self._indexes = {kind: {label: {} for label in self.index_labels} for kind in self.KINDS}
+        # Index: kind -> namespace -> {(namespace, name)}
+        self._namespaces = {kind: {} for kind in self.KINDS}
+        self._resource_versions = {kind: None for kind in self.KINDS}
+        self._synced = {kind: threading.Event() for kind in self.KINDS}
+
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._threads = []
+        self._watches = {}
+
+    def _list_func(self, kind):
+        """Fonction de liste/watch de l'API pour un type d'objet"""
+        if kind == 'pods':
+            return self.k8s_core.list_pod_for_all_namespaces
+        if self.namespace is None:
+            return self.k8s_apps.list_deployment_for_all_namespaces
+
+        # wraps: watch.Watch lit le type de retour dans la docstring de la fonction
+        @functools.wraps(self.k8s_apps.list_namespaced_deployment)
+        def list_deployments(**kwargs):
+            return self.k8s_apps.list_namespaced_deployment(namespace=self.namespace, **kwargs)
+        return list_deployments
+
+    def start(self):
+        """Démarre un thread informer par type d'objet"""
+        if self.running:
+            return
+        self.running = True
+        for kind in self.KINDS:
+            thread = threading.Thread(target=self._run_informer, args=(kind,),
+                                      name=f"axil-informer-{kind}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(" Cache d'état du cluster démarré (list + watch)")
+
+    def stop(self):
+        """Arrête les informers"""
+        self.running = False
+        for w in list(self._watches.values()):
+            w.stop()
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_sync(self, timeout=10):
+        """Attend la liste initiale de tous les types d'objets"""
+        deadline = time.time() + timeout
+        for event in self._synced.values():
+            if not event.wait(max(0, deadline - time.time())):
+                return False
+        return True
+
+    def has_synced(self):
+        """Indique si la liste initiale a été chargée pour tous les types"""
+        return all(event.is_set() for event in self._synced.values())
+
+    def _run_informer(self, kind):
+        """Boucle list + watch avec reprise sur resourceVersion"""
+        list_func = self._list_func(kind)
+        backoff = 1
+
+        while self.running:
+            try:
+                if self._resource_versions[kind] is None:
+                    self._relist(kind, list_func)
+
+                w = watch.Watch()
+                self._watches[kind] = w
+                for event in w.stream(list_func,
+                                      resource_version=self._resource_versions[kind],
+                                      timeout_seconds=self.watch_timeout,
+                                      allow_watch_bookmarks=True):
+                    if not self.running:
+                        w.stop()
+                        break
+
+                    event_type = event['type']
+                    obj = event['object']
+
+                    if event_type == 'ERROR':
+                        # resourceVersion expirée: il faut relister
+                        if isinstance(obj, dict) and obj.get('code') == 410:
+                            self._resource_versions[kind] = None
+                            break
+                        continue
+
+                    self._resource_versions[kind] = obj.metadata.resource_version
+                    if event_type != 'BOOKMARK':
+                        self.apply_event(kind, event_type, obj)
+
+                backoff = 1
+
+            except ApiException as e:
+                if e.status == 410:
+                    logger.info(f"Watch {kind}: resourceVersion expirée, nouvelle liste")
+                    self._resource_versions[kind] = None
+                else:
+                    logger.error(f"Erreur watch {kind}: {e}")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+            except Exception as e:
+                logger.error(f"Erreur informer {kind}: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _relist(self, kind, list_func):
+        """Liste complète et remplacement atomique du contenu du cache"""
+        response = list_func()
+        with self._changed:
+            self._stores[kind] = {}
+            self._indexes[kind] = {label: {} for label in self.index_labels}
+            self._namespaces[kind] = {}
+            for obj in response.items:
+                self._store_object(kind, obj)
+            self._resource_versions[kind] = response.metadata.resource_version
+            self._synced[kind].set()
+            self._changed.notify_all()
+        logger.debug(f"Cache {kind}: {len(response.items)} objets listés")
+
+    @staticmethod
+    def _key(obj):
+        return (obj.metadata.namespace, obj.metadata.name)
+
+    def _store_object(self, kind, obj):
+        key = self._key(obj)
+        self._remove_object(kind, key)
+        self._stores[kind][key] = obj
+        self._namespaces[kind].setdefault(key[0], set()).add(key)
+        labels = obj.metadata.labels or {}
+        for label in self.index_labels:
+            if label in labels:
+                self._indexes[kind][label].setdefault(labels[label], set()).add(key)
+
+    def _remove_object(self, kind, key):
+        old = self._stores[kind].pop(key, None)
+        if old is None:
+            return
+        keys = self._namespaces[kind].get(key[0])
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[kind][key[0]]
+        labels = old.metadata.labels or {}
+        for label in self.index_labels:
+            if label in labels:
+                keys = self._indexes[kind][label].get(labels[label])
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._indexes[kind][label][labels[label]]
+
+    def apply_event(self, kind, event_type, obj):
+        """Applique un événement watch (ADDED, MODIFIED, DELETED) au cache"""
+        with self._changed:
+            if event_type == 'DELETED':
+                self._remove_object(kind, self._key(obj))
+            else:
+                self._store_object(kind, obj)
+            self._changed.notify_all()
+
+    def _query(self, kind, namespace, selector):
+        """Sélectionne les objets via les index, puis filtre les labels restants"""
+        with self._lock:
+            store = self._stores[kind]
+            indexed = [(label, value) for label, value in selector.items() if label in self.index_labels]
+
+            keys = None
+            if namespace is not None:
+                keys = set(self._namespaces[kind].get(namespace, ()))
+            for label, value in indexed:
+                matches = self._indexes[kind][label].get(value, set())
+                keys = set(matches) if keys is None else keys & matches
+            candidates = list(store.values()) if keys is None else [store[key] for key in keys]
+
+        results = []
+        for obj in candidates:
+            labels = obj.metadata.labels or {}
+            if all(labels.get(label) == value for label, value in selector.items()):
+                results.append(obj)
+        return results
+
+    def get_pods(self, namespace=None, **selector):
+        """Retourne les pods correspondant aux labels (ex: app='emergency-brake')"""
+        return self._query('pods', namespace, selector)
+
+    def get_deployments(self, namespace=None, **selector):
+        """Retourne les Deployments correspondant aux labels"""
+        return self._query('deployments', namespace, selector)
+
+    def wait_until(self, predicate, timeout):
+        """Attend qu'un prédicat sur le cache devienne vrai (réveil à chaque événement)"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while not predicate():
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    return False
+                self._changed.wait(remaining)
+            return True
+
+def is_pod_ready(pod):
+    """Vrai si le pod est Running avec la condition Ready à True"""
+    if pod.status is None or pod.status.phase != "Running":
+        return False
+    for condition in pod.status.conditions or []:
+        if condition.type == "Ready":
+            return condition.status == "True"
+    return False
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Fleet Orchestrator - SDV Testbench
+Mode flotte : plusieurs véhicules virtuels orchestrés par un seul processus
+sur un même cluster k3s, un namespace par véhicule. Le cache informer, le
+pool de connexions API, le planificateur (catalogue, cache de plans,
+stratégie de placement) et le fournisseur de métriques sont partagés ; les
+cycles des véhicules sont exécutés sur un pool de threads borné.
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+import placement
+from api_gateway import ApiGateway, create_api_client
+from axil_complete import AXILOrchestrator, ApplicationManager
+from cluster_cache import ClusterStateCache
+from metrics_provider import FakeMetricsProvider, MetricsProvider, create_metrics_provider
+from telemetry import Telemetry
+from timeseries import MetricSeries
+from state_predictor import MarkovPredictor
+from warm_pool import WarmPool
+
+logger = logging.getLogger(__name__)
+
+# Historique de métriques par véhicule (valeurs par série): des centaines de
+# véhicules tiennent dans un processus sur une cible embarquée
+FLEET_METRICS_RETENTION = 300
+
+def percentile(values, q):
+    """Percentile simple (valeur de rang q) d'une liste triée"""
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+class FleetOrchestrator:
+    """Orchestration de ``vehicles`` véhicules, namespaces ``<prefix>-NNN``.
+
+    Chaque véhicule a son AXILOrchestrator (machine d'état, métriques,
+    génération de plan) configuré en application séquentielle : le
+    parallélisme vient du pool ``workers`` qui exécute les cycles des
+    véhicules. Un seul thread ordonnanceur déclenche les changements d'état
+    (décalés d'un véhicule à l'autre), les cycles et la mesure
+    transition → Ready de toute la flotte. ``metrics_retention`` borne
+    chaque série de métriques d'un véhicule (mémoire préallouée par
+    véhicule).
+    """
+
+    def __init__(self, vehicles=10, namespace_prefix='sdv-vehicle', workers=8, cycle_interval=8,
+                 state_change_interval=10, replan_debounce=0.2, tick=0.05,
+                 placement_strategy='knapsack', metrics_provider='metrics-server', metrics_ttl=5.0,
+                 metrics_port=None, k8s_apps=None, k8s_core=None, custom_api=None, cluster_cache=None,
+                 create_namespaces=True, on_tick=None, quiet=True, warm_pool=False,
+                 metrics_retention=FLEET_METRICS_RETENTION):
+        self.workers = workers
+        self.cycle_interval = cycle_interval
+        self.state_change_interval = state_change_interval
+        self.replan_debounce = replan_debounce
+        self.tick = tick
+        self.on_tick = on_tick
+
+        if quiet:
+            # Les journaux par cycle de centaines de véhicules noieraient la sortie
+            for name in ('axil_complete', 'placement'):
+                logging.getLogger(name).setLevel(logging.ERROR)
+
+        self.telemetry = Telemetry()
+        if metrics_port is not None:
+            self.telemetry.serve(metrics_port)
+        self.api_gateway = ApiGateway(telemetry=self.telemetry)
+
+        # Pool de connexions unique, dimensionné pour le pool de cycles
+        if k8s_apps is None or k8s_core is None:
+            try:
+                api_client = create_api_client(pool_maxsize=max(workers * 2, 4))
+            except Exception as e:
+                logger.error(f" Erreur connexion Kubernetes: {e}")
+                raise RuntimeError(f"Connexion Kubernetes impossible: {e}") from e
+            k8s_apps = client.AppsV1Api(api_client)
+            k8s_core = client.CoreV1Api(api_client)
+            custom_api = custom_api or client.CustomObjectsApi(api_client)
+
+        # Appels hors orchestrateurs mesurés et repris comme les leurs
+        gateway_core = self.api_gateway.wrap(self.telemetry.instrument(k8s_core))
+
+        # Un seul cache informer pour tous les namespaces
+        self._owns_cache = cluster_cache is None
+        if self._owns_cache:
+            cluster_cache = ClusterStateCache(gateway_core,
+                                              self.api_gateway.wrap(self.telemetry.instrument(k8s_apps)),
+                                              namespace=None)
+            cluster_cache.start()
+            if not cluster_cache.wait_for_sync(timeout=10):
+                logger.warning(" Cache cluster non synchronisé après 10s")
+        self.cluster_cache = cluster_cache
+
+        # Planificateur et métriques de nœuds partagés
+        if isinstance(metrics_provider, MetricsProvider):
+            provider = metrics_provider
+        else:
+            provider = create_metrics_provider(
+                metrics_provider, gateway_core,
+                self.api_gateway.wrap(self.telemetry.instrument(custom_api)) if custom_api else None,
+                ttl=metrics_ttl
+            )
+        app_manager = ApplicationManager()
+        strategy = placement.get_strategy(placement_strategy)
+
+        self.vehicles = {}
+        for index in range(vehicles):
+            namespace = f"{namespace_prefix}-{index:03d}"
+            if create_namespaces:
+                self._ensure_namespace(gateway_core, namespace)
+            self.vehicles[namespace] = AXILOrchestrator(
+                apply_concurrency=1,
+                cycle_interval=cycle_interval,
+                replan_debounce=replan_debounce,
+                placement_strategy=strategy,
+                metrics_provider=provider,
+                metrics_retention=metrics_retention,
+                k8s_apps=k8s_apps,
+                k8s_core=k8s_core,
+                cluster_cache=self.cluster_cache,
+                namespace=namespace,
+                app_manager=app_manager,
+                telemetry=self.telemetry,
+                api_gateway=self.api_gateway,
+                warm_pool=WarmPool(app_manager, MarkovPredictor(history_capacity=metrics_retention))
+                if warm_pool else None
+            )
+
+        self.cycle_times = {vehicle: MetricSeries(metrics_retention) for vehicle in self.vehicles}
+        self.cycle_counts = dict.fromkeys(self.vehicles, 0)
+        logger.info(f" Flotte de {vehicles} véhicules prête ({workers} workers, namespaces {namespace_prefix}-*)")
+
+    @staticmethod
+    def _ensure_namespace(k8s_core, namespace):
+        """Crée le namespace d'un véhicule s'il n'existe pas"""
+        try:
+            k8s_core.create_namespace(client.V1Namespace(
+                metadata=client.V1ObjectMeta(name=namespace, labels={'sdv-fleet': 'true'})
+            ))
+        except ApiException as e:
+            if e.status != 409:
+                raise
+
+    def run(self, duration=60):
+        """Exécute la flotte pendant ``duration`` secondes et retourne le rapport de débit"""
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="axil-fleet")
+        start = time.monotonic()
+        vehicle_count = len(self.vehicles)
+
+        # Changements d'état décalés pour étaler la charge
+        next_change = {
+            vehicle: start + self.state_change_interval * (i + 1) / vehicle_count
+            for i, vehicle in enumerate(self.vehicles)
+        }
+        next_reconcile = dict.fromkeys(self.vehicles, start)
+        triggered_at = {}
+        in_flight = {}
+        # véhicule -> (génération, instant de transition, applications, démarrages en attente de Ready)
+        pending_ready = {}
+        expired_transitions = 0
+
+        try:
+            while time.monotonic() - start < duration:
+                now = time.monotonic()
+                if self.on_tick is not None:
+                    self.on_tick()
+
+                for vehicle, orchestrator in self.vehicles.items():
+                    if now >= next_change[vehicle]:
+                        orchestrator.vehicle_state_manager.change_state_randomly()
+                        next_change[vehicle] += self.state_change_interval
+
+                    future = in_flight.get(vehicle)
+                    if future is not None:
+                        if not future.done():
+                            continue
+                        del in_flight[vehicle]
+                        cycle = future.result()
+                        self.cycle_times[vehicle].append(cycle['duration'])
+                        if cycle['transition_time'] is not None and not cycle['stale']:
+                            pending_ready[vehicle] = (cycle['generation'], cycle['transition_time'],
+                                                      cycle['app_names'], dict(cycle['started']))
+
+                    # Anti-rebond des changements d'état, puis réconciliation périodique
+                    if orchestrator.replan_requested():
+                        triggered_at.setdefault(vehicle, now)
+                        if now - triggered_at[vehicle] < self.replan_debounce:
+                            continue
+                        orchestrator.acknowledge_replan()
+                        del triggered_at[vehicle]
+                    elif now < next_reconcile[vehicle]:
+                        continue
+
+                    self.cycle_counts[vehicle] += 1
+                    next_reconcile[vehicle] = now + self.cycle_interval
+                    in_flight[vehicle] = executor.submit(orchestrator.run_cycle, self.cycle_counts[vehicle], False)
+
+                # Mesure transition → Ready de toute la flotte depuis le cache partagé
+                for vehicle, (generation, transition_time, app_names, started) in list(pending_ready.items()):
+                    orchestrator = self.vehicles[vehicle]
+                    if orchestrator.is_stale(generation):
+                        del pending_ready[vehicle]
+                        continue
+                    for app_name in [name for name in started if orchestrator.plan_ready([name])]:
+                        orchestrator.predictor.record_start(started.pop(app_name), time.time() - transition_time)
+                    if orchestrator.plan_ready(app_names):
+                        orchestrator.record_transition_ready(time.time() - transition_time, len(app_names))
+                        del pending_ready[vehicle]
+                    elif time.time() - transition_time > 120:
+                        expired_transitions += 1
+                        del pending_ready[vehicle]
+
+                time.sleep(self.tick)
+        except KeyboardInterrupt:
+            logger.info(" Arrêt demandé par l'utilisateur")
+        finally:
+            executor.shutdown(wait=True)
+            if self._owns_cache:
+                self.cluster_cache.stop()
+
+        report = self.throughput_report(time.monotonic() - start)
+        report['aggregate']['expired_transitions'] = expired_transitions
+        return report
+
+    def throughput_report(self, elapsed):
+        """Débit par véhicule et agrégé (cycles, applications réconciliées, écritures API)"""
+        per_vehicle = {}
+        all_cycle_times = []
+        totals = {'cycles': 0, 'applies': 0, 'writes': 0, 'failures': 0, 'transitions': 0}
+
+        for vehicle, orchestrator in self.vehicles.items():
+            metrics = orchestrator.metrics
+            cycle_times = sorted(self.cycle_times[vehicle])
+            all_cycle_times.extend(cycle_times)
+            ready_times = sorted(metrics['transition_ready_time'])
+            applies = metrics['deployments'] + metrics['unchanged'] + metrics['failures']
+
+            per_vehicle[vehicle] = {
+                'cycles': self.cycle_counts[vehicle],
+                'cycles_per_min': 60 * self.cycle_counts[vehicle] / elapsed,
+                'applies': applies,
+                'writes': metrics['deployments'],
+                'failures': metrics['failures'],
+                'cycle_ms_p50': 1000 * percentile(cycle_times, 0.5) if cycle_times else None,
+                'cycle_ms_p95': 1000 * percentile(cycle_times, 0.95) if cycle_times else None,
+                'transition_ready_p50': percentile(ready_times, 0.5),
+                'transitions_measured': len(ready_times)
+            }
+            totals['cycles'] += self.cycle_counts[vehicle]
+            totals['applies'] += applies
+            totals['writes'] += metrics['deployments']
+            totals['failures'] += metrics['failures']
+            totals['transitions'] += len(ready_times)
+
+        all_cycle_times.sort()
+        aggregate = {
+            'vehicles': len(self.vehicles),
+            'workers': self.workers,
+            'elapsed_seconds': elapsed,
+            'cycles_per_second': totals['cycles'] / elapsed,
+            'applies_per_second': totals['applies'] / elapsed,
+            'writes_per_second': totals['writes'] / elapsed,
+            'cycle_ms_p50': 1000 * percentile(all_cycle_times, 0.5) if all_cycle_times else None,
+            'cycle_ms_p95': 1000 * percentile(all_cycle_times, 0.95) if all_cycle_times else None,
+            'cycle_ms_max': 1000 * all_cycle_times[-1] if all_cycle_times else None,
+            'api_retries': sum(self.api_gateway.retries.values()),
+            **totals
+        }
+
+        logger.info(f"\n === RAPPORT FLOTTE ({len(self.vehicles)} véhicules, {elapsed:.1f}s) ===")
+        logger.info(f" Cycles: {totals['cycles']} ({aggregate['cycles_per_second']:.1f}/s), "
+                    f"applications réconciliées: {aggregate['applies_per_second']:.1f}/s, "
+                    f"écritures: {aggregate['writes_per_second']:.1f}/s")
+        if all_cycle_times:
+            logger.info(f" Durée de cycle p50/p95/max: {aggregate['cycle_ms_p50']:.1f}/"
+                        f"{aggregate['cycle_ms_p95']:.1f}/{aggregate['cycle_ms_max']:.1f} ms")
+        logger.info(f" Transitions → Ready mesurées: {totals['transitions']}, échecs: {totals['failures']}, "
+                    f"appels API repris: {aggregate['api_retries']}")
+
+        return {'aggregate': aggregate, 'vehicles': per_vehicle}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Orchestration AXIL d'une flotte de véhicules virtuels")
+    parser.add_argument('--vehicles', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--namespace-prefix', default='sdv-vehicle')
+    parser.add_argument('--strategy', default='knapsack', help="Stratégie de placement")
+    parser.add_argument('--metrics-port', type=int, help="Port de l'endpoint Prometheus /metrics")
+    parser.add_argument('--warm-pool', action='store_true', help="Deployments en attente (voir warm_pool.py)")
+    parser.add_argument('--metrics-retention', type=int, default=FLEET_METRICS_RETENTION,
+                        help="Valeurs conservées par série de métriques et par véhicule")
+    parser.add_argument('--fake-cluster', action='store_true',
+                        help="API Kubernetes en mémoire (mesure du débit de l'orchestrateur seul)")
+    parser.add_argument('--json', help="Fichier de sortie JSON du rapport")
+    args = parser.parse_args()
+
+    kwargs = {}
+    if args.fake_cluster:
+        from simulation import FakeKubernetesApi
+        # Horloge réelle: le module time fournit time()
+        api = FakeKubernetesApi(time, seed=42)
+        cache = ClusterStateCache(api, api, namespace=None)
+        api.attach_cache(cache)
+        kwargs = dict(k8s_apps=api, k8s_core=api, cluster_cache=cache, create_namespaces=False,
+                      metrics_provider=FakeMetricsProvider(seed=42),
+                      on_tick=lambda: api.advance(time.time()))
+
+    try:
+        fleet = FleetOrchestrator(vehicles=args.vehicles, workers=args.workers,
+                                  namespace_prefix=args.namespace_prefix,
+                                  placement_strategy=args.strategy,
+                                  metrics_port=args.metrics_port, warm_pool=args.warm_pool,
+                                  metrics_retention=args.metrics_retention, **kwargs)
+    except RuntimeError:
+        sys.exit(1)
+
+    report = fleet.run(args.duration)
+    print(json.dumps(report['aggregate'], indent=2))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRapport exporté: {args.json}", file=sys.stderr)
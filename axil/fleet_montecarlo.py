@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Fleet Monte Carlo - SDV Testbench
+Moteur Monte Carlo vectorisé (NumPy) des trajectoires d'état de
+VehicleSimulator : N véhicules × T pas d'une seconde simulés sous forme de
+tableaux, avec la matrice de transition et les ajustements contextuels
+(carburant, batterie, vitesse) du simulateur. Produit l'occupation des états,
+les taux de transition et la demande applicative résultante pour le
+dimensionnement de la flotte.
+"""
+
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from vehicle_simulator import (
+    STATE_CODES, TRANSITION_PROBABILITIES, VehicleState,
+    LOW_FUEL_LEVEL, LOW_BATTERY_LEVEL, CHARGING_BOOST, HIGH_SPEED, EMERGENCY_BOOST
+)
+
+DRIVING = STATE_CODES.index(VehicleState.DRIVING)
+PARKING = STATE_CODES.index(VehicleState.PARKING)
+CHARGING = STATE_CODES.index(VehicleState.CHARGING)
+EMERGENCY = STATE_CODES.index(VehicleState.EMERGENCY)
+
+DEMAND_COLUMNS = ('apps', 'cpu', 'memory', 'bandwidth')
+
+def transition_matrix(transition_probabilities=TRANSITION_PROBABILITIES):
+    """Matrice P[état, état suivant] dans l'ordre de STATE_CODES"""
+    matrix = np.zeros((len(STATE_CODES), len(STATE_CODES)))
+    for i, state in enumerate(STATE_CODES):
+        for next_state, probability in transition_probabilities[state].items():
+            matrix[i, STATE_CODES.index(next_state)] = probability
+    return matrix
+
+def state_demand_matrix(app_manager):
+    """Demande par état (lignes dans l'ordre de STATE_CODES, colonnes DEMAND_COLUMNS).
+
+    ``app_manager`` est un ApplicationManager: toutes les applications
+    requises par l'état sont comptées, avant arbitrage par le budget TAS.
+    """
+    demand = np.zeros((len(STATE_CODES), len(DEMAND_COLUMNS)))
+    for i, state in enumerate(STATE_CODES):
+        for zone, app_config in app_manager.get_candidates_for_state(state.value):
+            demand[i] += (1, app_config['cpu'], app_config['memory'], app_config['bandwidth'])
+    return demand
+
+class FleetMonteCarlo:
+    """Simulation vectorisée d'une flotte de VehicleSimulator.
+
+    Comme ``start_simulation``, un changement d'état est tiré toutes les
+    ``change_interval`` secondes (et au premier pas), les paramètres sont
+    mis à jour au changement d'état puis chaque seconde (consommation en
+    conduite, charge de la batterie). L'état étant constant entre deux
+    tirages, la boucle Python porte sur les tirages et non sur les pas.
+    """
+
+    def __init__(self, vehicles, change_interval=10, transition_probabilities=TRANSITION_PROBABILITIES,
+                 seed=None):
+        self.vehicles = vehicles
+        self.change_interval = change_interval
+        self.matrix = transition_matrix(transition_probabilities)
+        self.rng = np.random.default_rng(seed)
+
+    def _initial_parameters(self):
+        """Mêmes distributions que VehicleParameters"""
+        n = self.vehicles
+        state = np.full(n, PARKING, dtype=np.int8)
+        speed = np.zeros(n)
+        fuel = self.rng.uniform(20, 100, n)
+        battery = self.rng.uniform(40, 100, n)
+        return state, speed, fuel, battery
+
+    def _draw_next_states(self, state, speed, fuel, battery):
+        """Tirage vectorisé de _choose_next_state pour toute la flotte"""
+        probabilities = self.matrix[state]
+        probabilities[(fuel < LOW_FUEL_LEVEL) & (battery < LOW_BATTERY_LEVEL), CHARGING] *= CHARGING_BOOST
+        probabilities[speed > HIGH_SPEED, EMERGENCY] *= EMERGENCY_BOOST
+        cumulative = np.cumsum(probabilities, axis=1)
+        draws = self.rng.random(self.vehicles) * cumulative[:, -1]
+        next_state = (cumulative < draws[:, None]).sum(axis=1)
+        return np.minimum(next_state, len(STATE_CODES) - 1).astype(np.int8)
+
+    def _update_parameters_for_state(self, new_state, changed, speed, fuel, battery):
+        """Version vectorisée de VehicleSimulator._update_parameters_for_state"""
+        driving = changed & (new_state == DRIVING)
+        speed[driving] = self.rng.uniform(30, 120, driving.sum())
+        fuel[driving] = np.maximum(0, fuel[driving] - self.rng.uniform(0.1, 0.5, driving.sum()))
+
+        stopped = changed & ((new_state == PARKING) | (new_state == CHARGING))
+        speed[stopped] = 0
+
+        charging = changed & (new_state == CHARGING)
+        battery[charging] = np.minimum(100, battery[charging] + self.rng.uniform(1, 5, charging.sum()))
+
+        emergency = changed & (new_state == EMERGENCY)
+        speed[emergency] = self.rng.uniform(0, 1, emergency.sum()) * speed[emergency] * 0.3
+
+    def _update_continuous_parameters(self, state, speed, fuel, battery, seconds):
+        """``seconds`` pas de _update_continuous_parameters (état et vitesse constants)"""
+        driving = state == DRIVING
+        fuel[driving] = np.maximum(0, fuel[driving] - 0.01 * speed[driving] / 100 * seconds)
+
+        charging = np.flatnonzero(state == CHARGING)
+        if charging.size:
+            # Somme de ``seconds`` tirages uniformes, plafonnée (croissance monotone)
+            charge = self.rng.uniform(0.1, 0.3, (seconds, charging.size)).sum(axis=0)
+            battery[charging] = np.minimum(100, battery[charging] + charge)
+
+    def run(self, steps, demand=None):
+        """Simule ``steps`` secondes pour toute la flotte.
+
+        Retourne un dictionnaire de tableaux: ``occupancy`` (T × états,
+        véhicules par état à chaque pas), ``time_in_state`` (N × états,
+        secondes par véhicule), ``transitions`` (matrice des comptes de
+        transitions effectives) et, si ``demand`` (états × colonnes) est
+        fourni, ``demand`` (T × colonnes) la demande agrégée de la flotte.
+        """
+        start_time = time.perf_counter()
+        n = self.vehicles
+        states = len(STATE_CODES)
+        state, speed, fuel, battery = self._initial_parameters()
+
+        occupancy = np.empty((steps, states), dtype=np.int32)
+        time_in_state = np.zeros((n, states), dtype=np.int64)
+        transitions = np.zeros(states * states, dtype=np.int64)
+        rows = np.arange(n)
+
+        for epoch_start in range(0, steps, self.change_interval):
+            seconds = min(self.change_interval, steps - epoch_start)
+
+            next_state = self._draw_next_states(state, speed, fuel, battery)
+            changed = next_state != state
+            transitions += np.bincount(state[changed].astype(np.int64) * states + next_state[changed],
+                                       minlength=states * states)
+            self._update_parameters_for_state(next_state, changed, speed, fuel, battery)
+            state = next_state
+
+            occupancy[epoch_start:epoch_start + seconds] = np.bincount(state, minlength=states)
+            time_in_state[rows, state] += seconds
+            self._update_continuous_parameters(state, speed, fuel, battery, seconds)
+
+        elapsed = time.perf_counter() - start_time
+        result = {
+            'occupancy': occupancy,
+            'time_in_state': time_in_state,
+            'transitions': transitions.reshape(states, states),
+            'elapsed': elapsed,
+            'vehicle_steps_per_second': n * steps / elapsed if elapsed else float('inf')
+        }
+        if demand is not None:
+            result['demand'] = occupancy @ demand
+        return result
+
+def occupancy_histograms(time_in_state, bins=20):
+    """Distribution sur la flotte de la part du temps passée dans chaque état"""
+    fractions = time_in_state / time_in_state.sum(axis=1, keepdims=True)
+    edges = np.linspace(0, 1, bins + 1)
+    return {
+        state.value: np.histogram(fractions[:, i], bins=edges)[0]
+        for i, state in enumerate(STATE_CODES)
+    }, edges
+
+def summarize(result, steps, demand_columns=DEMAND_COLUMNS):
+    """Résumé sérialisable: occupation moyenne, taux de transition, demande"""
+    occupancy = result['occupancy']
+    vehicles = occupancy[0].sum()
+    transitions = result['transitions']
+    vehicle_hours = vehicles * steps / 3600
+
+    summary = {
+        'vehicles': int(vehicles),
+        'steps': steps,
+        'vehicle_steps_per_second': result['vehicle_steps_per_second'],
+        'mean_occupancy': {
+            state.value: float(occupancy[:, i].mean() / vehicles) for i, state in enumerate(STATE_CODES)
+        },
+        'transitions_per_vehicle_hour': float(transitions.sum() / vehicle_hours),
+        'transition_rates_per_vehicle_hour': {
+            f"{old.value}->{new.value}": float(transitions[i, j] / vehicle_hours)
+            for i, old in enumerate(STATE_CODES)
+            for j, new in enumerate(STATE_CODES) if i != j
+        }
+    }
+    if 'demand' in result:
+        demand = result['demand']
+        summary['fleet_demand'] = {
+            column: {
+                'mean': float(demand[:, k].mean()),
+                'p95': float(np.percentile(demand[:, k], 95)),
+                'max': float(demand[:, k].max())
+            }
+            for k, column in enumerate(demand_columns)
+        }
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Monte Carlo vectorisé des états d'une flotte de véhicules")
+    parser.add_argument('--vehicles', type=int, default=10000)
+    parser.add_argument('--steps', type=int, default=86400, help="Pas d'une seconde")
+    parser.add_argument('--change-interval', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Fichier de sortie JSON du résumé")
+    args = parser.parse_args()
+
+    # Catalogue AXIL pour la demande applicative par état
+    from axil_complete import ApplicationManager
+    demand = state_demand_matrix(ApplicationManager())
+
+    engine = FleetMonteCarlo(args.vehicles, args.change_interval, seed=args.seed)
+    result = engine.run(args.steps, demand)
+    summary = summarize(result, args.steps)
+    print(json.dumps(summary, indent=2))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nRésumé exporté: {args.json}", file=sys.stderr)
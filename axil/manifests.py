@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Manifests - SDV Testbench
+Chemin d'application déclaratif unique des Deployments AXIL : chaque
+application du catalogue (ApplicationManager) est rendue depuis le template
+templates/deployment.yaml, puis empreinte (label spec-hash) et sérialisée
+une seule fois ; le rendu est mis en cache. L'application sur le cluster
+se fait en server-side apply (gestionnaire de champs ``axil``) avec le corps
+déjà sérialisé.
+
+Usage autonome (catalogue complet, zone = catégorie) :
+    python3 manifests.py | kubectl apply --server-side --field-manager=axil -f -
+"""
+
+import os
+import json
+import string
+import hashlib
+import logging
+import argparse
+import threading
+from collections import namedtuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+FIELD_MANAGER = 'axil'
+APPLY_PATCH_CONTENT_TYPE = 'application/apply-patch+yaml'
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'deployment.yaml')
+
+# Manifeste rendu: nom du Deployment, empreinte et corps JSON (YAML valide) prêt à envoyer
+RenderedManifest = namedtuple('RenderedManifest', ['name', 'spec_hash', 'body'])
+
+def _substitute(node, values):
+    """Remplace les variables ``${...}`` de toutes les chaînes d'un document YAML chargé"""
+    if isinstance(node, str):
+        return string.Template(node).substitute(values)
+    if isinstance(node, dict):
+        return {key: _substitute(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_substitute(value, values) for value in node]
+    return node
+
+class ManifestRenderer:
+    """Rendu des Deployments d'un namespace depuis le template, avec cache.
+
+    La clé de cache couvre tout ce qui entre dans le manifeste (champs du
+    catalogue, zone, rôle, réplicas) : un rechargement du catalogue produit
+    de nouvelles entrées, une application inchangée n'est ni re-rendue ni
+    re-sérialisée.
+    """
+
+    def __init__(self, namespace='default', template_path=TEMPLATE_PATH):
+        self.namespace = namespace
+        with open(template_path) as f:
+            self.template = yaml.safe_load(f)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def render(self, app_config, zone, role='active', replicas=1):
+        key = (app_config['name'], app_config['category'], app_config['priority'],
+               app_config['cpu'], app_config['memory'], zone, role, replicas)
+        rendered = self._cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        manifest = _substitute(self.template, {
+            'app': app_config['name'],
+            'zone': zone,
+            'category': app_config['category'],
+            'priority': app_config['priority'],
+            'role': role,
+            'namespace': self.namespace,
+            'cpu_request': f"{app_config['cpu']}m",
+            'memory_request': f"{app_config['memory']}Mi",
+            'cpu_limit': f"{app_config['cpu'] * 2}m",
+            'memory_limit': f"{app_config['memory'] * 2}Mi"
+        })
+        manifest['spec']['replicas'] = replicas
+
+        # Empreinte du manifeste sans le label spec-hash, puis sérialisation unique
+        canonical = json.dumps(manifest, sort_keys=True, separators=(',', ':'))
+        spec_hash = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        manifest['metadata']['labels']['spec-hash'] = spec_hash
+        rendered = RenderedManifest(manifest['metadata']['name'], spec_hash,
+                                    json.dumps(manifest, separators=(',', ':')))
+
+        with self._lock:
+            self._cache[key] = rendered
+        return rendered
+
+    def cache_size(self):
+        with self._lock:
+            return len(self._cache)
+
+class ServerSideApply:
+    """Server-side apply des Deployments avec le client Kubernetes.
+
+    Le corps déjà sérialisé est envoyé tel quel (PATCH
+    application/apply-patch+yaml, ``force`` pour reprendre les champs d'un
+    autre gestionnaire) par ``ApiClient.param_serialize``/``call_api``
+    (kubernetes>=37) : ni modèle V1Deployment, ni re-sérialisation du
+    corps, ni désérialisation de la réponse.
+    """
+
+    def __init__(self, api_client, field_manager=FIELD_MANAGER, force=True):
+        self.api_client = api_client
+        self.field_manager = field_manager
+        self.force = force
+
+    def apply_namespaced_deployment(self, name, namespace, body, _request_timeout=None):
+        query_params = [('fieldManager', self.field_manager)]
+        if self.force:
+            query_params.append(('force', 'true'))
+        request = self.api_client.param_serialize(
+            'PATCH', '/apis/apps/v1/namespaces/{namespace}/deployments/{name}',
+            path_params={'name': name, 'namespace': namespace},
+            query_params=query_params,
+            header_params={'Accept': 'application/json', 'Content-Type': APPLY_PATCH_CONTENT_TYPE},
+            body=body,
+            auth_settings=['BearerToken']
+        )
+        response = self.api_client.call_api(*request, _request_timeout=_request_timeout)
+        response.read()
+        # Statut HTTP d'erreur levé en ApiException, corps de réponse ignoré
+        self.api_client.response_deserialize(response, {})
+
+if __name__ == '__main__':
+    from axil_complete import ApplicationManager
+
+    parser = argparse.ArgumentParser(description="Rendu des Deployments AXIL du catalogue (flux YAML)")
+    parser.add_argument('--namespace', default='default')
+    args = parser.parse_args()
+
+    renderer = ManifestRenderer(args.namespace)
+    documents = [
+        json.loads(renderer.render(app_config, app_config['category']).body)
+        for app_config in ApplicationManager().apps_config
+    ]
+    print(yaml.safe_dump_all(documents, sort_keys=False), end='')
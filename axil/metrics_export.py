@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Metrics Export - SDV Testbench
+Export incrémental des métriques : chaque échantillon est écrit au moment où
+il est produit, en JSON Lines ou en format colonnaire (Parquet si pyarrow est
+disponible, sinon blocs NumPy ``.npy``). Rotation des fichiers, vidage
+périodique sur disque et lecteur à mémoire mappée pour l'analyse des gros
+exports.
+"""
+
+import os
+import re
+import json
+import math
+import mmap
+import glob
+import time
+import logging
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+def _stream_filename(stream):
+    """Nom de flux utilisable dans un nom de fichier"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', stream)
+
+def _json_value(value):
+    """NaN n'existe pas en JSON: exporté comme null"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _float_value(value):
+    return float('nan') if value is None else float(value)
+
+class StreamingExporter:
+    """Interface commune des exporteurs incrémentaux.
+
+    ``write(stream, timestamp, values)`` ajoute un échantillon (valeurs
+    numériques) au flux ``stream``. Les données sont poussées sur disque au
+    plus tard toutes les ``flush_interval`` secondes (avec ``fsync`` si
+    demandé), ainsi qu'à ``flush()`` et ``close()``.
+    """
+
+    extension = None
+
+    def __init__(self, directory, prefix, flush_interval=1.0, fsync=True):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.samples_written = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def sink(self, stream):
+        """Callback pour ``RingSeries.attach``"""
+        return lambda timestamp, values: self.write(stream, timestamp, values)
+
+    def write(self, stream, timestamp, values):
+        with self._lock:
+            self._write(stream, timestamp, values)
+            self.samples_written += 1
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._close()
+
+    def _next_sequence(self, pattern):
+        """Reprend la numérotation après les fichiers existants (jamais d'écrasement)"""
+        sequences = [
+            int(match.group(1))
+            for path in glob.glob(os.path.join(self.directory, pattern))
+            for match in [re.search(r'-(\d{5})\.[a-z]+$', path)] if match
+        ]
+        return max(sequences, default=-1) + 1
+
+    def _write(self, stream, timestamp, values):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+class JsonLinesExporter(StreamingExporter):
+    """Un échantillon par ligne, dans des fichiers ``<prefix>-NNNNN.jsonl``.
+
+    Un fichier est fermé et un nouveau ouvert dès que ``rotate_bytes`` est
+    atteint. Après un arrêt brutal, seule la dernière ligne peut être
+    tronquée; le lecteur l'ignore.
+    """
+
+    extension = 'jsonl'
+
+    def __init__(self, directory, prefix, flush_interval=1.0, fsync=True, rotate_bytes=64 * 1024 * 1024):
+        super().__init__(directory, prefix, flush_interval, fsync)
+        self.rotate_bytes = rotate_bytes
+        self._sequence = self._next_sequence(f"{prefix}-*.jsonl")
+        self._file = None
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.prefix}-{self._sequence:05d}.jsonl")
+
+    def _write(self, stream, timestamp, values):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        record = {'stream': stream, 'timestamp': timestamp}
+        record.update((key, _json_value(value)) for key, value in values.items())
+        self._file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+
+        if self._file.tell() >= self.rotate_bytes:
+            self._flush()
+            self._close()
+            self._sequence += 1
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ColumnarExporter(StreamingExporter):
+    """Blocs colonnaires par flux: ``<prefix>-<flux>-NNNNN.parquet`` ou ``.npy``.
+
+    Les échantillons sont accumulés en mémoire (``array('d')``) puis écrits
+    en un bloc tous les ``chunk_rows`` échantillons ou à chaque vidage. Un
+    bloc est écrit dans un fichier temporaire puis renommé : après un arrêt
+    brutal, seuls les échantillons non encore vidés sont perdus. Chaque bloc
+    est un fichier, la rotation est donc implicite. Toutes les colonnes sont
+    stockées en float64.
+    """
+
+    def __init__(self, directory, prefix, flush_interval=5.0, fsync=True, chunk_rows=4096, backend=None):
+        super().__init__(directory, prefix, flush_interval, fsync)
+        if backend is None:
+            backend = 'parquet' if pq is not None else 'npy'
+        if backend == 'parquet' and pq is None:
+            raise ValueError("Export Parquet indisponible: pyarrow n'est pas installé")
+        if backend == 'npy' and np is None:
+            raise ValueError("Export .npy indisponible: numpy n'est pas installé")
+        if backend not in ('parquet', 'npy'):
+            raise ValueError(f"Format colonnaire inconnu: {backend}")
+        self.extension = backend
+        self.chunk_rows = chunk_rows
+        self._buffers = {}
+        self._sequences = {}
+
+    def _write(self, stream, timestamp, values):
+        buffer = self._buffers.get(stream)
+        if buffer is None:
+            columns = ('timestamp',) + tuple(values)
+            buffer = self._buffers[stream] = {column: array('d') for column in columns}
+        buffer['timestamp'].append(timestamp)
+        for column, column_values in buffer.items():
+            if column != 'timestamp':
+                column_values.append(_float_value(values.get(column)))
+
+        if len(buffer['timestamp']) >= self.chunk_rows:
+            self._write_chunk(stream, buffer)
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        for stream, buffer in self._buffers.items():
+            if buffer['timestamp']:
+                self._write_chunk(stream, buffer)
+
+    def _write_chunk(self, stream, buffer):
+        name = _stream_filename(stream)
+        if stream not in self._sequences:
+            self._sequences[stream] = self._next_sequence(f"{self.prefix}-{name}-*.{self.extension}")
+        path = os.path.join(self.directory, f"{self.prefix}-{name}-{self._sequences[stream]:05d}.{self.extension}")
+        temporary = path + '.tmp'
+
+        with open(temporary, 'wb') as f:
+            if self.extension == 'parquet':
+                table = pa.table({column: pa.array(values, pa.float64()) for column, values in buffer.items()})
+                pq.write_table(table, f)
+            else:
+                chunk = np.empty(len(buffer['timestamp']), dtype=[(column, 'f8') for column in buffer])
+                for column, values in buffer.items():
+                    chunk[column] = np.frombuffer(values, dtype='f8')
+                np.save(f, chunk)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+        self._sequences[stream] += 1
+        for values in buffer.values():
+            del values[:]
+
+def create_exporter(directory, prefix, fmt='jsonl', **kwargs):
+    """Instancie un exporteur: 'jsonl', 'columnar' (Parquet sinon .npy), 'parquet' ou 'npy'"""
+    if fmt == 'jsonl':
+        return JsonLinesExporter(directory, prefix, **kwargs)
+    if fmt == 'columnar':
+        return ColumnarExporter(directory, prefix, **kwargs)
+    if fmt in ('parquet', 'npy'):
+        return ColumnarExporter(directory, prefix, backend=fmt, **kwargs)
+    raise ValueError(f"Format d'export inconnu: {fmt}")
+
+def write_jsonl_snapshot(filename, records):
+    """Écrit des enregistrements un par un dans un fichier JSON Lines.
+
+    Le fichier est écrit sous un nom temporaire puis renommé: il est soit
+    complet, soit absent.
+    """
+    temporary = filename + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({key: _json_value(value) for key, value in record.items()},
+                               separators=(',', ':'), default=str) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+    return filename
+
+# Lecture des exports
+
+def iter_jsonl(path, stream=None):
+    """Parcourt un fichier JSON Lines via mmap (ligne tronquée finale ignorée)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b''):
+                if not line.endswith(b'\n'):
+                    break
+                record = json.loads(line)
+                if stream is None or record.get('stream') == stream:
+                    yield record
+
+def export_files(directory, prefix, stream=None):
+    """Fichiers d'un export, dans l'ordre d'écriture (JSON Lines, ou blocs d'un flux)"""
+    if stream is None:
+        pattern = re.compile(rf"{re.escape(prefix)}-\d{{5}}\.jsonl$")
+    else:
+        pattern = re.compile(rf"{re.escape(prefix)}-{re.escape(_stream_filename(stream))}-\d{{5}}\.(npy|parquet)$")
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if pattern.match(name))
+
+def iter_chunks(directory, prefix, stream):
+    """Blocs colonnaires d'un flux, en mémoire mappée: {colonne: tableau NumPy}"""
+    if np is None:
+        raise ValueError("Lecture colonnaire indisponible: numpy n'est pas installé")
+    for path in export_files(directory, prefix, stream):
+        if path.endswith('.npy'):
+            chunk = np.load(path, mmap_mode='r')
+            yield {column: chunk[column] for column in chunk.dtype.names}
+        elif path.endswith('.parquet'):
+            table = pq.read_table(path, memory_map=True)
+            yield {column: table.column(column).to_numpy() for column in table.column_names}
+
+def load_columns(directory, prefix, stream):
+    """Charge un flux complet en colonnes (blocs colonnaires ou JSON Lines)"""
+    columnar = export_files(directory, prefix, stream)
+    if columnar:
+        chunks = list(iter_chunks(directory, prefix, stream))
+        return {column: np.concatenate([chunk[column] for chunk in chunks]) for column in chunks[0]}
+
+    columns = {}
+    for path in export_files(directory, prefix):
+        for record in iter_jsonl(path, stream):
+            for column, value in record.items():
+                if column != 'stream':
+                    columns.setdefault(column, array('d')).append(_float_value(value))
+    return columns
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Metrics Provider - SDV Testbench
+Fournisseurs de métriques de nœuds pour l'orchestrateur AXIL : relevé de tous
+les nœuds en un seul appel par cycle, mis en cache avec une durée de validité
+(TTL). Backend metrics.k8s.io (équivalent `kubectl top nodes`) et backend
+simulé pour les tests locaux.
+"""
+
+import time
+import random
+import logging
+import threading
+from kubernetes.utils import parse_quantity
+
+logger = logging.getLogger(__name__)
+
+TAS_BANDWIDTH_LIMIT = 10  # Mbps
+
+class MetricsProvider:
+    """Interface commune: ``fetch_all`` relève tous les nœuds d'un coup.
+
+    Chaque nœud est décrit par ``cpu_available`` et ``memory_available``
+    (en % de l'allocatable) et ``network_bandwidth`` (Mbps disponibles).
+    """
+
+    def __init__(self, ttl=5.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock  # Horloge du TTL (horloge virtuelle en simulation)
+        self._cache = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def fetch_all(self):
+        raise NotImplementedError
+
+    def get_all_node_resources(self):
+        """Retourne le relevé de tous les nœuds, rafraîchi au plus une fois par TTL"""
+        with self._lock:
+            now = self.clock()
+            if self._fetched_at is None or now - self._fetched_at >= self.ttl:
+                try:
+                    self._cache = self.fetch_all()
+                except Exception as e:
+                    # On garde le dernier relevé connu plutôt que rien
+                    logger.error(f"Erreur relevé métriques nœuds ({type(self).__name__}): {e}")
+                self._fetched_at = now
+            return self._cache
+
+    def get_node_resources(self, node_name):
+        """Ressources d'un nœud depuis le relevé en cache (None si inconnu)"""
+        return self.get_all_node_resources().get(node_name)
+
+    def invalidate(self):
+        """Force un nouveau relevé au prochain accès"""
+        with self._lock:
+            self._fetched_at = None
+
+class MetricsServerProvider(MetricsProvider):
+    """Backend metrics.k8s.io: usage des nœuds rapporté à leur allocatable.
+
+    metrics-server n'expose pas le trafic réseau: la bande passante
+    disponible est celle du budget TAS.
+    """
+
+    def __init__(self, k8s_core, custom_api, ttl=5.0, network_bandwidth=TAS_BANDWIDTH_LIMIT):
+        super().__init__(ttl)
+        self.k8s_core = k8s_core
+        self.custom_api = custom_api
+        self.network_bandwidth = network_bandwidth
+        self._allocatable = {}
+
+    def _refresh_allocatable(self):
+        """Allocatable CPU (cœurs) et mémoire (octets) de chaque nœud"""
+        nodes = self.k8s_core.list_node()
+        self._allocatable = {
+            node.metadata.name: (
+                float(parse_quantity(node.status.allocatable['cpu'])),
+                float(parse_quantity(node.status.allocatable['memory']))
+            )
+            for node in nodes.items
+        }
+
+    def fetch_all(self):
+        usage = self.custom_api.list_cluster_custom_object('metrics.k8s.io', 'v1beta1', 'nodes')
+
+        names = [item['metadata']['name'] for item in usage.get('items', [])]
+        if any(name not in self._allocatable for name in names):
+            self._refresh_allocatable()
+
+        resources = {}
+        for item in usage.get('items', []):
+            name = item['metadata']['name']
+            if name not in self._allocatable:
+                continue
+            cpu_allocatable, memory_allocatable = self._allocatable[name]
+            cpu_used = float(parse_quantity(item['usage']['cpu']))
+            memory_used = float(parse_quantity(item['usage']['memory']))
+            resources[name] = {
+                'cpu_available': max(0.0, 100 - cpu_used / cpu_allocatable * 100),
+                'memory_available': max(0.0, 100 - memory_used / memory_allocatable * 100),
+                'network_bandwidth': self.network_bandwidth
+            }
+        return resources
+
+class FakeMetricsProvider(MetricsProvider):
+    """Backend simulé (valeurs aléatoires), pour les tests sans metrics-server"""
+
+    DEFAULT_NODES = ('orchestrator-node', 'node-safety', 'node-comfort', 'node-infotainment')
+
+    def __init__(self, node_names=DEFAULT_NODES, ttl=5.0, seed=None, clock=time.monotonic):
+        super().__init__(ttl, clock)
+        self.node_names = list(node_names)
+        self._rng = random.Random(seed)
+
+    def fetch_all(self):
+        resources = {}
+        for node_name in self.node_names:
+            cpu_percent = self._rng.uniform(20, 80)  # Simulation CPU usage
+            memory_percent = self._rng.uniform(30, 70)  # Simulation memory usage
+            resources[node_name] = {
+                'cpu_available': 100 - cpu_percent,
+                'memory_available': 100 - memory_percent,
+                'network_bandwidth': self._rng.uniform(5, 10)  # Mbps disponible
+            }
+        return resources
+
+def create_metrics_provider(name, k8s_core=None, custom_api=None, ttl=5.0):
+    """Instancie un fournisseur de métriques par son nom ('metrics-server' ou 'fake')"""
+    if name == 'metrics-server':
+        return MetricsServerProvider(k8s_core, custom_api, ttl=ttl)
+    if name == 'fake':
+        return FakeMetricsProvider(ttl=ttl)
+    raise ValueError(f"Fournisseur de métriques inconnu: {name}")
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Placement Engine - SDV Testbench
+Moteur de placement des applications sous le budget réseau TAS (10 Mbps).
+Stratégies interchangeables : glouton par priorité (comportement historique
+d'AXIL) et sac à dos exact (programmation dynamique, ou séparation et
+évaluation si les ressources des nœuds sont cumulées), toujours bornées par
+un budget de temps.
+"""
+
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+TAS_BANDWIDTH_LIMIT = 10  # Mbps
+
+def fits(resources, app_requirements):
+    """Vérifie des ressources relevées contre les besoins d'une application"""
+    return (
+        resources['cpu_available'] >= app_requirements.get('cpu', 10) and
+        resources['memory_available'] >= app_requirements.get('memory', 10) and
+        resources['network_bandwidth'] >= app_requirements.get('bandwidth', 1)
+    )
+
+def ux_weights(candidates):
+    """Poids UX lexicographiques par Global UX Value (plus bas = plus prioritaire).
+
+    Une application d'un rang donné vaut plus que toutes les applications
+    des rangs inférieurs réunies : maximiser la somme des poids revient à
+    servir d'abord les applications les plus prioritaires.
+    """
+    ranks = sorted({app['global_ux_value'] for _, app in candidates})
+    base = len(candidates) + 1
+    return {ux: base ** (len(ranks) - 1 - rank) for rank, ux in enumerate(ranks)}
+
+def _result(strategy, candidates, selected, solve_time, optimal):
+    """Construit le résultat commun à toutes les stratégies"""
+    weights = ux_weights(candidates)
+    deployment_plan = {}
+    network_usage = 0
+    score = 0
+    for index in sorted(selected):
+        zone, app_config = candidates[index]
+        deployment_plan.setdefault(zone, []).append(app_config)
+        network_usage += app_config['bandwidth']
+        score += weights[app_config['global_ux_value']]
+    return {
+        'strategy': strategy,
+        'plan': deployment_plan,
+        'network_usage': network_usage,
+        'score': score,
+        'placed': len(selected),
+        'solve_time': solve_time,
+        'optimal': optimal
+    }
+
+class PlacementStrategy:
+    """Interface d'une stratégie de placement.
+
+    ``candidates`` est une liste (zone, app) triée par Global UX Value,
+    ``snapshot`` un relevé {nœud: ressources disponibles}. Avec
+    ``cumulative=True`` les besoins CPU, mémoire et réseau des applications
+    placées sur un même nœud sont décomptés de ses ressources.
+    ``reserved_bandwidth`` (Mbps) est retiré du budget TAS avant le placement
+    (pods en attente démarrés, voir warm_pool.py).
+    """
+
+    name = 'base'
+
+    def __init__(self, cumulative=False, bandwidth_limit=TAS_BANDWIDTH_LIMIT):
+        self.cumulative = cumulative
+        self.bandwidth_limit = bandwidth_limit
+
+    def solve(self, candidates, snapshot, reserved_bandwidth=0.0):
+        raise NotImplementedError
+
+    def _limit(self, reserved_bandwidth):
+        return max(0.0, self.bandwidth_limit - reserved_bandwidth)
+
+    def _greedy_indexes(self, candidates, snapshot, bandwidth_limit):
+        """Sélection gloutonne dans l'ordre des candidats"""
+        remaining = {node: dict(resources) for node, resources in snapshot.items()}
+        selected = []
+        total_network_usage = 0
+        for index, (zone, app_config) in enumerate(candidates):
+            node_resources = remaining[f"node-{zone}"]
+            if total_network_usage + app_config['bandwidth'] > bandwidth_limit:
+                continue
+            if not fits(node_resources, app_config):
+                continue
+            selected.append(index)
+            total_network_usage += app_config['bandwidth']
+            if self.cumulative:
+                node_resources['cpu_available'] -= app_config.get('cpu', 10)
+                node_resources['memory_available'] -= app_config.get('memory', 10)
+                node_resources['network_bandwidth'] -= app_config.get('bandwidth', 1)
+        return selected
+
+class GreedyPlacement(PlacementStrategy):
+    """Glouton par priorité: ignore toute application qui dépasse le budget"""
+
+    name = 'greedy'
+
+    def solve(self, candidates, snapshot, reserved_bandwidth=0.0):
+        start_time = time.perf_counter()
+        selected = self._greedy_indexes(candidates, snapshot, self._limit(reserved_bandwidth))
+        return _result(self.name, candidates, selected, time.perf_counter() - start_time, False)
+
+class KnapsackPlacement(PlacementStrategy):
+    """Sac à dos exact sur le budget TAS, borné par ``time_budget`` secondes.
+
+    Sans cumul des ressources, les contraintes de nœud ne font que filtrer
+    les candidats et le problème est un sac à dos 0/1 sur la bande passante,
+    résolu par programmation dynamique (pas de ``resolution`` Mbps, besoins
+    arrondis au supérieur). Avec cumul, le problème est multidimensionnel et
+    résolu par séparation et évaluation, initialisée par la solution
+    gloutonne. Si le budget de temps est épuisé, la meilleure solution connue
+    est retournée (au pire la solution gloutonne). La recherche s'arrête à
+    ``1 - RESULT_MARGIN`` du budget, le reste couvrant la construction du
+    résultat.
+    """
+
+    name = 'knapsack'
+    RESULT_MARGIN = 0.1
+
+    def __init__(self, cumulative=False, bandwidth_limit=TAS_BANDWIDTH_LIMIT,
+                 time_budget=0.05, resolution=0.1):
+        super().__init__(cumulative, bandwidth_limit)
+        self.time_budget = time_budget
+        self.resolution = resolution
+
+    def solve(self, candidates, snapshot, reserved_bandwidth=0.0):
+        start_time = time.perf_counter()
+        deadline = start_time + self.time_budget * (1 - self.RESULT_MARGIN)
+        bandwidth_limit = self._limit(reserved_bandwidth)
+        if self.cumulative:
+            selected, optimal = self._branch_and_bound(candidates, snapshot, deadline, bandwidth_limit)
+        else:
+            selected, optimal = self._dynamic_programming(candidates, snapshot, deadline, bandwidth_limit)
+        return _result(self.name, candidates, selected, time.perf_counter() - start_time, optimal)
+
+    def _weight(self, app_config):
+        return math.ceil(app_config['bandwidth'] / self.resolution - 1e-9)
+
+    def _dynamic_programming(self, candidates, snapshot, deadline, bandwidth_limit):
+        capacity = int(math.floor(bandwidth_limit / self.resolution + 1e-9))
+        weights = ux_weights(candidates)
+
+        # Candidats faisables; au-delà de capacity // poids copies identiques
+        # (même valeur, même poids), les suivantes ne peuvent jamais servir
+        items = []
+        copies = {}
+        for index, (zone, app_config) in enumerate(candidates):
+            if not fits(snapshot[f"node-{zone}"], app_config):
+                continue
+            weight = self._weight(app_config)
+            if weight > capacity:
+                continue
+            value = weights[app_config['global_ux_value']]
+            group = (value, weight)
+            copies[group] = copies.get(group, 0) + 1
+            if weight > 0 and copies[group] > capacity // weight:
+                continue
+            items.append((index, weight, value))
+
+        best = [0] * (capacity + 1)
+        keep = []
+        for row, (index, weight, value) in enumerate(items):
+            if time.perf_counter() > deadline:
+                logger.warning(f"Budget de temps épuisé ({row}/{len(items)} candidats): solution gloutonne")
+                return self._greedy_indexes(candidates, snapshot, bandwidth_limit), False
+            taken = bytearray(capacity + 1)
+            for c in range(capacity, weight - 1, -1):
+                candidate_value = best[c - weight] + value
+                if candidate_value > best[c]:
+                    best[c] = candidate_value
+                    taken[c] = 1
+            keep.append(taken)
+
+        selected = []
+        c = capacity
+        for row in range(len(items) - 1, -1, -1):
+            if keep[row][c]:
+                index, weight, _ = items[row]
+                selected.append(index)
+                c -= weight
+        return selected, True
+
+    def _branch_and_bound(self, candidates, snapshot, deadline, bandwidth_limit):
+        weights = ux_weights(candidates)
+        items = [
+            (index, app_config, weights[app_config['global_ux_value']])
+            for index, (zone, app_config) in enumerate(candidates)
+            if fits(snapshot[f"node-{zone}"], app_config)
+        ]
+        # Ordre par densité de valeur pour la borne fractionnaire
+        items.sort(key=lambda item: item[2] / max(item[1]['bandwidth'], 1e-6), reverse=True)
+
+        incumbent = self._greedy_indexes(candidates, snapshot, bandwidth_limit)
+        best_value = sum(weights[candidates[i][1]['global_ux_value']] for i in incumbent)
+        best_selection = list(incumbent)
+
+        remaining = {node: dict(resources) for node, resources in snapshot.items()}
+        selection = []
+
+        def upper_bound(position, budget, value):
+            # Relaxation fractionnelle sur la bande passante seule
+            for _, app_config, item_value in items[position:]:
+                bandwidth = app_config['bandwidth']
+                if bandwidth <= budget:
+                    budget -= bandwidth
+                    value += item_value
+                else:
+                    return value + item_value * budget / bandwidth
+            return value
+
+        def take(node_resources, app_config, sign):
+            node_resources['cpu_available'] -= sign * app_config.get('cpu', 10)
+            node_resources['memory_available'] -= sign * app_config.get('memory', 10)
+            node_resources['network_bandwidth'] -= sign * app_config.get('bandwidth', 1)
+
+        # Parcours en profondeur itératif: (position, budget, valeur)
+        stack = [(0, bandwidth_limit, 0)]
+        explored = 0
+        timed_out = False
+        while stack:
+            position, budget, value = stack.pop()
+            if position < 0:
+                # Marqueur de retour arrière: libérer l'application incluse
+                index = selection.pop()
+                take(remaining[f"node-{candidates[index][0]}"], candidates[index][1], -1)
+                continue
+
+            # Chaque nœud coûte une borne en O(len(items)): échéance vérifiée à chaque nœud
+            explored += 1
+            if time.perf_counter() > deadline:
+                timed_out = True
+                break
+            if value > best_value:
+                best_value = value
+                best_selection = list(selection)
+            if position == len(items) or upper_bound(position, budget, value) <= best_value:
+                continue
+
+            index, app_config, item_value = items[position]
+            node_resources = remaining[f"node-{candidates[index][0]}"]
+            # Branche "exclure" empilée en premier: explorée après "inclure"
+            stack.append((position + 1, budget, value))
+            if app_config['bandwidth'] <= budget + 1e-9 and fits(node_resources, app_config):
+                take(node_resources, app_config, 1)
+                selection.append(index)
+                stack.append((-1, 0, 0))
+                stack.append((position + 1, budget - app_config['bandwidth'], value + item_value))
+
+        if timed_out:
+            logger.warning(f"Budget de temps épuisé après {explored} nœuds: meilleure solution connue")
+        return best_selection, not timed_out
+
+STRATEGIES = {
+    GreedyPlacement.name: GreedyPlacement,
+    KnapsackPlacement.name: KnapsackPlacement
+}
+
+def get_strategy(name, **kwargs):
+    """Instancie une stratégie de placement par son nom"""
+    if name not in STRATEGIES:
+        raise ValueError(f"Stratégie de placement inconnue: {name} (disponibles: {', '.join(STRATEGIES)})")
+    return STRATEGIES[name](**kwargs)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Placement Benchmark - SDV Testbench
+Compare les stratégies de placement (glouton vs sac à dos) en qualité de
+solution et en temps de résolution sur des catalogues synthétiques de 30, 300
+et 3000 applications, sous le budget TAS de 10 Mbps.
+"""
+
+import sys
+import json
+import random
+import logging
+import argparse
+import statistics
+
+from placement import GreedyPlacement, KnapsackPlacement
+
+# Même pondération UX que le catalogue AXIL
+UX_WEIGHTS = {'safety': 3.0, 'comfort': 2.0, 'infotainment': 1.0}
+PRIORITY_RANGES = {'safety': (1, 2), 'comfort': (3, 4), 'infotainment': (4, 5)}
+
+def generate_instance(app_count, rng):
+    """Génère des candidats triés par Global UX Value et un relevé de nœuds"""
+    candidates = []
+    for i in range(app_count):
+        category = rng.choice(list(UX_WEIGHTS))
+        priority = rng.randint(*PRIORITY_RANGES[category])
+        app = {
+            'name': f"{category}-app-{i}",
+            'priority': priority,
+            'cpu': rng.randint(3, 35),
+            'memory': rng.randint(5, 50),
+            'bandwidth': round(rng.uniform(0.1, 5.0), 1),
+            'category': category,
+            'global_ux_value': priority * UX_WEIGHTS[category]
+        }
+        candidates.append((category, app))
+    candidates.sort(key=lambda x: x[1]['global_ux_value'])
+
+    snapshot = {
+        f"node-{zone}": {
+            'cpu_available': rng.uniform(20, 80),
+            'memory_available': rng.uniform(30, 70),
+            'network_bandwidth': rng.uniform(5, 10)
+        }
+        for zone in UX_WEIGHTS
+    }
+    return candidates, snapshot
+
+def run_benchmark(sizes, repetitions, time_budget, seed):
+    """Exécute toutes les stratégies sur les mêmes instances"""
+    rng = random.Random(seed)
+    rows = []
+
+    for cumulative in (False, True):
+        strategies = [
+            GreedyPlacement(cumulative=cumulative),
+            KnapsackPlacement(cumulative=cumulative, time_budget=time_budget)
+        ]
+        for size in sizes:
+            results = {strategy.name: [] for strategy in strategies}
+            for _ in range(repetitions):
+                candidates, snapshot = generate_instance(size, rng)
+                for strategy in strategies:
+                    results[strategy.name].append(strategy.solve(candidates, snapshot))
+
+            greedy_scores = [r['score'] for r in results['greedy']]
+            for name, runs in results.items():
+                solve_times = sorted(r['solve_time'] * 1000 for r in runs)
+                rows.append({
+                    'apps': size,
+                    'cumulative': cumulative,
+                    'strategy': name,
+                    'better_than_greedy': sum(1 for r, g in zip(runs, greedy_scores) if r['score'] > g) / len(runs),
+                    'avg_placed': statistics.mean(r['placed'] for r in runs),
+                    'avg_bandwidth_mbps': statistics.mean(r['network_usage'] for r in runs),
+                    'proven_optimal': sum(1 for r in runs if r['optimal']) / len(runs),
+                    'solve_ms_p50': solve_times[len(solve_times) // 2],
+                    'solve_ms_max': solve_times[-1]
+                })
+    return rows
+
+def print_table(rows):
+    header = (f"{'apps':>5} {'cumul':>5} {'stratégie':>9} {'>glouton':>8} {'placées':>8} "
+              f"{'Mbps':>6} {'optimal':>7} {'p50 ms':>8} {'max ms':>8}")
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(f"{row['apps']:>5} {str(row['cumulative']):>5} {row['strategy']:>9} "
+              f"{row['better_than_greedy']:>8.0%} {row['avg_placed']:>8.1f} "
+              f"{row['avg_bandwidth_mbps']:>6.2f} {row['proven_optimal']:>7.0%} "
+              f"{row['solve_ms_p50']:>8.2f} {row['solve_ms_max']:>8.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark des stratégies de placement AXIL")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 300, 3000])
+    parser.add_argument('--repetitions', type=int, default=20)
+    parser.add_argument('--time-budget', type=float, default=0.05, help="Budget de temps du solveur (s)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Fichier de sortie JSON des résultats")
+    args = parser.parse_args()
+
+    # Les dépassements de budget sont attendus ici: seul le tableau compte
+    logging.basicConfig(level=logging.ERROR)
+
+    rows = run_benchmark(args.sizes, args.repetitions, args.time_budget, args.seed)
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nRésultats exportés: {args.json}", file=sys.stderr)
@@ -8,34 +8,128 @@ Surveillance CPU, mémoire, réseau selon les contraintes TSN/TAS
 import time
 import psutil
 import subprocess
-import json
 import logging
+import threading
 from datetime import datetime
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
+from timeseries import RingSeries
+from metrics_export import create_exporter, write_jsonl_snapshot
+from telemetry import Telemetry
+
 logger = logging.getLogger(__name__)
 
+class HostResourceSampler:
+    """Échantillonneur en arrière-plan des ressources de l'hôte.
+
+    Un thread relève CPU, mémoire, réseau et disque toutes les ``interval``
+    secondes sans jamais bloquer (``cpu_percent(interval=None)`` mesure
+    depuis le relevé précédent). Les lecteurs obtiennent le dernier relevé
+    immédiatement; s'il date de plus de ``max_staleness`` secondes, un
+    relevé synchrone (lui aussi non bloquant) le remplace.
+    """
+    
+    def __init__(self, interval=1.0, max_staleness=5.0):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.running = False
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._last_net_io = None
+        self._last_net_time = None
+        
+        # Amorce: le premier appel non bloquant retourne toujours 0.0
+        psutil.cpu_percent(interval=None)
+    
+    def start(self):
+        """Démarre le thread d'échantillonnage"""
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self.sample()
+        
+        def sampling_loop():
+            while not self._stop_event.wait(self.interval):
+                try:
+                    self.sample()
+                except Exception as e:
+                    logger.error(f"Erreur échantillonnage ressources: {e}")
+        
+        self._thread = threading.Thread(target=sampling_loop, name="sdv-resource-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Arrête le thread d'échantillonnage"""
+        self.running = False
+        self._stop_event.set()
+    
+    def sample(self):
+        """Effectue un relevé non bloquant et le publie comme dernier relevé"""
+        now = time.time()
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        net_io = psutil.net_io_counters()
+        
+        with self._lock:
+            # Calculer le débit (approximatif) depuis le relevé précédent
+            if self._last_net_io is not None and now > self._last_net_time:
+                time_delta = now - self._last_net_time
+                send_mbps = ((net_io.bytes_sent - self._last_net_io.bytes_sent) * 8) / (time_delta * 1024 * 1024)
+                recv_mbps = ((net_io.bytes_recv - self._last_net_io.bytes_recv) * 8) / (time_delta * 1024 * 1024)
+            else:
+                send_mbps = recv_mbps = 0
+            self._last_net_io = net_io
+            self._last_net_time = now
+            
+            self._snapshot = {
+                'timestamp': now,
+                'monotonic': time.monotonic(),
+                'cpu_percent': cpu_percent,
+                'memory_percent': memory.percent,
+                'memory_available_mb': memory.available / (1024*1024),
+                'memory_total_mb': memory.total / (1024*1024),
+                'send_mbps': send_mbps,
+                'recv_mbps': recv_mbps,
+                'disk_percent': (disk.used / disk.total) * 100,
+                'disk_free_gb': disk.free / (1024**3),
+                'disk_total_gb': disk.total / (1024**3)
+            }
+            return self._snapshot
+    
+    def get_snapshot(self):
+        """Dernier relevé, garanti plus récent que ``max_staleness`` secondes"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot['monotonic'] > self.max_staleness:
+            snapshot = self.sample()
+        return snapshot
+
 class NodeResourceMonitor:
     """Moniteur de ressources pour un nœud spécifique"""
     
-    def __init__(self, node_name):
+    def __init__(self, node_name, sampler=None, history_capacity=3600,
+                 downsample_factor=60, archive_capacity=1440):
         self.node_name = node_name
+        self.sampler = sampler or HostResourceSampler()
+        
+        # Historique borné: pleine résolution récente + archive sous-échantillonnée
+        history = dict(capacity=history_capacity, downsample_factor=downsample_factor,
+                       archive_capacity=archive_capacity)
         self.metrics_history = {
-            'cpu': [],
-            'memory': [],
-            'network': [],
-            'disk': []
+            'cpu': RingSeries(('value',), **history),
+            'memory': RingSeries(('value', 'available_mb', 'total_mb'), **history),
+            'network': RingSeries(('send_mbps', 'recv_mbps', 'total_mbps', 'health'), **history),
+            'disk': RingSeries(('value', 'free_gb', 'total_gb'), **history)
         }
         
     def get_cpu_usage(self):
-        """Récupère l'utilisation CPU"""
+        """Récupère l'utilisation CPU (dernier relevé de l'échantillonneur)"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.metrics_history['cpu'].append({
-                'timestamp': datetime.now(),
-                'value': cpu_percent
-            })
+            cpu_percent = self.sampler.get_snapshot()['cpu_percent']
+            self.metrics_history['cpu'].append(value=cpu_percent)
             return cpu_percent
         except Exception as e:
             logger.error(f"Erreur CPU monitoring {self.node_name}: {e}")
@@ -44,15 +138,14 @@ class NodeResourceMonitor:
     def get_memory_usage(self):
         """Récupère l'utilisation mémoire"""
         try:
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            self.metrics_history['memory'].append({
-                'timestamp': datetime.now(),
-                'value': memory_percent,
-                'available_mb': memory.available / (1024*1024),
-                'total_mb': memory.total / (1024*1024)
-            })
-            return memory_percent, memory.available / (1024*1024)
+            snapshot = self.sampler.get_snapshot()
+            memory_percent = snapshot['memory_percent']
+            self.metrics_history['memory'].append(
+                value=memory_percent,
+                available_mb=snapshot['memory_available_mb'],
+                total_mb=snapshot['memory_total_mb']
+            )
+            return memory_percent, snapshot['memory_available_mb']
         except Exception as e:
             logger.error(f"Erreur Memory monitoring {self.node_name}: {e}")
             return 0, 0
@@ -60,35 +153,20 @@ class NodeResourceMonitor:
     def get_network_usage(self):
         """Récupère l'utilisation réseau"""
         try:
-            # Obtenir les statistiques réseau
-            net_io = psutil.net_io_counters()
-            
-            # Calculer le débit (approximatif)
-            if hasattr(self, '_last_net_io'):
-                time_delta = time.time() - self._last_net_time
-                bytes_sent_delta = net_io.bytes_sent - self._last_net_io.bytes_sent
-                bytes_recv_delta = net_io.bytes_recv - self._last_net_io.bytes_recv
-                
-                # Convertir en Mbps
-                send_mbps = (bytes_sent_delta * 8) / (time_delta * 1024 * 1024)
-                recv_mbps = (bytes_recv_delta * 8) / (time_delta * 1024 * 1024)
-                total_mbps = send_mbps + recv_mbps
-            else:
-                send_mbps = recv_mbps = total_mbps = 0
-            
-            self._last_net_io = net_io
-            self._last_net_time = time.time()
+            snapshot = self.sampler.get_snapshot()
+            send_mbps = snapshot['send_mbps']
+            recv_mbps = snapshot['recv_mbps']
+            total_mbps = send_mbps + recv_mbps
             
             # Vérifier les contraintes TSN/TAS (10 Mbps)
             network_health = max(0, 100 - (total_mbps / 10 * 100))
             
-            self.metrics_history['network'].append({
-                'timestamp': datetime.now(),
-                'send_mbps': send_mbps,
-                'recv_mbps': recv_mbps,
-                'total_mbps': total_mbps,
-                'health': network_health
-            })
+            self.metrics_history['network'].append(
+                send_mbps=send_mbps,
+                recv_mbps=recv_mbps,
+                total_mbps=total_mbps,
+                health=network_health
+            )
             
             return total_mbps, network_health
             
@@ -99,17 +177,16 @@ class NodeResourceMonitor:
     def get_disk_usage(self):
         """Récupère l'utilisation disque"""
         try:
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
+            snapshot = self.sampler.get_snapshot()
+            disk_percent = snapshot['disk_percent']
             
-            self.metrics_history['disk'].append({
-                'timestamp': datetime.now(),
-                'value': disk_percent,
-                'free_gb': disk.free / (1024**3),
-                'total_gb': disk.total / (1024**3)
-            })
+            self.metrics_history['disk'].append(
+                value=disk_percent,
+                free_gb=snapshot['disk_free_gb'],
+                total_gb=snapshot['disk_total_gb']
+            )
             
-            return disk_percent, disk.free / (1024**3)
+            return disk_percent, snapshot['disk_free_gb']
         except Exception as e:
             logger.error(f"Erreur Disk monitoring {self.node_name}: {e}")
             return 0, 0
@@ -178,14 +255,42 @@ class NodeResourceMonitor:
 class ClusterResourceMonitor:
     """Moniteur de ressources pour l'ensemble du cluster"""
     
-    def __init__(self):
+    CLUSTER_SUMMARY_COLUMNS = ('avg_cpu_available', 'total_memory_available_mb',
+                               'total_network_available_mbps', 'active_nodes')
+    
+    def __init__(self, sample_interval=1.0, max_staleness=5.0, history_capacity=3600, exporter=None,
+                 telemetry=None):
         self.node_monitors = {}
-        self.cluster_metrics = []
+        self.exporter = exporter
+        self.telemetry = telemetry
+        
+        # Résumés cluster bornés; le dernier statut complet est conservé à part
+        self.cluster_metrics = RingSeries(self.CLUSTER_SUMMARY_COLUMNS, capacity=history_capacity,
+                                          downsample_factor=60, archive_capacity=1440)
+        self.last_cluster_status = None
+        
+        # Un seul échantillonneur partagé: les relevés psutil concernent l'hôte local
+        self.sampler = HostResourceSampler(interval=sample_interval, max_staleness=max_staleness)
+        self.sampler.start()
         
         # Initialiser les moniteurs pour chaque type de nœud
         self.expected_nodes = ['orchestrator-node', 'node-safety', 'node-comfort', 'node-infotainment']
         for node_name in self.expected_nodes:
-            self.node_monitors[node_name] = NodeResourceMonitor(node_name)
+            self.node_monitors[node_name] = NodeResourceMonitor(node_name, self.sampler,
+                                                                history_capacity=history_capacity)
+        
+        # Export en continu: chaque échantillon est écrit dès qu'il est produit
+        if exporter is not None:
+            self.cluster_metrics.attach(exporter.sink('cluster'))
+            for node_name, monitor in self.node_monitors.items():
+                for kind, series in monitor.metrics_history.items():
+                    series.attach(exporter.sink(f"{node_name}.{kind}"))
+    
+    def stop(self):
+        """Arrête l'échantillonnage en arrière-plan et ferme l'export en continu"""
+        self.sampler.stop()
+        if self.exporter is not None:
+            self.exporter.close()
     
     def get_cluster_status(self):
         """Récupère le statut de l'ensemble du cluster"""
@@ -204,6 +309,8 @@ class ClusterResourceMonitor:
             try:
                 node_status = monitor.get_resource_summary()
                 cluster_status['nodes'][node_name] = node_status
+                if self.telemetry is not None:
+                    self.telemetry.observe_node(node_name, node_status)
                 
                 # Agrégation pour résumé cluster
                 total_cpu_available += node_status['cpu']['available_percent']
@@ -224,7 +331,10 @@ class ClusterResourceMonitor:
                 'expected_nodes': len(self.expected_nodes)
             }
         
-        self.cluster_metrics.append(cluster_status)
+        summary = cluster_status['cluster_summary']
+        self.cluster_metrics.append(**{column: summary.get(column, float('nan'))
+                                       for column in self.CLUSTER_SUMMARY_COLUMNS})
+        self.last_cluster_status = cluster_status
         return cluster_status
     
     def find_best_node_for_app(self, app_requirements, preferred_zone=None):
@@ -298,6 +408,8 @@ class ClusterResourceMonitor:
                 warnings.append(f"Bande passante élevée sur {node_name}: {node_status['network']['usage_mbps']:.1f}/10 Mbps")
         
         health_score = max(0, 100 - len(health_issues) * 25 - len(warnings) * 10)
+        if self.telemetry is not None:
+            self.telemetry.cluster_health_score.set(health_score)
         
         return {
             'health_score': health_score,
@@ -308,22 +420,21 @@ class ClusterResourceMonitor:
         }
     
     def export_metrics(self, filename=None):
-        """Exporte les métriques collectées vers un fichier JSON"""
+        """Exporte l'historique en mémoire vers un fichier JSON Lines (un échantillon par ligne)"""
         if not filename:
-            filename = f"/tmp/sdv_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"/tmp/sdv_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
         
-        export_data = {
-            'cluster_metrics': self.cluster_metrics,
-            'node_metrics': {}
-        }
-        
-        # Exporter les métriques détaillées de chaque nœud
-        for node_name, monitor in self.node_monitors.items():
-            export_data['node_metrics'][node_name] = monitor.metrics_history
+        def records():
+            yield {'stream': 'last_cluster_status', 'status': self.last_cluster_status}
+            for record in self.cluster_metrics.iter_records(include_archive=True):
+                yield {'stream': 'cluster', **record}
+            for node_name, monitor in self.node_monitors.items():
+                for kind, series in monitor.metrics_history.items():
+                    for record in series.iter_records(include_archive=True):
+                        yield {'stream': f"{node_name}.{kind}", **record}
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            write_jsonl_snapshot(filename, records())
             logger.info(f"Métriques exportées vers: {filename}")
             return filename
         except Exception as e:
@@ -331,9 +442,23 @@ class ClusterResourceMonitor:
             return None
 
 # Fonction utilitaire pour monitoring en continu
-def start_monitoring_daemon(interval=5, duration=300):
-    """Démarre un daemon de monitoring pour le testbench SDV"""
-    monitor = ClusterResourceMonitor()
+def start_monitoring_daemon(interval=5, duration=300, export_dir=None, export_format='jsonl',
+                            metrics_port=None):
+    """Démarre un daemon de monitoring pour le testbench SDV.
+    
+    Avec ``export_dir``, les échantillons sont exportés en continu
+    (``export_format``: 'jsonl', 'columnar', 'parquet' ou 'npy'). Avec
+    ``metrics_port``, les jauges de ressources sont exposées sur /metrics.
+    """
+    telemetry = None
+    if metrics_port is not None:
+        telemetry = Telemetry()
+        telemetry.serve(metrics_port)
+    exporter = None
+    if export_dir:
+        exporter = create_exporter(export_dir, f"sdv_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                   fmt=export_format)
+    monitor = ClusterResourceMonitor(exporter=exporter, telemetry=telemetry)
     
     logger.info(f"Démarrage monitoring cluster SDV (durée: {duration}s, intervalle: {interval}s)")
     
@@ -364,6 +489,8 @@ def start_monitoring_daemon(interval=5, duration=300):
         logger.info("Monitoring arrêté par l'utilisateur")
     
     finally:
+        monitor.stop()
+        
         # Export final des métriques
         export_file = monitor.export_metrics()
         total_time = time.time() - start_time
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Headless Simulation - SDV Testbench
+Simulation à événements discrets de l'orchestrateur AXIL, sans cluster :
+horloge virtuelle, API Kubernetes simulée en mémoire et transitions d'état
+issues de la chaîne de Markov de VehicleSimulator. Une journée de
+fonctionnement du véhicule se simule en quelques secondes, avec les mêmes
+métriques qu'une exécution réelle.
+"""
+
+import re
+import sys
+import json
+import heapq
+import random
+import logging
+import argparse
+import threading
+import time
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from axil_complete import AXILOrchestrator, ApplicationManager
+from cluster_cache import ClusterStateCache, is_pod_ready
+from metrics_provider import FakeMetricsProvider
+from state_predictor import MarkovPredictor
+from vehicle_simulator import VehicleSimulator
+from warm_pool import WarmPool
+
+logger = logging.getLogger(__name__)
+
+# Loggers du chemin critique, réduits au silence en simulation
+QUIET_LOGGERS = ('axil_complete', 'placement', 'vehicle_simulator', 'cluster_cache', 'metrics_provider')
+
+def match_label_selector(labels, selector):
+    """Sélecteur de labels Kubernetes (``clé``, ``clé=valeur``, ``clé!=valeur``,
+    ``clé in (a,b)``, ``clé notin (a,b)``, séparés par des virgules)"""
+    labels = labels or {}
+    for requirement in re.findall(r'[^,(]+(?:\([^)]*\))?', selector or ''):
+        requirement = requirement.strip()
+        match = re.fullmatch(r'([\w./-]+)\s+(in|notin)\s+\(([^)]*)\)', requirement)
+        if match:
+            key, operator, values = match.groups()
+            inside = labels.get(key) in {value.strip() for value in values.split(',')}
+            if inside != (operator == 'in'):
+                return False
+        elif '!=' in requirement:
+            key, value = requirement.split('!=', 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif '=' in requirement:
+            key, value = requirement.replace('==', '=').split('=', 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif requirement.startswith('!'):
+            if requirement[1:].strip() in labels:
+                return False
+        elif requirement not in labels:
+            return False
+    return True
+
+class VirtualClock:
+    """Horloge simulée (secondes), avancée explicitement par la boucle d'événements"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance_to(self, timestamp):
+        if timestamp < self.now:
+            raise ValueError(f"Retour dans le temps impossible: {timestamp} < {self.now}")
+        self.now = timestamp
+
+def build_model(type_name, data):
+    """Modèle du client Kubernetes depuis un document JSON (clés camelCase).
+
+    Parcourt ``openapi_types``/``attribute_map`` des modèles générés plutôt
+    que ``ApiClient.deserialize``, dont la signature change selon la version
+    du client. Les types non-modèles (str, int, object, datetime) sont
+    conservés tels quels.
+    """
+    if data is None:
+        return None
+    if type_name.startswith('list['):
+        return [build_model(type_name[5:-1], item) for item in data]
+    if type_name.startswith('dict('):
+        value_type = type_name[5:-1].split(',', 1)[1].strip()
+        return {key: build_model(value_type, value) for key, value in data.items()}
+    klass = getattr(client.models, type_name, None)
+    if klass is None or not hasattr(klass, 'openapi_types'):
+        return data
+    return klass(**{
+        attribute: build_model(attribute_type, data[klass.attribute_map[attribute]])
+        for attribute, attribute_type in klass.openapi_types.items()
+        if klass.attribute_map[attribute] in data
+    })
+
+class FakeKubernetesApi:
+    """API Kubernetes en mémoire (sous-ensemble AppsV1Api + CoreV1Api utilisé par AXIL).
+
+    Chaque Deployment à une réplica possède un pod, Pending à la création
+    puis Running et Ready après un délai de démarrage tiré dans
+    ``startup_delay`` (secondes virtuelles). Comme avec un vrai contrôleur,
+    un patch ne remplace le pod que si le template de pod change ou si le
+    Deployment repasse de zéro à une réplica ; à zéro réplica, le pod est
+    supprimé. Les changements sont poussés directement dans le cache
+    attaché, comme le ferait un watch.
+    """
+
+    def __init__(self, clock, startup_delay=(1.0, 3.0), seed=None):
+        self.clock = clock
+        self.startup_delay = startup_delay
+        self.api_client = client.ApiClient()
+        self.cache = None
+        self.calls = {}
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._deployments = {}  # (namespace, nom) -> V1Deployment
+        self._pods = {}  # (namespace, nom du Deployment) -> V1Pod
+        self._ready_at = {}  # (namespace, nom du Deployment) -> instant Ready
+        self._pending = []  # tas (instant Ready, séquence, clé)
+        self._sequence = 0
+        self._resource_version = 0
+
+    def attach_cache(self, cache):
+        """Cache alimenté par les événements de l'API simulée"""
+        self.cache = cache
+
+    def _count(self, verb):
+        self.calls[verb] = self.calls.get(verb, 0) + 1
+
+    def _emit(self, kind, event_type, obj):
+        if self.cache is not None:
+            self.cache.apply_event(kind, event_type, obj)
+
+    def _next_version(self):
+        self._resource_version += 1
+        return str(self._resource_version)
+
+    def _sync_pod(self, key, old, deployment):
+        """Aligne le pod d'un Deployment sur son nombre de réplicas et son template"""
+        if deployment.spec.replicas == 0:
+            pod = self._pods.pop(key, None)
+            self._ready_at.pop(key, None)
+            if pod is not None:
+                self._emit('pods', 'DELETED', pod)
+            return
+        sanitize = self.api_client.sanitize_for_serialization
+        if old is None or key not in self._pods or sanitize(old.spec.template) != sanitize(deployment.spec.template):
+            self._start_pod(key, deployment)
+
+    def _start_pod(self, key, deployment):
+        """Remplace le pod d'un Deployment par un nouveau pod Pending"""
+        old = self._pods.pop(key, None)
+        if old is not None:
+            self._emit('pods', 'DELETED', old)
+
+        self._sequence += 1
+        namespace, name = key
+        pod = client.V1Pod(
+            metadata=client.V1ObjectMeta(
+                name=f"{name}-{self._sequence:x}",
+                namespace=namespace,
+                labels=dict(deployment.spec.template.metadata.labels or {}),
+                resource_version=self._next_version()
+            ),
+            status=client.V1PodStatus(phase="Pending")
+        )
+        ready_at = self.clock.time() + self._rng.uniform(*self.startup_delay)
+        self._pods[key] = pod
+        self._ready_at[key] = ready_at
+        heapq.heappush(self._pending, (ready_at, self._sequence, key))
+        self._emit('pods', 'ADDED', pod)
+
+    def advance(self, now):
+        """Passe Running/Ready les pods dont le délai de démarrage est écoulé"""
+        with self._lock:
+            while self._pending and self._pending[0][0] <= now:
+                ready_at, sequence, key = heapq.heappop(self._pending)
+                pod = self._pods.get(key)
+                # Pod remplacé ou supprimé entre-temps
+                if pod is None or self._ready_at.get(key) != ready_at:
+                    continue
+                pod.status = client.V1PodStatus(
+                    phase="Running",
+                    conditions=[client.V1PodCondition(type="Ready", status="True")]
+                )
+                pod.metadata.resource_version = self._next_version()
+                self._emit('pods', 'MODIFIED', pod)
+
+    def ready_at(self, namespace, app_names):
+        """Instant où tous les pods des applications sont Ready (None si l'un manque)"""
+        with self._lock:
+            instants = [self._ready_at.get((namespace, f"sdv-{app_name}")) for app_name in app_names]
+        if any(instant is None for instant in instants):
+            return None
+        return max(instants, default=self.clock.time())
+
+    # AppsV1Api
+
+    def create_namespaced_deployment(self, namespace, body, **kwargs):
+        self._count('create')
+        with self._lock:
+            key = (namespace, body.metadata.name)
+            if key in self._deployments:
+                raise ApiException(status=409, reason="AlreadyExists")
+            body.metadata.namespace = namespace
+            body.metadata.resource_version = self._next_version()
+            self._deployments[key] = body
+            self._emit('deployments', 'ADDED', body)
+            self._sync_pod(key, None, body)
+            return body
+
+    def patch_namespaced_deployment(self, name, namespace, body, **kwargs):
+        self._count('patch')
+        with self._lock:
+            key = (namespace, name)
+            if key not in self._deployments:
+                raise ApiException(status=404, reason="NotFound")
+            body.metadata.namespace = namespace
+            body.metadata.resource_version = self._next_version()
+            old = self._deployments[key]
+            self._deployments[key] = body
+            self._emit('deployments', 'MODIFIED', body)
+            self._sync_pod(key, old, body)
+            return body
+
+    def apply_namespaced_deployment(self, name, namespace, body, **kwargs):
+        """Server-side apply d'un corps sérialisé (un seul gestionnaire de champs:
+        le manifeste appliqué remplace le Deployment)"""
+        self._count('apply')
+        deployment = build_model('V1Deployment', json.loads(body))
+        with self._lock:
+            key = (namespace, name)
+            deployment.metadata.namespace = namespace
+            deployment.metadata.resource_version = self._next_version()
+            old = self._deployments.get(key)
+            self._deployments[key] = deployment
+            self._emit('deployments', 'ADDED' if old is None else 'MODIFIED', deployment)
+            self._sync_pod(key, old, deployment)
+            return deployment
+
+    def delete_namespaced_deployment(self, name, namespace, **kwargs):
+        self._count('delete')
+        with self._lock:
+            key = (namespace, name)
+            deployment = self._deployments.pop(key, None)
+            if deployment is None:
+                raise ApiException(status=404, reason="NotFound")
+            self._emit('deployments', 'DELETED', deployment)
+            pod = self._pods.pop(key, None)
+            self._ready_at.pop(key, None)
+            if pod is not None:
+                self._emit('pods', 'DELETED', pod)
+            return client.V1Status(status="Success")
+
+    def delete_collection_namespaced_deployment(self, namespace, label_selector=None, **kwargs):
+        self._count('deletecollection')
+        with self._lock:
+            keys = [
+                key for key, deployment in self._deployments.items()
+                if key[0] == namespace and match_label_selector(deployment.metadata.labels, label_selector)
+            ]
+            for key in keys:
+                self._emit('deployments', 'DELETED', self._deployments.pop(key))
+                pod = self._pods.pop(key, None)
+                self._ready_at.pop(key, None)
+                if pod is not None:
+                    self._emit('pods', 'DELETED', pod)
+            return client.V1Status(status="Success")
+
+    def list_namespaced_deployment(self, namespace, **kwargs):
+        self._count('list')
+        with self._lock:
+            items = [d for (ns, _), d in self._deployments.items() if ns == namespace]
+            return client.V1DeploymentList(
+                items=items, metadata=client.V1ListMeta(resource_version=str(self._resource_version))
+            )
+
+    def list_deployment_for_all_namespaces(self, **kwargs):
+        self._count('list')
+        with self._lock:
+            return client.V1DeploymentList(
+                items=list(self._deployments.values()),
+                metadata=client.V1ListMeta(resource_version=str(self._resource_version))
+            )
+
+    # CoreV1Api
+
+    def list_pod_for_all_namespaces(self, **kwargs):
+        self._count('list')
+        with self._lock:
+            return client.V1PodList(
+                items=list(self._pods.values()),
+                metadata=client.V1ListMeta(resource_version=str(self._resource_version))
+            )
+
+class HeadlessSimulation:
+    """Pilote l'orchestrateur sur une horloge virtuelle.
+
+    Événements: changement d'état toutes les ``change_interval`` secondes
+    (chaîne de Markov de VehicleSimulator) et réconciliation périodique
+    après ``cycle_interval`` secondes sans changement, comme ``run()``.
+    Le délai transition → Ready est mesuré en temps virtuel; une transition
+    dont les pods ne sont pas prêts avant la suivante est comptée comme
+    dépassée, comme dans une exécution réelle.
+    """
+
+    def __init__(self, duration=86400, change_interval=10, cycle_interval=8,
+                 placement_strategy='knapsack', apply_concurrency=1,
+                 startup_delay=(1.0, 3.0), seed=42, quiet=True, namespace="default", warm_pool=False):
+        self.duration = duration
+        self.change_interval = change_interval
+        self.cycle_interval = cycle_interval
+        self.namespace = namespace
+        self.quiet = quiet
+
+        if quiet:
+            for name in QUIET_LOGGERS:
+                logging.getLogger(name).setLevel(logging.ERROR)
+
+        # Reproductibilité: la chaîne de Markov et collect_metrics utilisent random
+        random.seed(seed)
+        self.clock = VirtualClock()
+        self.api = FakeKubernetesApi(self.clock, startup_delay, seed=seed)
+        cache = ClusterStateCache(self.api, self.api, namespace=namespace)
+        self.api.attach_cache(cache)
+
+        self.vehicle = VehicleSimulator(change_interval=change_interval, clock=self.clock.time)
+        self.vehicle.add_state_listener(self._on_vehicle_state_change)
+
+        # Prédiction (et pool d'attente) avec la chaîne de Markov du simulateur
+        app_manager = ApplicationManager()
+        predictor = MarkovPredictor(self.vehicle.transition_probabilities, change_interval)
+        if warm_pool:
+            warm_pool = WarmPool(app_manager, predictor)
+
+        self.orchestrator = AXILOrchestrator(
+            apply_concurrency=apply_concurrency,
+            cycle_interval=cycle_interval,
+            placement_strategy=placement_strategy,
+            metrics_provider=FakeMetricsProvider(seed=seed, clock=self.clock.time),
+            k8s_apps=self.api,
+            k8s_core=self.api,
+            cluster_cache=cache,
+            namespace=namespace,
+            app_manager=app_manager,
+            warm_pool=warm_pool,
+            predictor=predictor,
+            clock=self.clock.time
+        )
+        # Paramètres du simulateur (carburant, batterie, vitesse) pour la prédiction
+        self.orchestrator.vehicle_state_manager.parameters = self.vehicle.parameters
+
+        self.cycle_count = 0
+        self.transitions = 0
+        self.superseded = 0
+        # critique ? -> (instant de transition, applications): plan complet (False)
+        # et applications critiques (True)
+        self._pending_ready = {}
+        # application démarrée -> (instant de transition, activée depuis le pool d'attente)
+        self._pending_starts = {}
+
+    def _on_vehicle_state_change(self, old_state, new_state, parameters):
+        """Relaye la transition Markov vers le gestionnaire d'état de l'orchestrateur"""
+        self.orchestrator.vehicle_state_manager.set_state(new_state.value)
+
+    def _advance(self, timestamp):
+        """Avance l'horloge, fait démarrer les pods et mesure la transition en cours"""
+        self.clock.advance_to(timestamp)
+        self.api.advance(timestamp)
+        for critical, (transition_time, app_names) in list(self._pending_ready.items()):
+            ready_at = self.api.ready_at(self.namespace, app_names)
+            if ready_at is not None and ready_at <= timestamp:
+                self.orchestrator.record_transition_ready(max(0.0, ready_at - transition_time), len(app_names),
+                                                          critical)
+                del self._pending_ready[critical]
+        for app_name, (transition_time, activated) in list(self._pending_starts.items()):
+            ready_at = self.api.ready_at(self.namespace, [app_name])
+            if ready_at is not None and ready_at <= timestamp:
+                self.orchestrator.predictor.record_start(activated, max(0.0, ready_at - transition_time))
+                del self._pending_starts[app_name]
+
+    def _cycle(self, transition_time=None):
+        """Un cycle d'orchestration (run_cycle), transition mesurée en temps virtuel"""
+        self.cycle_count += 1
+        cycle = self.orchestrator.run_cycle(self.cycle_count, track_ready=False)
+        if transition_time is not None:
+            self._pending_ready = {
+                False: (transition_time, cycle['app_names']),
+                True: (transition_time, self.orchestrator.critical_apps(cycle['app_names']))
+            }
+            self._pending_starts = {
+                app_name: (transition_time, activated) for app_name, activated in cycle['started'].items()
+            }
+
+    def run(self):
+        """Exécute la simulation et retourne le résumé"""
+        wall_start = time.perf_counter()
+        self._cycle()
+
+        next_change = self.change_interval
+        next_reconcile = self.cycle_interval
+        try:
+            while True:
+                timestamp = min(next_change, next_reconcile)
+                if timestamp >= self.duration:
+                    break
+                self._advance(timestamp)
+
+                if timestamp == next_change:
+                    next_change += self.change_interval
+                    if not self.vehicle.change_state():
+                        continue
+                    self.transitions += 1
+                    if False in self._pending_ready:
+                        self.superseded += 1
+                    self._pending_ready = {}
+                    self._pending_starts = {}
+                    next_reconcile = timestamp + self.cycle_interval
+                    self._cycle(transition_time=timestamp)
+                else:
+                    next_reconcile += self.cycle_interval
+                    self._cycle()
+
+            self._advance(self.duration)
+        finally:
+            if self.orchestrator._apply_executor is not None:
+                self.orchestrator._apply_executor.shutdown(wait=True)
+
+        wall_time = time.perf_counter() - wall_start
+        if self.quiet:
+            logging.getLogger('axil_complete').setLevel(logging.INFO)
+        self.orchestrator.final_report(self.duration, self.cycle_count)
+        return self.summary(wall_time)
+
+    def summary(self, wall_time):
+        """Métriques de la simulation (mêmes compteurs qu'une exécution réelle)"""
+        metrics = self.orchestrator.metrics
+        ready_times = sorted(metrics['transition_ready_time'])
+        critical_times = sorted(metrics['critical_ready_time'])
+        optimization_times = list(metrics['optimization_time'])
+
+        def percentile(values, q):
+            return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+        return {
+            'simulated_seconds': self.duration,
+            'wall_seconds': wall_time,
+            'speedup': self.duration / wall_time if wall_time else None,
+            'cycles': self.cycle_count,
+            'transitions': self.transitions,
+            'superseded_transitions': self.superseded,
+            'deployments': metrics['deployments'],
+            'unchanged': metrics['unchanged'],
+            'failures': metrics['failures'],
+            'cancelled': metrics['cancelled'],
+            'api_calls': dict(self.api.calls),
+            'avg_optimization_ms': 1000 * sum(optimization_times) / len(optimization_times) if optimization_times else None,
+            'transition_ready_p50': percentile(ready_times, 0.5),
+            'transition_ready_p95': percentile(ready_times, 0.95),
+            'transition_ready_max': ready_times[-1] if ready_times else None,
+            'critical_ready_p50': percentile(critical_times, 0.5),
+            'critical_ready_p95': percentile(critical_times, 0.95),
+            'critical_ready_max': critical_times[-1] if critical_times else None,
+            'warm_pool_activations': metrics['activations'],
+            'cleaned': metrics['cleaned'],
+            'prediction': self.orchestrator.predictor.report(),
+            'avg_network_health': sum(metrics['network_health']) / len(metrics['network_health']) if metrics['network_health'] else None,
+            'final_running_pods': sum(1 for pod in self.orchestrator.cluster_cache.get_pods() if is_pod_ready(pod))
+        }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulation AXIL sans cluster (horloge virtuelle)")
+    parser.add_argument('--duration', type=float, default=86400, help="Durée simulée (s)")
+    parser.add_argument('--change-interval', type=float, default=10, help="Intervalle entre changements d'état (s)")
+    parser.add_argument('--cycle-interval', type=float, default=8, help="Réconciliation périodique (s)")
+    parser.add_argument('--strategy', default='knapsack', help="Stratégie de placement")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--warm-pool', action='store_true', help="Deployments en attente (voir warm_pool.py)")
+    parser.add_argument('--json', help="Fichier de sortie JSON du résumé")
+    args = parser.parse_args()
+
+    simulation = HeadlessSimulation(
+        duration=args.duration,
+        change_interval=args.change_interval,
+        cycle_interval=args.cycle_interval,
+        placement_strategy=args.strategy,
+        seed=args.seed,
+        warm_pool=args.warm_pool
+    )
+    summary = simulation.run()
+    print(json.dumps(summary, indent=2))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nRésumé exporté: {args.json}", file=sys.stderr)
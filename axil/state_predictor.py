@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+State Predictor - SDV Testbench
+Prédiction de l'état suivant du véhicule à partir de la chaîne de Markov de
+vehicle_simulator (matrice de transition et ajustements contextuels :
+carburant, batterie, vitesse) et de l'instant probable de la transition.
+Sert au préchargement des applications (warm_pool.py) et mesure la
+qualité des prédictions et du préchargement : taux de succès et latence
+gagnée.
+"""
+
+import threading
+
+from timeseries import MetricSeries
+from vehicle_simulator import TRANSITION_PROBABILITIES, VehicleState, adjust_transition_probabilities
+
+def _state_name(state):
+    """Les transitions de vehicle_simulator sont indexées par VehicleState"""
+    return getattr(state, 'value', state)
+
+class MarkovPredictor:
+    """Prédicteur markovien des états suivants.
+
+    Les changements d'état sont tirés toutes les ``change_interval``
+    secondes : la transition a lieu au prochain tirage avec la probabilité
+    de quitter l'état, d'où un délai attendu géométrique. Une prédiction
+    retient les ``top_k`` états suivants les plus probables (probabilité au
+    moins ``min_probability``).
+
+    Deux mesures sont tenues: la justesse des prédictions d'état, et le
+    succès du préchargement: parmi les applications démarrées par une
+    transition, celles activées depuis le pool d'attente plutôt que créées à
+    froid, avec leur délai transition → Ready.
+    """
+
+    def __init__(self, transition_probabilities=TRANSITION_PROBABILITIES, change_interval=10,
+                 top_k=2, min_probability=0.05, history_capacity=3600):
+        self.transition_probabilities = {
+            VehicleState(_state_name(state)): {
+                VehicleState(_state_name(next_state)): p for next_state, p in next_states.items()
+            }
+            for state, next_states in transition_probabilities.items()
+        }
+        self.change_interval = change_interval
+        self.top_k = top_k
+        self.min_probability = min_probability
+
+        self.stats = {
+            'predicted': 0,
+            'unpredicted': 0,
+            'hits': 0,
+            'misses': 0,
+            'warm_start': MetricSeries(history_capacity),
+            'cold_start': MetricSeries(history_capacity)
+        }
+        self._lock = threading.Lock()
+
+    def next_state_probabilities(self, current_state, parameters=None):
+        """{état: probabilité} du prochain tirage, ajustées par les paramètres véhicule
+        (VehicleParameters de VehicleSimulator, ou None)"""
+        probabilities = self.transition_probabilities[VehicleState(current_state)]
+        if parameters is not None:
+            probabilities = adjust_transition_probabilities(
+                probabilities,
+                parameters.fuel_level,
+                parameters.battery_level,
+                parameters.speed
+            )
+        else:
+            total = sum(probabilities.values())
+            probabilities = {state: p / total for state, p in probabilities.items()}
+        return {state.value: p for state, p in probabilities.items()}
+
+    def expected_transition_in(self, current_state, elapsed=0.0, parameters=None):
+        """Délai attendu (s) avant de quitter l'état, ``elapsed`` secondes après y être entré"""
+        stay = self.next_state_probabilities(current_state, parameters).get(current_state, 0.0)
+        if stay >= 1.0:
+            return float('inf')
+        next_draw = self.change_interval - (elapsed % self.change_interval)
+        return next_draw + self.change_interval * stay / (1.0 - stay)
+
+    def predict(self, current_state, parameters=None, elapsed=0.0):
+        """États suivants les plus probables: [(état, probabilité)], et délai attendu"""
+        probabilities = self.next_state_probabilities(current_state, parameters)
+        predicted = sorted(
+            ((state, p) for state, p in probabilities.items()
+             if state != current_state and p >= self.min_probability),
+            key=lambda item: -item[1]
+        )[:self.top_k]
+        return predicted, self.expected_transition_in(current_state, elapsed, parameters)
+
+    def record_transition(self, old_state, new_state, parameters=None):
+        """Évalue la prédiction faite pour ``old_state``: True si ``new_state`` était prédit"""
+        predicted, _ = self.predict(old_state, parameters)
+        hit = new_state in {state for state, _ in predicted}
+        with self._lock:
+            self.stats['predicted' if hit else 'unpredicted'] += 1
+        return hit
+
+    def record_prefetch(self, activated, created):
+        """Applications démarrées par une transition: activées depuis le pool
+        d'attente (succès) ou créées à froid (échecs)"""
+        with self._lock:
+            self.stats['hits'] += activated
+            self.stats['misses'] += created
+
+    def record_start(self, activated, ready_time):
+        """Délai transition → Ready d'une application activée depuis le pool ou créée à froid"""
+        with self._lock:
+            self.stats['warm_start' if activated else 'cold_start'].append(ready_time)
+
+    def report(self):
+        """Justesse des prédictions, taux de succès du préchargement et latence
+        gagnée: écart des délais moyens transition → Ready entre démarrage à
+        froid et activation depuis le pool, par activation et au total"""
+        def mean(values):
+            return sum(values) / len(values) if values else None
+
+        with self._lock:
+            hits, misses = self.stats['hits'], self.stats['misses']
+            predicted, unpredicted = self.stats['predicted'], self.stats['unpredicted']
+            warm_start = mean(self.stats['warm_start'])
+            cold_start = mean(self.stats['cold_start'])
+
+        saved = cold_start - warm_start if warm_start is not None and cold_start is not None else None
+        return {
+            'prediction_accuracy': predicted / (predicted + unpredicted) if predicted + unpredicted else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else None,
+            'warm_start': warm_start,
+            'cold_start': cold_start,
+            'latency_saved_per_hit': saved,
+            'latency_saved': saved * hits if saved is not None else None
+        }
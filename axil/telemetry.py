@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Telemetry - SDV Testbench
+Instrumentation Prometheus du chemin critique AXIL, exposée sur un endpoint
+HTTP /metrics : histogrammes (optimisation, application par app, appels API
+Kubernetes par verbe, cycle, transition → Ready), reprises d'appels API et jauges (budget réseau
+TAS par état, ressources des nœuds). Sans prometheus-client, toutes les
+opérations sont des no-op.
+"""
+
+import time
+import functools
+import logging
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+except ImportError:
+    CollectorRegistry = None
+
+logger = logging.getLogger(__name__)
+
+TAS_BANDWIDTH_LIMIT = 10  # Mbps
+
+# Seuils (s) : appels API et applications en ms, cycles et transitions en s
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# Préfixes des méthodes du client Kubernetes -> verbe (apply: ServerSideApply de manifests.py)
+API_VERBS = ('list', 'read', 'create', 'patch', 'apply', 'replace', 'delete', 'connect')
+
+class _NoopMetric:
+    """Remplaçant d'une métrique quand prometheus-client est absent"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def set(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+_NOOP = _NoopMetric()
+
+class InstrumentedApi:
+    """Proxy d'une API Kubernetes qui mesure la latence de chaque appel par verbe.
+
+    Les appels ``watch=True`` sont comptés sous le verbe ``watch`` (latence
+    d'ouverture du flux), les ``delete_collection_*`` sous
+    ``deletecollection``. Les autres attributs sont transmis tels quels.
+    """
+
+    def __init__(self, api, histogram):
+        self._api = api
+        self._histogram = histogram
+
+    def __getattr__(self, name):
+        attribute = getattr(self._api, name)
+        verb = name.split('_', 1)[0]
+        if not callable(attribute) or verb not in API_VERBS:
+            return attribute
+        if name.startswith('delete_collection'):
+            verb = 'deletecollection'
+
+        histogram = self._histogram
+
+        # wraps: watch.Watch lit le type de retour dans la docstring
+        @functools.wraps(attribute)
+        def timed(*args, **kwargs):
+            labels = histogram.labels('watch' if kwargs.get('watch') else verb)
+            start_time = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                labels.observe(time.perf_counter() - start_time)
+
+        # Mis en cache sur l'instance: __getattr__ n'est plus appelé ensuite
+        setattr(self, name, timed)
+        return timed
+
+class Telemetry:
+    """Métriques Prometheus d'AXIL, dans un registre propre à l'instance"""
+
+    def __init__(self):
+        self.enabled = CollectorRegistry is not None
+        self.port = None
+        if not self.enabled:
+            logger.warning("prometheus-client non installé: endpoint /metrics désactivé")
+            for name in ('optimization_seconds', 'apply_seconds', 'cleanup_seconds', 'k8s_api_seconds',
+                         'k8s_api_retries', 'cycle_seconds', 'transition_ready_seconds',
+                         'critical_ready_seconds', 'bandwidth_usage', 'bandwidth_budget_ratio', 'standby_reserved',
+                         'node_cpu_available',
+                         'node_memory_available', 'node_network_usage', 'cluster_health_score'):
+                setattr(self, name, _NOOP)
+            return
+
+        self.registry = CollectorRegistry()
+        registry = self.registry
+
+        # Orchestrateur
+        self.optimization_seconds = Histogram(
+            'axil_optimization_seconds', "Durée du calcul du plan de déploiement",
+            buckets=FAST_BUCKETS, registry=registry)
+        self.apply_seconds = Histogram(
+            'axil_apply_seconds', "Durée d'application d'une application sur le cluster",
+            ['app', 'action'], buckets=FAST_BUCKETS, registry=registry)
+        self.cleanup_seconds = Histogram(
+            'axil_cleanup_seconds', "Durée du nettoyage des applications non requises (un appel groupé)",
+            buckets=FAST_BUCKETS, registry=registry)
+        self.k8s_api_seconds = Histogram(
+            'axil_k8s_api_seconds', "Latence des appels API Kubernetes",
+            ['verb'], buckets=FAST_BUCKETS, registry=registry)
+        self.k8s_api_retries = Counter(
+            'axil_k8s_api_retries', "Appels API Kubernetes repris (429, 5xx, réseau, conflit)",
+            ['verb', 'reason'], registry=registry)
+        self.cycle_seconds = Histogram(
+            'axil_cycle_seconds', "Durée d'un cycle d'orchestration",
+            buckets=SLOW_BUCKETS, registry=registry)
+        self.transition_ready_seconds = Histogram(
+            'axil_transition_ready_seconds', "Délai changement d'état → pods du plan Ready",
+            buckets=SLOW_BUCKETS, registry=registry)
+        self.critical_ready_seconds = Histogram(
+            'axil_critical_ready_seconds', "Délai changement d'état → pods critiques du plan Ready",
+            buckets=FAST_BUCKETS + SLOW_BUCKETS[7:], registry=registry)
+        self.bandwidth_usage = Gauge(
+            'axil_bandwidth_usage_mbps', "Bande passante planifiée par état véhicule",
+            ['state'], registry=registry)
+        self.bandwidth_budget_ratio = Gauge(
+            'axil_bandwidth_budget_ratio', "Part du budget TAS utilisée par état véhicule",
+            ['state'], registry=registry)
+        self.standby_reserved = Gauge(
+            'axil_standby_reserved_mbps', "Bande passante TAS réservée aux pods en attente démarrés",
+            registry=registry)
+
+        # Moniteur de ressources
+        self.node_cpu_available = Gauge(
+            'axil_node_cpu_available_percent', "CPU disponible par nœud",
+            ['node'], registry=registry)
+        self.node_memory_available = Gauge(
+            'axil_node_memory_available_mb', "Mémoire disponible par nœud",
+            ['node'], registry=registry)
+        self.node_network_usage = Gauge(
+            'axil_node_network_usage_mbps', "Trafic réseau par nœud",
+            ['node'], registry=registry)
+        self.cluster_health_score = Gauge(
+            'axil_cluster_health_score', "Score de santé du cluster (0-100)",
+            registry=registry)
+
+    def serve(self, port, addr='0.0.0.0'):
+        """Démarre le serveur HTTP /metrics (thread démon)"""
+        if not self.enabled:
+            return False
+        start_http_server(port, addr=addr, registry=self.registry)
+        self.port = port
+        logger.info(f" Endpoint Prometheus: http://{addr}:{port}/metrics")
+        return True
+
+    def instrument(self, api):
+        """Enveloppe une API Kubernetes pour mesurer ses appels"""
+        if not self.enabled:
+            return api
+        return InstrumentedApi(api, self.k8s_api_seconds)
+
+    def observe_bandwidth(self, vehicle_state, network_usage, limit=TAS_BANDWIDTH_LIMIT):
+        self.bandwidth_usage.labels(vehicle_state).set(network_usage)
+        self.bandwidth_budget_ratio.labels(vehicle_state).set(network_usage / limit)
+
+    def observe_node(self, node_name, node_status):
+        """Met à jour les jauges d'un nœud depuis NodeResourceMonitor.get_resource_summary"""
+        self.node_cpu_available.labels(node_name).set(node_status['cpu']['available_percent'])
+        self.node_memory_available.labels(node_name).set(node_status['memory']['available_mb'])
+        self.node_network_usage.labels(node_name).set(node_status['network']['usage_mbps'])
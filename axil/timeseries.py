@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Time Series Store - SDV Testbench
+Stockage compact des historiques de métriques : tampons circulaires à
+capacité fixe, une colonne ``array('d')`` par grandeur (horodatage compris),
+avec sous-échantillonnage optionnel des données les plus anciennes. La
+mémoire reste constante quelle que soit la durée de l'exécution.
+"""
+
+import time
+from array import array
+from datetime import datetime
+
+class RingSeries:
+    """Série temporelle multi-colonnes à capacité fixe.
+
+    Quand la série est pleine, l'échantillon le plus ancien est écrasé. Si
+    ``downsample_factor`` et ``archive_capacity`` sont fournis, les
+    échantillons évincés sont moyennés par paquets de ``downsample_factor``
+    dans une série d'archive (elle-même circulaire).
+    """
+
+    def __init__(self, columns=('value',), capacity=3600, downsample_factor=None, archive_capacity=None):
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._values = {column: array('d', bytes(8 * capacity)) for column in self.columns}
+        self._start = 0
+        self._count = 0
+        self._sink = None
+
+        self.archive = None
+        self.downsample_factor = downsample_factor
+        if downsample_factor and downsample_factor > 1 and archive_capacity:
+            self.archive = RingSeries(self.columns, archive_capacity)
+            self._pending_count = 0
+            self._pending_timestamp = 0.0
+            self._pending_sums = dict.fromkeys(self.columns, 0.0)
+
+    def __len__(self):
+        return self._count
+
+    def attach(self, sink):
+        """Transmet chaque nouvel échantillon à ``sink(timestamp, values)`` (export en continu)"""
+        self._sink = sink
+
+    def _physical(self, index):
+        return (self._start + index) % self.capacity
+
+    def append(self, timestamp=None, **values):
+        """Ajoute un échantillon; les colonnes absentes valent NaN"""
+        if timestamp is None:
+            timestamp = time.time()
+
+        if self._count == self.capacity:
+            self._evict_oldest()
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = self._physical(self._count)
+            self._count += 1
+
+        self._timestamps[slot] = timestamp
+        for column in self.columns:
+            self._values[column][slot] = values.get(column, float('nan'))
+
+        if self._sink is not None:
+            self._sink(timestamp, values)
+
+    def _evict_oldest(self):
+        """Accumule l'échantillon évincé vers l'archive sous-échantillonnée"""
+        if self.archive is None:
+            return
+        slot = self._start
+        self._pending_timestamp += self._timestamps[slot]
+        for column in self.columns:
+            self._pending_sums[column] += self._values[column][slot]
+        self._pending_count += 1
+
+        if self._pending_count == self.downsample_factor:
+            n = self._pending_count
+            self.archive.append(
+                self._pending_timestamp / n,
+                **{column: total / n for column, total in self._pending_sums.items()}
+            )
+            self._pending_count = 0
+            self._pending_timestamp = 0.0
+            self._pending_sums = dict.fromkeys(self.columns, 0.0)
+
+    def timestamps(self):
+        """Horodatages (epoch) dans l'ordre chronologique"""
+        return [self._timestamps[self._physical(i)] for i in range(self._count)]
+
+    def column(self, name):
+        """Valeurs d'une colonne dans l'ordre chronologique"""
+        values = self._values[name]
+        return [values[self._physical(i)] for i in range(self._count)]
+
+    def latest(self, name=None):
+        """Dernière valeur d'une colonne (première colonne par défaut)"""
+        if self._count == 0:
+            return None
+        slot = self._physical(self._count - 1)
+        return self._values[name or self.columns[0]][slot]
+
+    def iter_records(self, include_archive=False):
+        """Parcourt les échantillons un par un (horodatage epoch), archive en premier"""
+        if include_archive and self.archive is not None:
+            yield from self.archive.iter_records()
+        for i in range(self._count):
+            slot = self._physical(i)
+            record = {'timestamp': self._timestamps[slot]}
+            for column in self.columns:
+                record[column] = self._values[column][slot]
+            yield record
+
+    def to_records(self, include_archive=False):
+        """Reconstruit les échantillons sous forme de dictionnaires (pour l'export)"""
+        records = []
+        for record in self.iter_records(include_archive):
+            record['timestamp'] = datetime.fromtimestamp(record['timestamp'])
+            records.append(record)
+        return records
+
+    def memory_bytes(self):
+        """Taille des colonnes allouées (archive comprise)"""
+        size = self._timestamps.itemsize * self.capacity * (len(self.columns) + 1)
+        if self.archive is not None:
+            size += self.archive.memory_bytes()
+        return size
+
+class MetricSeries(RingSeries):
+    """Série mono-valeur utilisable comme une liste bornée de floats.
+
+    Supporte ``append(valeur)``, ``len``, l'itération, l'indexation et les
+    tranches (``series[-5:]``), ce qui permet de remplacer directement les
+    listes de métriques existantes.
+    """
+
+    def __init__(self, capacity=3600, downsample_factor=None, archive_capacity=None):
+        super().__init__(('value',), capacity, downsample_factor, archive_capacity)
+
+    def append(self, value, timestamp=None):
+        super().append(timestamp, value=value)
+
+    def __iter__(self):
+        values = self._values['value']
+        for i in range(self._count):
+            yield values[self._physical(i)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index hors de la série")
+        return self._values['value'][self._physical(index)]
+
+    def __bool__(self):
+        return self._count > 0
@@ -7,13 +7,15 @@ Génère des changements d'état réalistes selon les spécifications de la thè
 
 import time
 import random
-import json
 import logging
 import threading
 from datetime import datetime, timedelta
 from enum import Enum
 import math
 
+from timeseries import RingSeries
+from metrics_export import write_jsonl_snapshot
+
 logger = logging.getLogger(__name__)
 
 class VehicleState(Enum):
@@ -34,6 +36,68 @@ class VehicleEvent(Enum):
     CHARGING_DISCONNECTED = "charging_disconnected"
     PARKING_INITIATED = "parking_initiated"
 
+WEATHER_CONDITIONS = ['sunny', 'cloudy', 'rainy', 'snowy']
+
+# Historique compact: états, événements et paramètres encodés en colonnes numériques
+STATE_CODES = list(VehicleState)
+EVENT_CODES = list(VehicleEvent)
+PARAMETER_COLUMNS = (
+    'speed', 'fuel_level', 'battery_level', 'engine_temp', 'gps_lat', 'gps_lon',
+    'gear', 'rpm', 'brake_pressure', 'steering_angle', 'outside_temp', 'weather',
+    'doors_locked', 'lights_on', 'ac_on', 'radio_on'
+)
+BOOLEAN_PARAMETERS = ('doors_locked', 'lights_on', 'ac_on', 'radio_on')
+
+# Probabilités de transition entre états (chaîne de Markov)
+TRANSITION_PROBABILITIES = {
+    VehicleState.PARKING: {
+        VehicleState.DRIVING: 0.6,
+        VehicleState.CHARGING: 0.25,
+        VehicleState.EMERGENCY: 0.05,
+        VehicleState.PARKING: 0.1
+    },
+    VehicleState.DRIVING: {
+        VehicleState.PARKING: 0.4,
+        VehicleState.EMERGENCY: 0.1,
+        VehicleState.CHARGING: 0.05,
+        VehicleState.DRIVING: 0.45
+    },
+    VehicleState.CHARGING: {
+        VehicleState.PARKING: 0.7,
+        VehicleState.DRIVING: 0.2,
+        VehicleState.EMERGENCY: 0.05,
+        VehicleState.CHARGING: 0.05
+    },
+    VehicleState.EMERGENCY: {
+        VehicleState.PARKING: 0.6,
+        VehicleState.DRIVING: 0.2,
+        VehicleState.CHARGING: 0.1,
+        VehicleState.EMERGENCY: 0.1
+    }
+}
+
+# Ajustements contextuels des transitions (voir _choose_next_state)
+LOW_FUEL_LEVEL = 20  # %
+LOW_BATTERY_LEVEL = 30  # %
+CHARGING_BOOST = 2
+HIGH_SPEED = 100  # km/h
+EMERGENCY_BOOST = 1.5
+
+def adjust_transition_probabilities(probabilities, fuel_level=100.0, battery_level=100.0, speed=0.0):
+    """Probabilités de transition ajustées au contexte du véhicule et normalisées"""
+    adjusted_probs = dict(probabilities)
+    
+    # Favoriser le charging si batterie et carburant faibles
+    if fuel_level < LOW_FUEL_LEVEL and battery_level < LOW_BATTERY_LEVEL:
+        adjusted_probs[VehicleState.CHARGING] *= CHARGING_BOOST
+    
+    # Plus de risque d'urgence à haute vitesse
+    if speed > HIGH_SPEED:
+        adjusted_probs[VehicleState.EMERGENCY] *= EMERGENCY_BOOST
+    
+    total = sum(adjusted_probs.values())
+    return {state: prob / total for state, prob in adjusted_probs.items()}
+
 class VehicleParameters:
     """Paramètres du véhicule simulé"""
     
@@ -53,7 +117,7 @@ class VehicleParameters:
         
         # Paramètres environnementaux
         self.outside_temp = random.uniform(-5, 35)  # °C
-        self.weather = random.choice(['sunny', 'cloudy', 'rainy', 'snowy'])
+        self.weather = random.choice(WEATHER_CONDITIONS)
         self.time_of_day = 'day'  # day/night
         
         # État des systèmes
@@ -65,42 +129,28 @@ class VehicleParameters:
 class VehicleSimulator:
     """Simulateur principal du véhicule"""
     
-    def __init__(self, change_interval=10):
+    def __init__(self, change_interval=10, history_capacity=10000, exporter=None, clock=time.time):
         self.current_state = VehicleState.PARKING
+        self.clock = clock  # Horodatage des historiques (horloge virtuelle en simulation)
         self.parameters = VehicleParameters()
         self.change_interval = change_interval  # secondes
         self.running = False
         
-        self.state_history = []
-        self.event_history = []
+        # Historiques bornés (tampons circulaires à colonnes numériques)
+        self.state_history = RingSeries(('old_state', 'new_state') + PARAMETER_COLUMNS,
+                                        capacity=history_capacity)
+        self.event_history = RingSeries(('event', 'state') + PARAMETER_COLUMNS,
+                                        capacity=history_capacity)
+        # Export en continu (codes numériques, voir STATE_CODES / EVENT_CODES)
+        self.exporter = exporter
+        if exporter is not None:
+            self.state_history.attach(exporter.sink('state'))
+            self.event_history.attach(exporter.sink('event'))
         self.listeners = []  # Callbacks pour les changements d'état
         
-        # Probabilités de transition entre états
+        # Probabilités de transition entre états (copie modifiable par instance)
         self.transition_probabilities = {
-            VehicleState.PARKING: {
-                VehicleState.DRIVING: 0.6,
-                VehicleState.CHARGING: 0.25,
-                VehicleState.EMERGENCY: 0.05,
-                VehicleState.PARKING: 0.1
-            },
-            VehicleState.DRIVING: {
-                VehicleState.PARKING: 0.4,
-                VehicleState.EMERGENCY: 0.1,
-                VehicleState.CHARGING: 0.05,
-                VehicleState.DRIVING: 0.45
-            },
-            VehicleState.CHARGING: {
-                VehicleState.PARKING: 0.7,
-                VehicleState.DRIVING: 0.2,
-                VehicleState.EMERGENCY: 0.05,
-                VehicleState.CHARGING: 0.05
-            },
-            VehicleState.EMERGENCY: {
-                VehicleState.PARKING: 0.6,
-                VehicleState.DRIVING: 0.2,
-                VehicleState.CHARGING: 0.1,
-                VehicleState.EMERGENCY: 0.1
-            }
+            state: dict(probabilities) for state, probabilities in TRANSITION_PROBABILITIES.items()
         }
         
     def add_state_listener(self, callback):
@@ -171,36 +221,23 @@ class VehicleSimulator:
         possible_events = events_by_state.get(self.current_state, [])
         if possible_events and random.random() < 0.3:  # 30% chance d'événement
             event = random.choice(possible_events)
-            self.event_history.append({
-                'timestamp': datetime.now(),
-                'event': event.value,
-                'state': self.current_state.value,
-                'parameters': self._get_current_parameters_dict()
-            })
+            self.event_history.append(
+                self.clock(),
+                event=EVENT_CODES.index(event),
+                state=STATE_CODES.index(self.current_state),
+                **self._encode_parameters()
+            )
             logger.info(f"🎯 Événement généré: {event.value} en état {self.current_state.value}")
             return event
         return None
     
     def _choose_next_state(self):
         """Choisit le prochain état selon les probabilités de transition"""
-        probabilities = self.transition_probabilities[self.current_state]
-        
         # Ajustements contextuels des probabilités
-        adjusted_probs = probabilities.copy()
-        
-        # Facteurs influençant les transitions
-        if self.parameters.fuel_level < 20 and self.parameters.battery_level < 30:
-            # Favoriser le charging si batterie et carburant faibles
-            adjusted_probs[VehicleState.CHARGING] *= 2
-            
-        if self.parameters.speed > 100:
-            # Plus de risque d'urgence à haute vitesse
-            adjusted_probs[VehicleState.EMERGENCY] *= 1.5
-            
-        # Normaliser les probabilités
-        total = sum(adjusted_probs.values())
-        for state in adjusted_probs:
-            adjusted_probs[state] /= total
+        adjusted_probs = adjust_transition_probabilities(
+            self.transition_probabilities[self.current_state],
+            self.parameters.fuel_level, self.parameters.battery_level, self.parameters.speed
+        )
         
         # Sélection aléatoire pondérée
         rand = random.random()
@@ -232,6 +269,70 @@ class VehicleSimulator:
             'radio_on': self.parameters.radio_on
         }
     
+    def _encode_parameters(self):
+        """Paramètres actuels sous forme de colonnes numériques"""
+        p = self.parameters
+        return {
+            'speed': p.speed,
+            'fuel_level': p.fuel_level,
+            'battery_level': p.battery_level,
+            'engine_temp': p.engine_temp,
+            'gps_lat': p.gps_coords[0],
+            'gps_lon': p.gps_coords[1],
+            'gear': p.gear,
+            'rpm': p.rpm,
+            'brake_pressure': p.brake_pressure,
+            'steering_angle': p.steering_angle,
+            'outside_temp': p.outside_temp,
+            'weather': WEATHER_CONDITIONS.index(p.weather),
+            'doors_locked': p.doors_locked,
+            'lights_on': p.lights_on,
+            'ac_on': p.ac_on,
+            'radio_on': p.radio_on
+        }
+    
+    @staticmethod
+    def _decode_parameters(record):
+        """Reconstruit le dictionnaire de paramètres d'un enregistrement d'historique"""
+        parameters = {}
+        for column in PARAMETER_COLUMNS:
+            if column in ('gps_lat', 'gps_lon'):
+                continue
+            value = record[column]
+            if column == 'weather':
+                value = WEATHER_CONDITIONS[int(value)]
+            elif column in BOOLEAN_PARAMETERS:
+                value = bool(value)
+            elif column in ('gear', 'rpm'):
+                value = int(value)
+            parameters[column] = value
+        parameters['gps_coords'] = [record['gps_lat'], record['gps_lon']]
+        return parameters
+    
+    def get_state_history(self):
+        """Historique des changements d'état, décodé en dictionnaires"""
+        return [
+            {
+                'timestamp': record['timestamp'],
+                'old_state': STATE_CODES[int(record['old_state'])].value,
+                'new_state': STATE_CODES[int(record['new_state'])].value,
+                'parameters': self._decode_parameters(record)
+            }
+            for record in self.state_history.to_records()
+        ]
+    
+    def get_event_history(self):
+        """Historique des événements, décodé en dictionnaires"""
+        return [
+            {
+                'timestamp': record['timestamp'],
+                'event': EVENT_CODES[int(record['event'])].value,
+                'state': STATE_CODES[int(record['state'])].value,
+                'parameters': self._decode_parameters(record)
+            }
+            for record in self.event_history.to_records()
+        ]
+    
     def change_state(self, new_state=None):
         """Change l'état du véhicule"""
         old_state = self.current_state
@@ -244,13 +345,12 @@ class VehicleSimulator:
             self._update_parameters_for_state(new_state)
             
             # Enregistrer le changement
-            state_change = {
-                'timestamp': datetime.now(),
-                'old_state': old_state.value,
-                'new_state': new_state.value,
-                'parameters': self._get_current_parameters_dict()
-            }
-            self.state_history.append(state_change)
+            self.state_history.append(
+                self.clock(),
+                old_state=STATE_CODES.index(old_state),
+                new_state=STATE_CODES.index(new_state),
+                **self._encode_parameters()
+            )
             
             logger.info(f"🚗 État changé: {old_state.value} → {new_state.value}")
             
@@ -343,24 +443,28 @@ class VehicleSimulator:
         logger.info(" Simulation véhicule arrêtée")
     
     def export_history(self, filename=None):
-        """Exporte l'historique de simulation"""
+        """Exporte l'historique de simulation (JSON Lines, un enregistrement par ligne)"""
+        if self.exporter is not None:
+            self.exporter.flush()
         if not filename:
-            filename = f"/tmp/vehicle_simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"/tmp/vehicle_simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
         
-        export_data = {
-            'simulation_info': {
-                'start_time': getattr(self, '_start_time', time.time()),
-                'duration': time.time() - getattr(self, '_start_time', time.time()),
-                'change_interval': self.change_interval
-            },
-            'state_history': self.state_history,
-            'event_history': self.event_history,
-            'final_state': self.get_vehicle_status()
+        simulation_info = {
+            'start_time': getattr(self, '_start_time', time.time()),
+            'duration': time.time() - getattr(self, '_start_time', time.time()),
+            'change_interval': self.change_interval
         }
         
+        def records():
+            yield {'stream': 'simulation_info', **simulation_info}
+            for record in self.get_state_history():
+                yield {'stream': 'state', **record}
+            for record in self.get_event_history():
+                yield {'stream': 'event', **record}
+            yield {'stream': 'final_state', **self.get_vehicle_status()}
+        
         try:
-            with open(filename, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+            write_jsonl_snapshot(filename, records())
             logger.info(f"Historique véhicule exporté vers: {filename}")
             return filename
         except Exception as e:
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Warm Pool - SDV Testbench
+Deployments en attente pour les transitions d'état : les applications
+requises par les états suivants les plus probables (state_predictor.py) sont
+pré-créées avant le changement d'état, dans le budget réseau TAS : la bande
+passante des pods démarrés (``hot``) est réservée avant le placement.
+
+Deux modes d'attente :
+- ``hot`` (applications critiques) : pod démarré et Ready, Deployment marqué
+  ``axil-role=standby``. L'activation ne change que ce label, le pod n'est
+  pas recréé : la transition ne coûte qu'un appel API.
+- ``scaled`` : Deployment à zéro réplica. L'activation repasse à une
+  réplica ; ordonnancement et démarrage du conteneur restent sur le chemin
+  critique, mais plus la création de l'objet.
+"""
+
+import logging
+import threading
+
+from state_predictor import MarkovPredictor
+
+logger = logging.getLogger(__name__)
+
+# Label de rôle porté par tous les Deployments AXIL
+ROLE_LABEL = 'axil-role'
+ROLE_ACTIVE = 'active'
+ROLE_STANDBY = 'standby'
+
+# Applications safety gardées démarrées (transition < 1 s)
+CRITICAL_APPS = ('emergency-brake', 'airbag-control')
+
+class WarmPool:
+    """Choix et suivi des Deployments en attente.
+
+    Une application est mise en attente si elle n'est pas requise dans
+    l'état courant et si la probabilité, donnée par ``predictor``, qu'un
+    état qui la requiert soit le prochain dépasse ``threshold``. Les
+    applications critiques atteignables sont retenues en premier, en mode
+    ``hot`` ; les autres le sont par probabilité décroissante, en mode
+    ``scaled``. Seuls les pods ``hot`` utilisent de la bande passante TAS :
+    ``reserved_bandwidth`` la donne au placement, qui la retire du budget
+    avant de choisir le plan. Au plus ``max_standby``
+    applications sont gardées en attente. Les pods ``hot`` consomment
+    leurs requêtes CPU/mémoire sur le nœud.
+    """
+
+    def __init__(self, app_manager, predictor=None, threshold=0.1, max_standby=6,
+                 critical_apps=CRITICAL_APPS):
+        self.app_manager = app_manager
+        self.predictor = predictor or MarkovPredictor()
+        self.threshold = threshold
+        self.max_standby = max_standby
+        self.critical_apps = set(critical_apps)
+        self._standby = {}  # nom du Deployment -> mode
+        self._lock = threading.Lock()
+
+    def candidates(self, current_state, parameters=None, bandwidth_budget=None):
+        """Applications à garder en attente: liste de (zone, app_config, mode, probabilité).
+
+        ``bandwidth_budget`` (Mbps) est la marge TAS laissée par le plan
+        courant. Seules les applications ``hot`` y sont décomptées ; une
+        application critique qui n'y tient pas n'est pas retenue. Les
+        Deployments ``scaled`` (zéro réplica) n'en consomment pas.
+        """
+        required = {
+            app_name
+            for app_names in self.app_manager.get_apps_for_state(current_state).values()
+            for app_name in app_names
+        }
+
+        scores = {}
+        for next_state, probability in self.predictor.next_state_probabilities(current_state, parameters).items():
+            if next_state == current_state:
+                continue
+            for zone, app_config in self.app_manager.get_candidates_for_state(next_state):
+                if app_config['name'] in required:
+                    continue
+                entry = scores.setdefault(app_config['name'], [0.0, zone, app_config])
+                entry[0] += probability
+
+        selected = []
+        for probability, zone, app_config in scores.values():
+            critical = app_config['name'] in self.critical_apps
+            if critical or probability >= self.threshold:
+                selected.append((zone, app_config, 'hot' if critical else 'scaled', probability))
+
+        # Critiques d'abord, puis par probabilité et priorité, dans la marge TAS
+        selected.sort(key=lambda c: (c[2] != 'hot', -c[3], c[1]['global_ux_value']))
+        if bandwidth_budget is None:
+            return selected[:self.max_standby]
+
+        retained = []
+        for candidate in selected:
+            if len(retained) == self.max_standby:
+                break
+            if candidate[2] == 'hot':
+                bandwidth = candidate[1]['bandwidth']
+                if bandwidth > bandwidth_budget + 1e-9:
+                    continue
+                bandwidth_budget -= bandwidth
+            retained.append(candidate)
+        return retained
+
+    def reserved_bandwidth(self, current_state, parameters=None):
+        """Bande passante TAS (Mbps) des applications critiques à garder démarrées,
+        à réserver avant le placement du plan de ``current_state``"""
+        return sum(
+            app_config['bandwidth']
+            for _, app_config, mode, _ in self.candidates(current_state, parameters) if mode == 'hot'
+        )
+
+    def mark_standby(self, deployment_name, mode):
+        with self._lock:
+            self._standby[deployment_name] = mode
+
+    def pop_standby(self, deployment_name):
+        """Mode d'attente d'un Deployment activé (None s'il n'était pas en attente)"""
+        with self._lock:
+            return self._standby.pop(deployment_name, None)
+
+    def forget(self, deployment_name):
+        with self._lock:
+            self._standby.pop(deployment_name, None)
+
+    def standby_count(self):
+        with self._lock:
+            return len(self._standby)
@@ -53,6 +53,9 @@ build_image "docker/Dockerfile.comfort" "sdv-comfort" "Comfort Applications"
 # Image Infotainment
 build_image "docker/Dockerfile.infotainment" "sdv-infotainment" "Infotainment Applications"
 
+# Image Hôte multi-applications
+build_image "docker/Dockerfile.host" "sdv-host" "Multi-App Host"
+
 echo ""
 echo -e "${GREEN}=== Build Summary ===${NC}"
 docker images | grep -E "(sdv-|REPOSITORY)" | head -10
@@ -64,6 +67,7 @@ echo "Available images:"
 echo "  • ${REGISTRY_PREFIX}/sdv-safety:${TAG}"
 echo "  • ${REGISTRY_PREFIX}/sdv-comfort:${TAG}"  
 echo "  • ${REGISTRY_PREFIX}/sdv-infotainment:${TAG}"
+echo "  • ${REGISTRY_PREFIX}/sdv-host:${TAG}"
 echo ""
 echo "Usage examples:"
 echo "  # Test locally with docker-compose"
@@ -79,7 +83,7 @@ echo "  docker push ${REGISTRY_PREFIX}/sdv-safety:${TAG}"
 echo ""
 echo -e "${YELLOW}Quick test of built images...${NC}"
 
-for image in "sdv-safety" "sdv-comfort" "sdv-infotainment"; do
+for image in "sdv-safety" "sdv-comfort" "sdv-infotainment" "sdv-host"; do
     echo -n "Testing $image: "
     if docker run --rm -e APP_NAME=test ${image}:${TAG} python3 -c "print('OK')" &>/dev/null; then
         echo -e "${GREEN}✓${NC}"
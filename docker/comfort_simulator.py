@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 """
 SDV Comfort Application Simulator
-Simule les applications de confort et commodité véhicule
+Simule les applications de confort et commodité véhicule, en boucle
+périodique à échéances absolues (rt_loop.py)
 """
 
 import os
 import time
 import random
+import signal
 import threading
 from datetime import datetime
 
+from rt_loop import PeriodicTask
+from event_log import get_event_log
+from sensor_model import SensorModel
+from sensor_trace import replay_trace
+
 class ComfortAppSimulator:
+    # Plages des capteurs de confort (autres capteurs: valeur normalisée 0-1)
+    SENSOR_RANGES = {
+        'interior_temp': (15, 30),  # °C
+        'exterior_temp': (-10, 40),  # °C
+        'humidity': (30, 80),  # %
+        'ambient_light': (0, 100),  # lux
+        'seat_position': (0, 100),  # % position
+        'ultrasonic_sensors': (0.1, 5.0, 8)  # distance aux obstacles (parking), mètres × 8
+    }
+    
     def __init__(self, app_name):
         self.app_name = app_name
         self.running = False
@@ -61,27 +78,16 @@ class ComfortAppSimulator:
             'update_interval_ms': 1000,
             'priority': 'medium'
         })
+        self.task = None
+        self.trace = None
+        self.log = get_event_log()
+        seed = os.environ.get('SDV_SENSOR_SEED')
+        self.sensor_model = SensorModel(self.config.get('sensors', []), self.SENSOR_RANGES,
+                                        seed=int(seed) if seed else None)
         
     def simulate_sensors(self):
-        """Simule les données des capteurs de confort"""
-        sensor_data = {}
-        for sensor in self.config.get('sensors', []):
-            if sensor == 'interior_temp':
-                sensor_data[sensor] = random.uniform(15, 30)  # °C
-            elif sensor == 'exterior_temp':
-                sensor_data[sensor] = random.uniform(-10, 40)  # °C
-            elif sensor == 'humidity':
-                sensor_data[sensor] = random.uniform(30, 80)  # %
-            elif sensor == 'ambient_light':
-                sensor_data[sensor] = random.uniform(0, 100)  # lux
-            elif sensor == 'seat_position':
-                sensor_data[sensor] = random.uniform(0, 100)  # % position
-            elif sensor == 'ultrasonic_sensors':
-                # Distance aux obstacles (parking)
-                sensor_data[sensor] = [random.uniform(0.1, 5.0) for _ in range(8)]  # mètres
-            else:
-                sensor_data[sensor] = random.uniform(0, 1)  # valeur normalisée
-        return sensor_data
+        """Simule les données des capteurs de confort (lectures tirées par blocs, voir sensor_model.py)"""
+        return self.sensor_model.read()
     
     def process_comfort_logic(self, sensor_data):
         """Traite la logique de confort selon l'application"""
@@ -122,48 +128,66 @@ class ComfortAppSimulator:
     
     def run(self):
         """Boucle principale de simulation"""
+        self.start()
+        self.task.run(self.cycle)
+    
+    def start(self):
+        """Démarrage de l'application sans la boucle (tâche périodique prête, voir sdv_host.py)"""
         self.running = True
         self.metrics['start_time'] = datetime.now()
+        self.start_ns = time.monotonic_ns()
         
         print(f"[{datetime.now()}] Starting {self.app_name} comfort application")
         print(f"[{datetime.now()}] Priority: {self.config.get('priority', 'unknown')}")
         print(f"[{datetime.now()}] Update interval: {self.config.get('update_interval_ms', 0)}ms")
         
-        update_interval = self.config.get('update_interval_ms', 1000) / 1000.0
+        # Rejeu d'une trace enregistrée (SDV_TRACE): lectures et cadence de la trace
+        period_ms = self.period_ms()
+        self.trace = replay_trace(self.app_name, self.sensor_model, on_end=self.stop)
+        if self.trace is not None:
+            period_ms = self.trace.period_ms
+            print(f"[{datetime.now()}] Replay: {self.trace.path} ({len(self.trace)} records, "
+                  f"speed x{self.trace.speed:g})")
+        # Premier bloc de lectures tiré avant la première échéance
+        self.sensor_model.fill()
+        
+        # Respecter l'intervalle de mise à jour (échéances absolues)
+        self.task = PeriodicTask(self.app_name, int(period_ms * 1_000_000))
+    
+    def period_ms(self):
+        return self.config.get('update_interval_ms', 1000)
+    
+    def cycle(self):
+        """Une activation: capteurs, logique de confort, requêtes utilisateur"""
+        # Simulation des capteurs
+        sensor_data = self.simulate_sensors()
+        
+        # Traitement de la logique de confort
+        actions = self.process_comfort_logic(sensor_data)
         
-        while self.running:
-            cycle_start = time.time()
-            
-            # Simulation des capteurs
-            sensor_data = self.simulate_sensors()
-            
-            # Traitement de la logique de confort
-            actions = self.process_comfort_logic(sensor_data)
-            
-            if actions:
-                self.metrics['adjustments'] += 1
-                for action in actions:
-                    print(f"[{datetime.now()}] {self.app_name}: 🔧 {action}")
-            
-            # Simulation de requêtes utilisateur
-            if random.random() < 0.01:  # 1% chance de requête utilisateur
-                self.metrics['user_requests'] += 1
-                print(f"[{datetime.now()}] {self.app_name}:  USER_REQUEST_PROCESSED")
-            
-            # Affichage statut normal périodique
-            if self.metrics['cycles'] % 30 == 0:  # Toutes les 30 cycles
-                uptime = (datetime.now() - self.metrics['start_time']).total_seconds()
-                print(f"[{datetime.now()}] {self.app_name}:  Operating normally - "
-                      f"Cycle {self.metrics['cycles']}, Uptime: {uptime:.1f}s, "
-                      f"Adjustments: {self.metrics['adjustments']}, User requests: {self.metrics['user_requests']}")
-            
-            self.metrics['cycles'] += 1
-            
-            # Respecter l'intervalle de mise à jour
-            cycle_time = time.time() - cycle_start
-            sleep_time = max(0, update_interval - cycle_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        if actions:
+            self.metrics['adjustments'] += 1
+            for action in actions:
+                self.log.emit(self.app_name, "🔧 {}", action)
+        
+        # Simulation de requêtes utilisateur
+        if random.random() < 0.01:  # 1% chance de requête utilisateur
+            self.metrics['user_requests'] += 1
+            self.log.emit(self.app_name, " USER_REQUEST_PROCESSED")
+        
+        # Affichage statut normal périodique (formaté par le thread d'écriture)
+        if self.metrics['cycles'] % 30 == 0:  # Toutes les 30 cycles
+            self.log.emit(self.app_name, " Operating normally - Cycle {}, Uptime: {:.1f}s, "
+                          "Adjustments: {}, User requests: {}",
+                          self.metrics['cycles'], (time.monotonic_ns() - self.start_ns) / 1e9,
+                          self.metrics['adjustments'], self.metrics['user_requests'])
+        
+        self.metrics['cycles'] += 1
+    
+    def stop(self):
+        self.running = False
+        if self.task is not None:
+            self.task.stop()
 
 if __name__ == '__main__':
     app_name = os.environ.get('APP_NAME', 'climate-control')
@@ -177,15 +201,24 @@ if __name__ == '__main__':
     print("="*50)
     
     simulator = ComfortAppSimulator(app_name)
+    # Arrêt du pod (SIGTERM) ou fin d'une trace rejouée: fin du cycle en cours puis bilan
+    signal.signal(signal.SIGTERM, lambda signum, frame: simulator.stop())
     
     try:
         simulator.run()
     except KeyboardInterrupt:
-        print(f"\n[{datetime.now()}] {app_name} shutting down...")
-        uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
-        print(f"[{datetime.now()}] Final metrics:")
-        print(f"  • Uptime: {uptime:.1f}s")
-        print(f"  • Cycles: {simulator.metrics['cycles']}")
-        print(f"  • Adjustments: {simulator.metrics['adjustments']}")
-        print(f"  • User requests: {simulator.metrics['user_requests']}")
-        simulator.running = False 
\ No newline at end of file
+        simulator.stop()
+    
+    # Derniers événements en attente, puis bilan en écriture directe
+    simulator.log.close()
+    print(f"\n[{datetime.now()}] {app_name} shutting down...")
+    uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
+    print(f"[{datetime.now()}] Final metrics:")
+    print(f"  • Uptime: {uptime:.1f}s")
+    print(f"  • Cycles: {simulator.metrics['cycles']}")
+    print(f"  • Adjustments: {simulator.metrics['adjustments']}")
+    print(f"  • User requests: {simulator.metrics['user_requests']}")
+    log_stats = simulator.log.stats()
+    print(f"  • Log events: {log_stats['written']}/{log_stats['emitted']} written "
+          f"(sampled out: {log_stats['sampled_out']}, rate limited: {log_stats['rate_limited']}, "
+          f"dropped: {log_stats['dropped']})")
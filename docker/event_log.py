@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+SDV Event Log
+Journal d'événements des simulateurs SDV hors du chemin temps réel : le
+cycle ne fait qu'empiler un enregistrement de forme fixe (horodatage ns,
+niveau, application, gabarit, arguments) dans un tampon borné ; le
+formatage (date, gabarit) et l'écriture sur la sortie standard sont faits
+par lots par un thread d'écriture en arrière-plan.
+
+Échantillonnage des événements ordinaires et limitation de débit par
+application configurables ; les enregistrements écartés (échantillonnage,
+débit, tampon plein) sont comptés et résumés dans le journal. Les travaux
+bloquants des boucles (bilans RT_STATS/HOST_STATS, fichiers de
+statistiques) sont confiés au même thread (``defer``).
+
+Variables d'environnement :
+    SDV_LOG_SAMPLE    fraction des événements ``info`` conservés (1.0)
+    SDV_LOG_RATE      événements/s par application, 0 = illimité (0)
+    SDV_LOG_FLUSH_MS  période d'écriture des lots (200)
+    SDV_LOG_BUFFER    capacité du tampon en enregistrements (10000)
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from collections import deque
+from datetime import datetime
+
+INFO = 'info'
+ALERT = 'alert'
+
+class EventLog:
+    """Journal asynchrone par lots.
+
+    ``emit`` est appelé depuis les boucles périodiques : décision
+    d'échantillonnage et de débit puis ``deque.append`` (atomique, sans
+    verrou), rien d'autre. Le thread d'écriture vide le tampon toutes les
+    ``flush_ms`` (plus tôt si un lot complet est en attente) et écrit le lot
+    en un seul appel. Il est créé avant le passage éventuel en SCHED_FIFO
+    du thread principal et reste donc en ordonnancement normal.
+
+    Les événements ``alert`` ne sont jamais échantillonnés, seulement
+    limités en débit. Après ``close``, les enregistrements sont écrits
+    directement (bilans d'arrêt), et les travaux ``defer`` exécutés sur
+    place.
+    """
+
+    def __init__(self, stream=None, sample=1.0, rate=0, flush_ms=200, capacity=10000, batch_size=256):
+        self.stream = stream or sys.stdout
+        self.sample = sample
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self.flush_s = flush_ms / 1000
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.counters = {'emitted': 0, 'written': 0, 'sampled_out': 0, 'rate_limited': 0, 'dropped': 0}
+        self._suppressed = {}
+        self._buckets = {}
+        # Générateur propre: l'échantillonnage ne décale pas la séquence aléatoire des simulateurs
+        self._random = random.Random()
+        self._closed = False
+        self._start_writer()
+
+    def _start_writer(self):
+        self._buffer = deque()
+        self._jobs = deque()
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._run, name='sdv-event-log', daemon=True)
+        self._writer.start()
+
+    def emit(self, app, template, *args, level=INFO):
+        """Enregistre ``template.format(*args)`` pour ``app`` (formaté plus tard par le thread d'écriture)"""
+        self.counters['emitted'] += 1
+        if level == INFO and self.sample < 1.0 and self._random.random() >= self.sample:
+            self.counters['sampled_out'] += 1
+            return
+        if self.rate and not self._take_token(app):
+            self.counters['rate_limited'] += 1
+            self._suppressed[app] = self._suppressed.get(app, 0) + 1
+            return
+        record = (time.time_ns(), level, app, template, args)
+        if self._closed:
+            self._write([record])
+            return
+        if len(self._buffer) >= self.capacity:
+            self.counters['dropped'] += 1
+            return
+        self._buffer.append(record)
+        if len(self._buffer) == self.batch_size:
+            self._wake.set()
+
+    def defer(self, job, *args):
+        """Exécute ``job(*args)`` dans le thread d'écriture, avant le lot suivant"""
+        if self._closed:
+            job(*args)
+            return
+        if len(self._jobs) >= self.capacity:
+            self.counters['dropped'] += 1
+            return
+        self._jobs.append((job, args))
+        self._wake.set()
+
+    def line(self, template, *args):
+        """Ligne brute sans horodatage ni application (RT_STATS, HOST_STATS)"""
+        self.emit(None, template, *args, level=ALERT)
+
+    def _take_token(self, app):
+        """Seau à jetons par application: ``rate`` jetons/s, rafale de ``burst``"""
+        now = time.monotonic_ns()
+        bucket = self._buckets.get(app)
+        if bucket is None:
+            bucket = self._buckets[app] = [self.burst, now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate / 1e9)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1.0
+        return True
+
+    def _format(self, record):
+        timestamp_ns, level, app, template, args = record
+        message = template.format(*args) if args else template
+        if app is None:
+            return f"{message}\n"
+        return f"[{datetime.fromtimestamp(timestamp_ns / 1e9)}] {app}: {message}\n"
+
+    def _write(self, records):
+        lines = [self._format(record) for record in records]
+        if self._suppressed:
+            suppressed, self._suppressed = self._suppressed, {}
+            lines.extend(f"[{datetime.now()}] {app}: {count} events suppressed (rate limit)\n"
+                         for app, count in suppressed.items() if app is not None)
+        try:
+            self.stream.write(''.join(lines))
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Sortie fermée (arrêt du conteneur): le lot est perdu, pas le cycle
+            self.counters['dropped'] += len(records)
+            return
+        self.counters['written'] += len(records)
+
+    def _run_jobs(self):
+        jobs = self._jobs
+        while jobs:
+            job, args = jobs.popleft()
+            try:
+                job(*args)
+            except Exception as e:
+                # Un bilan en échec ne doit pas arrêter le thread d'écriture
+                self._buffer.append((time.time_ns(), ALERT, None, "deferred job failed: {!r}", (e,)))
+
+    def _drain(self):
+        self._run_jobs()
+        records = []
+        buffer = self._buffer
+        while buffer:
+            records.append(buffer.popleft())
+        if records or self._suppressed:
+            self._write(records)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self._drain()
+
+    def flush(self):
+        """Écrit immédiatement les enregistrements en attente (hors boucle temps réel)"""
+        self._wake.set()
+        while (self._buffer or self._jobs) and self._writer.is_alive():
+            time.sleep(0.001)
+
+    def close(self):
+        """Arrête le thread d'écriture après le dernier lot; les émissions suivantes sont synchrones"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=2)
+        self._drain()
+
+    def stats(self):
+        return {**self.counters, 'pending': len(self._buffer) + len(self._jobs)}
+
+    def _after_fork(self):
+        # Le thread d'écriture n'existe pas dans l'enfant d'un fork (sdv_host.py --split)
+        self.counters = dict.fromkeys(self.counters, 0)
+        self._suppressed = {}
+        self._buckets = {}
+        if not self._closed:
+            self._start_writer()
+
+_instance = None
+_instance_lock = threading.Lock()
+
+def get_event_log():
+    """Journal partagé du processus (un seul thread d'écriture pour toutes les applications)"""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = EventLog(
+                sample=float(os.environ.get('SDV_LOG_SAMPLE', 1.0)),
+                rate=float(os.environ.get('SDV_LOG_RATE', 0)),
+                flush_ms=float(os.environ.get('SDV_LOG_FLUSH_MS', 200)),
+                capacity=int(os.environ.get('SDV_LOG_BUFFER', 10000))
+            )
+        return _instance
+
+def _reinit_after_fork():
+    global _instance_lock
+    _instance_lock = threading.Lock()
+    if _instance is not None:
+        _instance._after_fork()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
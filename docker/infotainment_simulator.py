@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 """
 SDV Infotainment Application Simulator
-Simule les applications d'entertainment et d'information véhicule
+Simule les applications d'entertainment et d'information véhicule, en
+boucle périodique à échéances absolues (rt_loop.py)
 """
 
 import os
 import time
 import random
+import signal
 import threading
 from datetime import datetime
 
+from rt_loop import PeriodicTask
+from event_log import get_event_log
+from sensor_model import SensorModel
+from sensor_trace import replay_trace
+
 class InfotainmentAppSimulator:
+    # Entrées aléatoires de chaque cycle, tirées par blocs et enregistrables comme des capteurs
+    INPUTS = ('bandwidth_variation', 'user_activity', 'content_change')
+    SENSOR_RANGES = {
+        'bandwidth_variation': (0.8, 1.2),  # ±20% de la bande passante nominale
+        'user_activity': (0, 1),
+        'content_change': (0, 1)
+    }
+    
     def __init__(self, app_name):
         self.app_name = app_name
         self.running = False
@@ -68,6 +83,11 @@ class InfotainmentAppSimulator:
             'update_interval_ms': 1000,
             'priority': 'low'
         })
+        self.task = None
+        self.trace = None
+        self.log = get_event_log()
+        seed = os.environ.get('SDV_SENSOR_SEED')
+        self.sensor_model = SensorModel(self.INPUTS, self.SENSOR_RANGES, seed=int(seed) if seed else None)
         
     def simulate_content_processing(self):
         """Simule le traitement de contenu multimédia"""
@@ -120,12 +140,12 @@ class InfotainmentAppSimulator:
         
         return content_info
     
-    def process_user_interactions(self):
+    def process_user_interactions(self, user_activity):
         """Simule les interactions utilisateur"""
         interactions = []
         
         # Simulation d'interactions aléatoires
-        if random.random() < 0.05:  # 5% chance d'interaction
+        if user_activity < 0.05:  # 5% chance d'interaction
             if self.app_name in ['media-player', 'music-streaming']:
                 interactions.append(random.choice(['PLAY', 'PAUSE', 'NEXT_TRACK', 'VOLUME_CHANGE']))
             elif self.app_name == 'streaming-video':
@@ -139,11 +159,9 @@ class InfotainmentAppSimulator:
         
         return interactions
     
-    def calculate_bandwidth_usage(self):
-        """Calcule l'utilisation de bande passante"""
+    def calculate_bandwidth_usage(self, variation):
+        """Calcule l'utilisation de bande passante (variation aléatoire de ±20%)"""
         base_bandwidth = self.config.get('bandwidth_mbps', 1.0)
-        # Variation aléatoire de ±20%
-        variation = random.uniform(0.8, 1.2)
         current_bandwidth = base_bandwidth * variation
         
         # Conversion en MB pour les métriques
@@ -152,55 +170,74 @@ class InfotainmentAppSimulator:
     
     def run(self):
         """Boucle principale de simulation"""
+        self.start()
+        self.task.run(self.cycle)
+    
+    def start(self):
+        """Démarrage de l'application sans la boucle (tâche périodique prête, voir sdv_host.py)"""
         self.running = True
         self.metrics['start_time'] = datetime.now()
+        self.start_ns = time.monotonic_ns()
         
         print(f"[{datetime.now()}] Starting {self.app_name} infotainment application")
         print(f"[{datetime.now()}] Priority: {self.config.get('priority', 'unknown')}")
         print(f"[{datetime.now()}] Expected bandwidth: {self.config.get('bandwidth_mbps', 0)}Mbps")
         
-        update_interval = self.config.get('update_interval_ms', 1000) / 1000.0
-        
-        while self.running:
-            cycle_start = time.time()
-            
-            # Simulation du traitement de contenu
-            content_info = self.simulate_content_processing()
-            
-            # Calcul utilisation bande passante
-            bandwidth_mbps, data_mb = self.calculate_bandwidth_usage()
-            self.metrics['data_processed_mb'] += data_mb * update_interval
-            
-            # Traitement des interactions utilisateur
-            interactions = self.process_user_interactions()
-            
-            if interactions:
-                self.metrics['user_interactions'] += len(interactions)
-                for interaction in interactions:
-                    print(f"[{datetime.now()}] {self.app_name}: {interaction}")
-            
-            # Simulation de nouveau contenu
-            if random.random() < 0.02:  # 2% chance de nouveau contenu
-                self.metrics['content_played'] += 1
-                content_type = random.choice(self.config.get('content_types', ['content']))
-                print(f"[{datetime.now()}] {self.app_name}: 🎵 NEW_CONTENT_STARTED ({content_type})")
-            
-            # Affichage statut normal périodique
-            if self.metrics['cycles'] % 20 == 0:  # Toutes les 20 cycles
-                uptime = (datetime.now() - self.metrics['start_time']).total_seconds()
-                print(f"[{datetime.now()}] {self.app_name}: Streaming normally - "
-                      f"Cycle {self.metrics['cycles']}, Uptime: {uptime:.1f}s, "
-                      f"Bandwidth: {bandwidth_mbps:.1f}Mbps, "
-                      f"Data: {self.metrics['data_processed_mb']:.1f}MB, "
-                      f"Interactions: {self.metrics['user_interactions']}")
-            
-            self.metrics['cycles'] += 1
-            
-            # Respecter l'intervalle de mise à jour
-            cycle_time = time.time() - cycle_start
-            sleep_time = max(0, update_interval - cycle_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        # Rejeu d'une trace enregistrée (SDV_TRACE): entrées et cadence de la trace
+        period_ms = self.period_ms()
+        self.trace = replay_trace(self.app_name, self.sensor_model, on_end=self.stop)
+        if self.trace is not None:
+            period_ms = self.trace.period_ms
+            print(f"[{datetime.now()}] Replay: {self.trace.path} ({len(self.trace)} records, "
+                  f"speed x{self.trace.speed:g})")
+        # Premier bloc d'entrées tiré avant la première échéance
+        self.sensor_model.fill()
+        
+        # Respecter l'intervalle de mise à jour (échéances absolues); volumes en temps simulé
+        self.update_interval = self.period_ms() / 1000.0
+        self.task = PeriodicTask(self.app_name, int(period_ms * 1_000_000))
+    
+    def period_ms(self):
+        return self.config.get('update_interval_ms', 1000)
+    
+    def cycle(self):
+        """Une activation: contenu, bande passante, interactions utilisateur"""
+        inputs = self.sensor_model.read()
+        
+        # Simulation du traitement de contenu
+        content_info = self.simulate_content_processing()
+        
+        # Calcul utilisation bande passante
+        bandwidth_mbps, data_mb = self.calculate_bandwidth_usage(inputs['bandwidth_variation'])
+        self.metrics['data_processed_mb'] += data_mb * self.update_interval
+        
+        # Traitement des interactions utilisateur
+        interactions = self.process_user_interactions(inputs['user_activity'])
+        
+        if interactions:
+            self.metrics['user_interactions'] += len(interactions)
+            for interaction in interactions:
+                self.log.emit(self.app_name, "{}", interaction)
+        
+        # Simulation de nouveau contenu
+        if inputs['content_change'] < 0.02:  # 2% chance de nouveau contenu
+            self.metrics['content_played'] += 1
+            content_type = random.choice(self.config.get('content_types', ['content']))
+            self.log.emit(self.app_name, "🎵 NEW_CONTENT_STARTED ({})", content_type)
+        
+        # Affichage statut normal périodique (formaté par le thread d'écriture)
+        if self.metrics['cycles'] % 20 == 0:  # Toutes les 20 cycles
+            self.log.emit(self.app_name, "Streaming normally - Cycle {}, Uptime: {:.1f}s, "
+                          "Bandwidth: {:.1f}Mbps, Data: {:.1f}MB, Interactions: {}",
+                          self.metrics['cycles'], (time.monotonic_ns() - self.start_ns) / 1e9,
+                          bandwidth_mbps, self.metrics['data_processed_mb'], self.metrics['user_interactions'])
+        
+        self.metrics['cycles'] += 1
+    
+    def stop(self):
+        self.running = False
+        if self.task is not None:
+            self.task.stop()
 
 if __name__ == '__main__':
     app_name = os.environ.get('APP_NAME', 'media-player')
@@ -214,16 +251,25 @@ if __name__ == '__main__':
     print("="*50)
     
     simulator = InfotainmentAppSimulator(app_name)
+    # Arrêt du pod (SIGTERM) ou fin d'une trace rejouée: fin du cycle en cours puis bilan
+    signal.signal(signal.SIGTERM, lambda signum, frame: simulator.stop())
     
     try:
         simulator.run()
     except KeyboardInterrupt:
-        print(f"\n[{datetime.now()}] {app_name} shutting down...")
-        uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
-        print(f"[{datetime.now()}] Final metrics:")
-        print(f"  • Uptime: {uptime:.1f}s")
-        print(f"  • Cycles: {simulator.metrics['cycles']}")
-        print(f"  • Content played: {simulator.metrics['content_played']}")
-        print(f"  • User interactions: {simulator.metrics['user_interactions']}")
-        print(f"  • Data processed: {simulator.metrics['data_processed_mb']:.1f}MB")
-        simulator.running = False 
\ No newline at end of file
+        simulator.stop()
+    
+    # Derniers événements en attente, puis bilan en écriture directe
+    simulator.log.close()
+    print(f"\n[{datetime.now()}] {app_name} shutting down...")
+    uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
+    print(f"[{datetime.now()}] Final metrics:")
+    print(f"  • Uptime: {uptime:.1f}s")
+    print(f"  • Cycles: {simulator.metrics['cycles']}")
+    print(f"  • Content played: {simulator.metrics['content_played']}")
+    print(f"  • User interactions: {simulator.metrics['user_interactions']}")
+    print(f"  • Data processed: {simulator.metrics['data_processed_mb']:.1f}MB")
+    log_stats = simulator.log.stats()
+    print(f"  • Log events: {log_stats['written']}/{log_stats['emitted']} written "
+          f"(sampled out: {log_stats['sampled_out']}, rate limited: {log_stats['rate_limited']}, "
+          f"dropped: {log_stats['dropped']})")
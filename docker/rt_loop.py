@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+SDV Real-Time Loop
+Boucle périodique à échéances absolues pour les simulateurs SDV : les
+réveils sont calés sur une grille time.monotonic_ns (clock_nanosleep en
+TIMER_ABSTIME quand la libc l'expose), la période ne dérive donc pas avec
+la durée des cycles. Ordonnancement SCHED_FIFO optionnel, plusieurs tâches
+multiplexées dans un thread (Scheduler) ; histogrammes de gigue de réveil,
+de temps de réponse et de dépassement d'échéance.
+"""
+
+import os
+import time
+import errno
+import heapq
+import ctypes
+import bisect
+
+NS_PER_S = 1_000_000_000
+CLOCK_MONOTONIC = getattr(time, 'CLOCK_MONOTONIC', 1)
+TIMER_ABSTIME = 1
+
+# Bornes des histogrammes (µs)
+JITTER_BUCKETS_US = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+RESPONSE_BUCKETS_US = (100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000)
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+def _load_clock_nanosleep():
+    """clock_nanosleep de la libc du processus (glibc ou musl), ou None"""
+    try:
+        function = ctypes.CDLL(None, use_errno=True).clock_nanosleep
+    except (OSError, AttributeError):
+        return None
+    function.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(_Timespec), ctypes.POINTER(_Timespec)]
+    function.restype = ctypes.c_int
+    return function
+
+_clock_nanosleep = _load_clock_nanosleep()
+
+def sleep_until(deadline_ns):
+    """Attend l'instant absolu ``deadline_ns`` de l'horloge time.monotonic_ns"""
+    if _clock_nanosleep is not None:
+        request = _Timespec(deadline_ns // NS_PER_S, deadline_ns % NS_PER_S)
+        # Interrompu par un signal: on reprend sur la même échéance absolue
+        while _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(request), None) == errno.EINTR:
+            pass
+        return
+    remaining = deadline_ns - time.monotonic_ns()
+    if remaining > 0:
+        time.sleep(remaining / NS_PER_S)
+
+def request_realtime(priority):
+    """Passe le processus en SCHED_FIFO (priorité 1-99).
+
+    Retourne (accordé, détail) : refusé sans CAP_SYS_NICE ou hors Linux,
+    la boucle tourne alors en ordonnancement normal.
+    """
+    if not hasattr(os, 'sched_setscheduler'):
+        return False, "SCHED_FIFO non supporté sur cette plateforme"
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as e:
+        return False, f"SCHED_FIFO refusé ({e.strerror})"
+    return True, f"SCHED_FIFO priorité {priority}"
+
+def kernel_info():
+    """Version du noyau et présence de PREEMPT_RT (/sys/kernel/realtime)"""
+    try:
+        with open('/sys/kernel/realtime') as f:
+            preempt_rt = f.read().strip() == '1'
+    except OSError:
+        preempt_rt = 'PREEMPT_RT' in os.uname().version
+    return {'release': os.uname().release, 'preempt_rt': preempt_rt}
+
+class LatencyHistogram:
+    """Histogramme à bornes fixes (µs), avec moyenne et maximum"""
+
+    def __init__(self, buckets_us):
+        self.buckets_us = tuple(buckets_us)
+        self.counts = [0] * (len(self.buckets_us) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def observe(self, value_ns):
+        self.counts[bisect.bisect_left(self.buckets_us, value_ns / 1000)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.max_ns = max(self.max_ns, value_ns)
+
+    def percentile_us(self, q):
+        """Borne supérieure du seuil contenant le quantile ``q``, plafonnée au maximum observé"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets_us, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max_ns / 1000)
+        return self.max_ns / 1000
+
+    def to_dict(self):
+        labels = [f"le_{bound}" for bound in self.buckets_us] + ['inf']
+        return {
+            'count': self.count,
+            'mean_us': self.total_ns / self.count / 1000 if self.count else None,
+            'max_us': self.max_ns / 1000,
+            'p99_us': self.percentile_us(0.99),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+class PeriodicTask:
+    """Tâche périodique à échéances absolues.
+
+    La k-ième activation est fixée à départ + k × ``period_ns``, quelle que
+    soit la durée des cycles précédents. L'échéance (``deadline_ns``, la
+    période par défaut) est mesurée depuis l'activation prévue : un cycle
+    qui se termine après est une échéance manquée. Si l'activation suivante
+    est déjà passée, les périodes perdues sont sautées (pas de rafale de
+    rattrapage) et comptées.
+    """
+
+    def __init__(self, name, period_ns, deadline_ns=None):
+        self.name = name
+        self.period_ns = period_ns
+        self.deadline_ns = deadline_ns or period_ns
+        self.running = False
+        self.cycles = 0
+        self.misses = 0
+        self.skipped = 0
+        self.jitter = LatencyHistogram(JITTER_BUCKETS_US)
+        self.response = LatencyHistogram(RESPONSE_BUCKETS_US)
+        self.overrun = LatencyHistogram(RESPONSE_BUCKETS_US)
+
+    def run(self, body):
+        """Exécute ``body()`` à chaque période jusqu'à ``stop()``"""
+        self.running = True
+        release = time.monotonic_ns() + self.period_ns
+        while self.running:
+            sleep_until(release)
+            release = self.activate(body, release)
+
+    def activate(self, body, release):
+        """Une activation prévue à ``release`` : mesures, puis activation suivante"""
+        self.jitter.observe(time.monotonic_ns() - release)
+
+        body()
+
+        end = time.monotonic_ns()
+        response = end - release
+        self.response.observe(response)
+        self.cycles += 1
+        if response > self.deadline_ns:
+            self.misses += 1
+            self.overrun.observe(response - self.deadline_ns)
+
+        release += self.period_ns
+        if release <= end:
+            lost = (end - release) // self.period_ns + 1
+            self.skipped += lost
+            release += lost * self.period_ns
+        return release
+
+    def stop(self):
+        self.running = False
+
+    def report(self):
+        return {
+            'app': self.name,
+            'period_ms': self.period_ns / 1e6,
+            'deadline_ms': self.deadline_ns / 1e6,
+            'cycles': self.cycles,
+            'deadline_misses': self.misses,
+            'miss_ratio': self.misses / self.cycles if self.cycles else None,
+            'skipped_periods': self.skipped,
+            'jitter': self.jitter.to_dict(),
+            'response': self.response.to_dict(),
+            'overrun': self.overrun.to_dict()
+        }
+
+class Scheduler:
+    """Plusieurs tâches périodiques dans un seul thread.
+
+    File de priorité des activations (tas par instant d'activation) : le
+    thread dort jusqu'à la plus proche puis l'exécute. À instant égal, la
+    tâche de rang ``rank`` le plus faible passe en premier (applications
+    critiques avant confort et infotainment). Une tâche arrêtée par
+    ``stop`` est retirée ; la boucle se termine sans tâche. Gigue et échéances de chaque
+    tâche incluent l'attente derrière les autres.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.running = False
+
+    def add(self, task, body, rank=0):
+        self.entries.append((task, body, rank))
+
+    def run(self):
+        self.running = True
+        start = time.monotonic_ns()
+        heap = [
+            (start + task.period_ns, rank, index, task, body)
+            for index, (task, body, rank) in enumerate(self.entries)
+        ]
+        heapq.heapify(heap)
+        for task, _, _ in self.entries:
+            task.running = True
+        while self.running and heap:
+            release, rank, index, task, body = heap[0]
+            sleep_until(release)
+            if not self.running:
+                break
+            next_release = task.activate(body, release)
+            if task.running:
+                heapq.heapreplace(heap, (next_release, rank, index, task, body))
+            else:
+                # Tâche arrêtée par son application (fin de trace rejouée)
+                heapq.heappop(heap)
+
+    def stop(self):
+        self.running = False
+        for task, _, _ in self.entries:
+            task.stop()
@@ -1,16 +1,36 @@
 #!/usr/bin/env python3
 """
 SDV Safety Application Simulator
-Simule les applications critiques de sécurité véhicule
+Simule les applications critiques de sécurité véhicule, en boucle
+périodique temps réel (rt_loop.py) : gigue et échéances manquées mesurées
+par rapport au temps de réponse de chaque application.
 """
 
 import os
+import json
 import time
 import random
+import signal
 import threading
 from datetime import datetime
 
+from rt_loop import PeriodicTask, request_realtime, kernel_info
+from event_log import get_event_log, ALERT
+from sensor_model import SensorModel
+from sensor_trace import replay_trace
+
+# Priorité SCHED_FIFO par criticité (surchargée par SDV_RT_PRIORITY)
+RT_PRIORITIES = {'highest': 80, 'high': 70}
+
 class SafetyAppSimulator:
+    # Plages des capteurs (autres capteurs: valeur normalisée 0-1)
+    SENSOR_RANGES = {
+        'speed': (0, 130),  # km/h
+        'brake_pedal': (0, 100),  # %
+        'collision_radar': (0.5, 100),  # mètres
+        'steering_input': (-45, 45)  # degrés
+    }
+    
     def __init__(self, app_name):
         self.app_name = app_name
         self.running = False
@@ -50,22 +70,18 @@ class SafetyAppSimulator:
             'response_time_ms': 100,
             'criticality': 'high'
         })
+        self.task = None
+        self.trace = None
+        self.kernel = None
+        self.stats_file = os.environ.get('SDV_RT_STATS_FILE')
+        self.log = get_event_log()
+        seed = os.environ.get('SDV_SENSOR_SEED')
+        self.sensor_model = SensorModel(self.config.get('sensors', []), self.SENSOR_RANGES,
+                                        seed=int(seed) if seed else None)
         
     def simulate_sensors(self):
-        """Simule les données des capteurs"""
-        sensor_data = {}
-        for sensor in self.config.get('sensors', []):
-            if sensor == 'speed':
-                sensor_data[sensor] = random.uniform(0, 130)  # km/h
-            elif sensor == 'brake_pedal':
-                sensor_data[sensor] = random.uniform(0, 100)  # %
-            elif sensor == 'collision_radar':
-                sensor_data[sensor] = random.uniform(0.5, 100)  # mètres
-            elif sensor == 'steering_input':
-                sensor_data[sensor] = random.uniform(-45, 45)  # degrés
-            else:
-                sensor_data[sensor] = random.uniform(0, 1)  # valeur normalisée
-        return sensor_data
+        """Simule les données des capteurs (lectures tirées par blocs, voir sensor_model.py)"""
+        return self.sensor_model.read()
     
     def check_safety_conditions(self, sensor_data):
         """Vérifie les conditions de sécurité selon l'application"""
@@ -95,48 +111,97 @@ class SafetyAppSimulator:
         return alerts
     
     def run(self):
-        """Boucle principale de simulation"""
+        """Boucle principale de simulation, une activation par temps de réponse"""
+        self.start()
+        if os.environ.get('SDV_REAL_TIME', 'true') == 'true':
+            priority = int(os.environ.get('SDV_RT_PRIORITY',
+                                          RT_PRIORITIES.get(self.config.get('criticality'), 70)))
+            granted, detail = request_realtime(priority)
+            print(f"[{datetime.now()}] Scheduling: {detail}")
+        print(f"[{datetime.now()}] Kernel: {self.kernel['release']} (PREEMPT_RT: {self.kernel['preempt_rt']})")
+        # SIGTERM reçu pendant le démarrage: pas de boucle, bilan à zéro cycle
+        if not self.running:
+            return
+        self.task.run(self.cycle)
+    
+    def start(self):
+        """Démarrage de l'application sans la boucle (tâche périodique prête, voir sdv_host.py)"""
         self.running = True
         self.metrics['start_time'] = datetime.now()
+        self.start_ns = time.monotonic_ns()
+        # Relevé unique: ni /sys ni uname dans le cycle
+        self.kernel = kernel_info()
         
         print(f"[{datetime.now()}] Starting {self.app_name} safety application")
         print(f"[{datetime.now()}] Criticality: {self.config.get('criticality', 'unknown')}")
         print(f"[{datetime.now()}] Response time: {self.config.get('response_time_ms', 0)}ms")
         
-        response_time = self.config.get('response_time_ms', 100) / 1000.0
+        # Rejeu d'une trace enregistrée (SDV_TRACE): lectures et cadence de la trace
+        period_ms = self.period_ms()
+        self.trace = replay_trace(self.app_name, self.sensor_model, on_end=self.stop)
+        if self.trace is not None:
+            period_ms = self.trace.period_ms
+            print(f"[{datetime.now()}] Replay: {self.trace.path} ({len(self.trace)} records, "
+                  f"speed x{self.trace.speed:g})")
+        # Premier bloc de lectures tiré avant la première échéance
+        self.sensor_model.fill()
+        
+        # Échéances absolues: la période ne dérive pas avec la durée des cycles
+        period_ns = int(period_ms * 1_000_000)
+        self.task = PeriodicTask(self.app_name, period_ns)
+        self.stats_interval = max(1, int(float(os.environ.get('SDV_RT_STATS_INTERVAL', 10)) * 1e9 / period_ns))
+    
+    def period_ms(self):
+        return self.config.get('response_time_ms', 100)
+    
+    def cycle(self):
+        """Une activation: capteurs, conditions de sécurité, interventions"""
+        # Simulation des capteurs
+        sensor_data = self.simulate_sensors()
+        
+        # Vérification conditions de sécurité
+        alerts = self.check_safety_conditions(sensor_data)
         
-        while self.running:
-            cycle_start = time.time()
-            
-            # Simulation des capteurs
-            sensor_data = self.simulate_sensors()
-            
-            # Vérification conditions de sécurité
-            alerts = self.check_safety_conditions(sensor_data)
-            
-            if alerts:
-                self.metrics['alerts'] += 1
-                for alert in alerts:
-                    print(f"[{datetime.now()}] {self.app_name}: ⚠️  {alert}")
-                    # Simulation d'intervention automatique
-                    if random.random() < 0.3:  # 30% chance d'intervention
-                        self.metrics['interventions'] += 1
-                        print(f"[{datetime.now()}] {self.app_name}:  SAFETY_INTERVENTION_ACTIVATED")
-            
-            # Affichage statut normal périodique
-            if self.metrics['cycles'] % 50 == 0:  # Toutes les 50 cycles
-                uptime = (datetime.now() - self.metrics['start_time']).total_seconds()
-                print(f"[{datetime.now()}] {self.app_name}:  Running normally - "
-                      f"Cycle {self.metrics['cycles']}, Uptime: {uptime:.1f}s, "
-                      f"Alerts: {self.metrics['alerts']}, Interventions: {self.metrics['interventions']}")
-            
-            self.metrics['cycles'] += 1
-            
-            # Respecter le temps de réponse temps réel
-            cycle_time = time.time() - cycle_start
-            sleep_time = max(0, response_time - cycle_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        if alerts:
+            self.metrics['alerts'] += 1
+            for alert in alerts:
+                self.log.emit(self.app_name, "⚠️  {}", alert, level=ALERT)
+                # Simulation d'intervention automatique
+                if random.random() < 0.3:  # 30% chance d'intervention
+                    self.metrics['interventions'] += 1
+                    self.log.emit(self.app_name, " SAFETY_INTERVENTION_ACTIVATED", level=ALERT)
+        
+        # Affichage statut normal périodique (formaté par le thread d'écriture)
+        if self.metrics['cycles'] % 50 == 0:  # Toutes les 50 cycles
+            self.log.emit(self.app_name, " Running normally - Cycle {}, Uptime: {:.1f}s, Alerts: {}, "
+                          "Interventions: {}, Deadline misses: {}, Jitter max: {:.0f}us",
+                          self.metrics['cycles'], (time.monotonic_ns() - self.start_ns) / 1e9,
+                          self.metrics['alerts'], self.metrics['interventions'],
+                          self.task.misses, self.task.jitter.max_ns / 1000)
+        
+        self.metrics['cycles'] += 1
+        if self.metrics['cycles'] % self.stats_interval == 0:
+            # Bilan, JSON et fichier dans le thread d'écriture du journal
+            self.log.defer(self.export_rt_stats)
+    
+    def rt_report(self):
+        """Histogrammes de gigue, de temps de réponse et d'échéances manquées"""
+        report = self.task.report() if self.task is not None else {'app': self.app_name}
+        report['kernel'] = self.kernel
+        return report
+    
+    def export_rt_stats(self):
+        """Ligne RT_STATS (JSON) sur la sortie standard, et fichier SDV_RT_STATS_FILE s'il est défini"""
+        report = self.rt_report()
+        self.log.line("RT_STATS {}", json.dumps(report, separators=(',', ':')))
+        if self.stats_file:
+            with open(self.stats_file, 'w') as f:
+                json.dump(report, f, indent=2)
+    
+    def stop(self):
+        self.running = False
+        if self.task is not None:
+            self.task.stop()
 
 if __name__ == '__main__':
     app_name = os.environ.get('APP_NAME', 'emergency-brake')
@@ -150,15 +215,32 @@ if __name__ == '__main__':
     print("="*50)
     
     simulator = SafetyAppSimulator(app_name)
+    # Arrêt du pod (SIGTERM): fin du cycle en cours puis bilan
+    signal.signal(signal.SIGTERM, lambda signum, frame: simulator.stop())
     
     try:
         simulator.run()
     except KeyboardInterrupt:
-        print(f"\n[{datetime.now()}] {app_name} shutting down...")
-        uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
-        print(f"[{datetime.now()}] Final metrics:")
-        print(f"  • Uptime: {uptime:.1f}s")
-        print(f"  • Cycles: {simulator.metrics['cycles']}")
-        print(f"  • Alerts: {simulator.metrics['alerts']}")
-        print(f"  • Interventions: {simulator.metrics['interventions']}")
-        simulator.running = False 
\ No newline at end of file
+        simulator.stop()
+    
+    # Derniers événements en attente, puis bilan en écriture directe
+    simulator.log.close()
+    print(f"\n[{datetime.now()}] {app_name} shutting down...")
+    uptime = (datetime.now() - simulator.metrics['start_time']).total_seconds()
+    print(f"[{datetime.now()}] Final metrics:")
+    print(f"  • Uptime: {uptime:.1f}s")
+    print(f"  • Cycles: {simulator.metrics['cycles']}")
+    print(f"  • Alerts: {simulator.metrics['alerts']}")
+    print(f"  • Interventions: {simulator.metrics['interventions']}")
+    if simulator.task is not None:
+        print(f"  • Deadline misses: {simulator.task.misses}/{simulator.task.cycles} "
+              f"(skipped periods: {simulator.task.skipped})")
+        # Pas de percentile sans activation (arrêt avant la première échéance, trace vide)
+        jitter_p99 = simulator.task.jitter.percentile_us(0.99)
+        if jitter_p99 is not None:
+            print(f"  • Jitter p99: {jitter_p99:.0f}us, max: {simulator.task.jitter.max_ns / 1000:.0f}us")
+    log_stats = simulator.log.stats()
+    print(f"  • Log events: {log_stats['written']}/{log_stats['emitted']} written "
+          f"(sampled out: {log_stats['sampled_out']}, rate limited: {log_stats['rate_limited']}, "
+          f"dropped: {log_stats['dropped']})")
+    simulator.export_rt_stats()
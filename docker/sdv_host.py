@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+SDV Multi-App Host
+Plusieurs applications SDV (safety, comfort, infotainment) dans un seul
+processus Python au lieu d'un interpréteur par conteneur : chaque
+application garde son simulateur et sa tâche périodique (rt_loop.py), toutes
+multiplexées dans le thread d'un ordonnanceur partagé (Scheduler).
+Option : un processus par criticité (safety / comfort / infotainment), les
+applications critiques restent isolées et seules en SCHED_FIFO.
+
+Mémoire (RSS) et temps de démarrage par application, comparés au mode un
+conteneur par application (--compare-standalone : un interpréteur lancé par
+application, comme dans les images Dockerfile.*).
+
+Usage :
+    SDV_APPS=emergency-brake,lane-keeping,comfort python3 sdv_host.py
+    python3 sdv_host.py --apps all --split criticality --duration 60
+    python3 sdv_host.py --apps all --duration 10 --compare-standalone
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+from rt_loop import PeriodicTask, Scheduler, request_realtime, NS_PER_S
+from safety_simulator import SafetyAppSimulator, RT_PRIORITIES
+from comfort_simulator import ComfortAppSimulator
+from infotainment_simulator import InfotainmentAppSimulator
+from event_log import get_event_log
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Simulateur par catégorie, dans l'ordre de criticité (rang d'ordonnancement)
+SIMULATORS = {
+    'safety': SafetyAppSimulator,
+    'comfort': ComfortAppSimulator,
+    'infotainment': InfotainmentAppSimulator
+}
+CATEGORY_RANKS = {category: rank for rank, category in enumerate(SIMULATORS)}
+
+# Mode un conteneur par application: interpréteur neuf, import du simulateur,
+# démarrage de l'application puis relevé du RSS
+STANDALONE_PROBE = """
+import sys, importlib
+module, class_name, app_name = sys.argv[1:4]
+simulator = getattr(importlib.import_module(module), class_name)(app_name)
+simulator.start()
+with open('/proc/self/status') as f:
+    rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+print(f"STANDALONE {rss}", flush=True)
+"""
+
+def catalog():
+    """Applications connues de chaque simulateur: {application: catégorie}"""
+    apps = {}
+    for category, simulator_class in SIMULATORS.items():
+        for app_name in simulator_class(None).apps_config:
+            apps[app_name] = category
+    return apps
+
+def select_apps(spec):
+    """Liste d'applications depuis ``spec`` (noms, catégories ou ``all`` séparés par des virgules)"""
+    known = catalog()
+    selected = []
+    for item in (part.strip() for part in spec.split(',')):
+        if not item:
+            continue
+        if item == 'all':
+            names = list(known)
+        elif item in SIMULATORS:
+            names = [name for name, category in known.items() if category == item]
+        elif item in known:
+            names = [item]
+        else:
+            raise ValueError(f"application inconnue: {item} (connues: {', '.join(known)})")
+        selected.extend(name for name in names if name not in selected)
+    return [(name, known[name]) for name in selected]
+
+def rss_kib(pid='self'):
+    """Mémoire résidente (KiB) d'un processus, depuis /proc"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+class AppHost:
+    """Applications d'un groupe exécutées dans ce processus.
+
+    ``start`` crée et démarre les simulateurs un par un (temps de démarrage
+    et RSS ajouté mesurés par application) et enregistre leur tâche dans
+    l'ordonnanceur partagé ; ``run`` exécute la boucle jusqu'à ``stop``.
+    """
+
+    def __init__(self, apps, group='all', real_time=False, stats_interval=10):
+        self.apps = apps
+        self.group = group
+        self.real_time = real_time
+        self.stats_interval = stats_interval
+        self.scheduler = Scheduler()
+        self.simulators = {}
+        self.startup = {}
+        self.scheduling = 'SCHED_OTHER'
+        self.base_rss_kib = rss_kib()
+        self.start_time = None
+        self.startup_ms = 0
+
+    def start(self):
+        self.start_time = datetime.now()
+        host_start = time.perf_counter_ns()
+        for app_name, category in self.apps:
+            rss_before = rss_kib()
+            app_start = time.perf_counter_ns()
+            simulator = SIMULATORS[category](app_name)
+            # Statistiques temps réel agrégées par l'hôte (HOST_STATS)
+            simulator.stats_file = None
+            simulator.start()
+            self.startup[app_name] = {
+                'category': category,
+                'startup_ms': (time.perf_counter_ns() - app_start) / 1e6,
+                'rss_delta_kib': rss_kib() - rss_before if rss_before is not None else None
+            }
+            self.simulators[app_name] = simulator
+            self.scheduler.add(simulator.task, simulator.cycle, CATEGORY_RANKS[category])
+        self.startup_ms = (time.perf_counter_ns() - host_start) / 1e6
+
+        safety = [app_name for app_name, category in self.apps if category == 'safety']
+        if self.real_time and safety:
+            priority = int(os.environ.get('SDV_RT_PRIORITY', max(
+                RT_PRIORITIES.get(self.simulators[app_name].config.get('criticality'), 70) for app_name in safety
+            )))
+            granted, self.scheduling = request_realtime(priority)
+        print(f"[{datetime.now()}] Host {self.group}: {len(self.apps)} applications started "
+              f"in {self.startup_ms:.1f}ms, RSS {rss_kib()} KiB, scheduling: {self.scheduling}")
+
+        if self.stats_interval:
+            # Le thread de l'ordonnanceur (SCHED_FIFO) ne fait que confier le bilan
+            # au thread d'écriture du journal (/proc, JSON, fichier hors boucle)
+            stats_task = PeriodicTask(f"{self.group}-stats", int(self.stats_interval * NS_PER_S))
+            self.scheduler.add(stats_task, lambda: get_event_log().defer(self.export_stats), len(CATEGORY_RANKS))
+
+    def run(self):
+        self.scheduler.run()
+
+    def stop(self):
+        self.scheduler.stop()
+        for simulator in self.simulators.values():
+            simulator.running = False
+
+    def report(self):
+        rss = rss_kib()
+        apps = {}
+        for app_name, simulator in self.simulators.items():
+            task = simulator.task
+            apps[app_name] = {
+                **self.startup[app_name],
+                'rss_share_kib': rss / len(self.simulators) if rss is not None else None,
+                'period_ms': task.period_ns / 1e6,
+                'cycles': task.cycles,
+                'deadline_misses': task.misses,
+                'skipped_periods': task.skipped,
+                'jitter_p99_us': task.jitter.percentile_us(0.99),
+                'response_p99_us': task.response.percentile_us(0.99)
+            }
+        return {
+            'group': self.group,
+            'pid': os.getpid(),
+            'scheduling': self.scheduling,
+            'uptime_s': (datetime.now() - self.start_time).total_seconds() if self.start_time else 0,
+            'startup_ms': self.startup_ms,
+            'base_rss_kib': self.base_rss_kib,
+            'rss_kib': rss,
+            'event_log': get_event_log().stats(),
+            'apps': apps
+        }
+
+    def export_stats(self):
+        """Ligne HOST_STATS (JSON) sur la sortie standard, et fichier SDV_HOST_STATS_FILE s'il est défini"""
+        report = self.report()
+        get_event_log().line("HOST_STATS {}", json.dumps(report, separators=(',', ':')))
+        path = os.environ.get('SDV_HOST_STATS_FILE')
+        if path:
+            if self.group != 'all':
+                root, extension = os.path.splitext(path)
+                path = f"{root}-{self.group}{extension}"
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        return report
+
+def run_group(apps, group, real_time, duration, stats_interval, reports=None):
+    """Hôte d'un groupe d'applications jusqu'à SIGTERM, Ctrl-C ou ``duration`` secondes"""
+    host = AppHost(apps, group=group, real_time=real_time, stats_interval=stats_interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: host.stop())
+    if duration:
+        timer = threading.Timer(duration, host.stop)
+        timer.daemon = True
+        timer.start()
+    try:
+        host.start()
+        host.run()
+    except KeyboardInterrupt:
+        host.stop()
+    get_event_log().close()
+    report = host.export_stats()
+    if reports is not None:
+        reports.put(report)
+    return [report]
+
+def run_split(apps, real_time, duration, stats_interval):
+    """Un processus par criticité; le parent relaie SIGTERM et collecte les bilans"""
+    groups = {}
+    for app_name, category in apps:
+        groups.setdefault(category, []).append((app_name, category))
+    reports = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_group, name=f"sdv-host-{category}",
+                                args=(group_apps, category, real_time, duration, stats_interval, reports))
+        for category, group_apps in groups.items()
+    ]
+    for process in processes:
+        process.start()
+
+    def terminate(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    signal.signal(signal.SIGTERM, terminate)
+    # Ctrl-C est reçu par tout le groupe de processus: les enfants s'arrêtent seuls
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    collected = []
+    while len(collected) < len(processes):
+        try:
+            collected.append(reports.get(timeout=1))
+        except Exception:
+            if not any(process.is_alive() for process in processes) and reports.empty():
+                break
+    for process in processes:
+        process.join()
+    return collected
+
+def measure_standalone(app_name, category):
+    """Démarrage (lancement de l'interpréteur → application prête) et RSS d'une application seule"""
+    simulator_class = SIMULATORS[category]
+    env = dict(os.environ, SDV_REAL_TIME='false')
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', STANDALONE_PROBE, simulator_class.__module__, simulator_class.__name__, app_name],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=HERE, env=env
+    )
+    result = {'category': category, 'startup_ms': None, 'rss_kib': None}
+    for line in process.stdout:
+        if line.startswith('STANDALONE '):
+            result['startup_ms'] = (time.perf_counter() - start) * 1000
+            result['rss_kib'] = int(line.split()[1])
+            break
+    process.stdout.close()
+    process.wait()
+    return result
+
+def print_comparison(reports, standalone=None):
+    """Mémoire et démarrage par application, hôte vs un conteneur par application"""
+    print(f"\n{'application':<22}{'catégorie':<14}{'démarrage ms':>14}{'RSS part KiB':>14}"
+          f"{'cycles':>9}{'échéances':>11}" + (f"{'seul ms':>10}{'seul KiB':>10}" if standalone else ''))
+    for report in reports:
+        for app_name, app in report['apps'].items():
+            line = (f"{app_name:<22}{app['category']:<14}{app['startup_ms']:>14.2f}"
+                    f"{app['rss_share_kib'] or 0:>14.0f}{app['cycles']:>9}{app['deadline_misses']:>11}")
+            if standalone:
+                alone = standalone.get(app_name, {})
+                line += f"{alone.get('startup_ms') or 0:>10.1f}{alone.get('rss_kib') or 0:>10}"
+            print(line)
+
+    host_rss = sum(report['rss_kib'] or 0 for report in reports)
+    host_startup = max(report['startup_ms'] for report in reports)
+    apps = sum(len(report['apps']) for report in reports)
+    print(f"\nHôte: {len(reports)} processus, {apps} applications, RSS total {host_rss / 1024:.1f} MiB, "
+          f"démarrage {host_startup:.1f}ms (hors lancement de l'interpréteur)")
+    if standalone:
+        measured = [alone for alone in standalone.values() if alone['rss_kib'] is not None]
+        total_rss = sum(alone['rss_kib'] for alone in measured)
+        total_startup = sum(alone['startup_ms'] for alone in measured)
+        print(f"Un conteneur par application: {len(measured)} processus, RSS total {total_rss / 1024:.1f} MiB "
+              f"(hors surcoût du runtime conteneur), démarrage cumulé {total_startup:.0f}ms")
+        if host_rss:
+            print(f"Gain mémoire: {(total_rss - host_rss) / 1024:.1f} MiB ({total_rss / host_rss:.1f}×)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plusieurs applications SDV dans un processus (ordonnanceur partagé)")
+    parser.add_argument('--apps', default=os.environ.get('SDV_APPS', 'all'),
+                        help="Applications, catégories ou all, séparées par des virgules (SDV_APPS)")
+    parser.add_argument('--split', choices=('none', 'criticality'), default=os.environ.get('SDV_HOST_SPLIT', 'none'),
+                        help="Un processus par criticité (SDV_HOST_SPLIT)")
+    parser.add_argument('--duration', type=float, default=0, help="Durée d'exécution (s), 0 = jusqu'à l'arrêt")
+    parser.add_argument('--compare-standalone', action='store_true',
+                        help="Mesure aussi chaque application seule dans son interpréteur")
+    args = parser.parse_args()
+
+    try:
+        apps = select_apps(args.apps)
+    except ValueError as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    real_time = os.environ.get('SDV_REAL_TIME', 'false') == 'true'
+    stats_interval = float(os.environ.get('SDV_RT_STATS_INTERVAL', 10))
+
+    print(" SDV Multi-App Host")
+    print("="*50)
+    print(f"Applications: {', '.join(app_name for app_name, _ in apps)}")
+    print(f"Split: {args.split}")
+    print(f"Real-time mode: {os.environ.get('SDV_REAL_TIME', 'false')}")
+    print(f"Pod: {os.environ.get('HOSTNAME', 'unknown')}")
+    print("="*50)
+
+    # Mesures hors exécution de l'hôte, pour ne pas perturber ses échéances
+    standalone = None
+    if args.compare_standalone:
+        standalone = {app_name: measure_standalone(app_name, category) for app_name, category in apps}
+
+    if args.split == 'criticality':
+        reports = run_split(apps, real_time, args.duration, stats_interval)
+    else:
+        reports = run_group(apps, 'all', real_time, args.duration, stats_interval)
+
+    print(f"\n[{datetime.now()}] Host shutting down...")
+    print_comparison(reports, standalone)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SDV Sensor Model
+Modèle de capteurs précompilé par application : bornes de chaque capteur
+rangées en tableaux (une colonne par valeur, 8 pour un réseau ultrason),
+lectures tirées par blocs de K cycles (NumPy ; repli sur ``random`` sans
+NumPy ou avec SDV_SENSOR_NUMPY=false) puis consommées ligne à ligne depuis
+le tampon. La source des blocs est interchangeable : tirage aléatoire ou
+rejeu d'une trace enregistrée.
+
+Usage (coût par cycle, génération historique vs blocs) :
+    python3 sensor_model.py --sensors ultrasonic_sensors camera --cycles 100000
+"""
+
+import os
+import time
+import random
+import argparse
+
+# NumPy optionnel: ~17 MiB de RSS par interpréteur, amorti en mode hôte (sdv_host.py),
+# désactivable pour les conteneurs d'une seule application
+np = None
+if os.environ.get('SDV_SENSOR_NUMPY', 'true') == 'true':
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+DEFAULT_RANGE = (0.0, 1.0)  # valeur normalisée
+DEFAULT_BLOCK = int(os.environ.get('SDV_SENSOR_BLOCK', 128))
+
+class RandomBlockSource:
+    """Blocs de lectures uniformes dans [bas, haut) par colonne"""
+
+    def __init__(self, lows, highs, block=DEFAULT_BLOCK, seed=None):
+        self.block = block
+        if np is not None:
+            self.lows = np.asarray(lows, dtype=np.float64)
+            self.spans = np.asarray(highs, dtype=np.float64) - self.lows
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.bounds = list(zip(lows, highs))
+            self.rng = random.Random(seed)
+
+    def next_block(self):
+        if np is not None:
+            return (self.lows + self.spans * self.rng.random((self.block, len(self.lows)))).tolist()
+        uniform = self.rng.uniform
+        return [[uniform(low, high) for low, high in self.bounds] for _ in range(self.block)]
+
+class ArrayBlockSource:
+    """Rejeu de lectures enregistrées (tableau lignes × colonnes), en boucle par défaut"""
+
+    def __init__(self, rows, block=DEFAULT_BLOCK, loop=True):
+        if not len(rows):
+            raise ValueError("trace de capteurs vide")
+        self.rows = rows
+        self.block = block
+        self.loop = loop
+        self.position = 0
+
+    def next_block(self):
+        if self.position >= len(self.rows):
+            if not self.loop:
+                raise EOFError("fin de la trace de capteurs")
+            self.position = 0
+        block = self.rows[self.position:self.position + self.block]
+        self.position += len(block)
+        return block.tolist() if hasattr(block, 'tolist') else [list(row) for row in block]
+
+class SensorModel:
+    """Lectures de capteurs d'une application, un dict par cycle.
+
+    ``ranges`` associe un capteur à ``(bas, haut)`` ou ``(bas, haut,
+    largeur)`` ; les capteurs absents prennent la plage normalisée. Le
+    dict produit a la forme de l'ancien ``simulate_sensors`` : un flottant
+    par capteur, une liste pour les capteurs de largeur > 1.
+    """
+
+    def __init__(self, sensors, ranges, block=DEFAULT_BLOCK, source=None, seed=None):
+        self.sensors = list(sensors)
+        self.layout = []
+        lows, highs = [], []
+        for name in self.sensors:
+            low, high, *width = ranges.get(name, DEFAULT_RANGE)
+            width = width[0] if width else 1
+            self.layout.append((name, len(lows), width))
+            lows.extend([low] * width)
+            highs.extend([high] * width)
+        self.columns = len(lows)
+        self.lows = lows
+        self.highs = highs
+        self.scalar = all(width == 1 for _, _, width in self.layout)
+        self.seed = seed
+        self.block = block
+        self.source = source
+        self._rows = []
+        self._index = 0
+
+    def use_source(self, source):
+        """Change la source des blocs (rejeu d'une trace) et vide le tampon"""
+        self.source = source
+        self._rows = []
+        self._index = 0
+
+    def fill(self):
+        """Tire le bloc suivant (appelé aussi au démarrage, hors boucle périodique)"""
+        if self.source is None:
+            # Tirage créé au premier bloc: instancier un simulateur ne coûte rien
+            self.source = RandomBlockSource(self.lows, self.highs, self.block, self.seed)
+        self._rows = self.source.next_block()
+        self._index = 0
+
+    def next_row(self):
+        """Ligne brute du cycle (une valeur par colonne)"""
+        if self._index >= len(self._rows):
+            self.fill()
+        row = self._rows[self._index]
+        self._index += 1
+        return row
+
+    def read(self):
+        row = self.next_row()
+        if self.scalar:
+            return dict(zip(self.sensors, row))
+        return {name: row[start] if width == 1 else row[start:start + width]
+                for name, start, width in self.layout}
+
+def _per_cycle(sensors, ranges):
+    """Génération historique: un random.uniform par valeur à chaque cycle"""
+    sensor_data = {}
+    for sensor in sensors:
+        low, high, *width = ranges.get(sensor, DEFAULT_RANGE)
+        if width:
+            sensor_data[sensor] = [random.uniform(low, high) for _ in range(width[0])]
+        else:
+            sensor_data[sensor] = random.uniform(low, high)
+    return sensor_data
+
+if __name__ == '__main__':
+    from safety_simulator import SafetyAppSimulator
+    from comfort_simulator import ComfortAppSimulator
+
+    parser = argparse.ArgumentParser(description="Coût par cycle de la génération des capteurs")
+    parser.add_argument('--sensors', nargs='+', default=['ultrasonic_sensors', 'camera'])
+    parser.add_argument('--cycles', type=int, default=100000)
+    parser.add_argument('--block', type=int, default=DEFAULT_BLOCK)
+    args = parser.parse_args()
+
+    ranges = {**SafetyAppSimulator.SENSOR_RANGES, **ComfortAppSimulator.SENSOR_RANGES}
+    model = SensorModel(args.sensors, ranges, block=args.block)
+    print(f"NumPy: {'oui' if np is not None else 'non (repli random)'}, bloc {args.block} cycles")
+    for label, read in (('par cycle', lambda: _per_cycle(args.sensors, ranges)), ('par blocs', model.read)):
+        start = time.perf_counter_ns()
+        for _ in range(args.cycles):
+            read()
+        print(f"{label:<10} {(time.perf_counter_ns() - start) / args.cycles / 1000:.2f} µs/cycle")
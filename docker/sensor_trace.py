@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+SDV Sensor Trace
+Traces de capteurs enregistrées pour des tests de charge reproductibles.
+
+Format : fichier binaire à enregistrements de largeur fixe, lisible en
+mémoire mappée sans copie.
+
+    0    magic  b'SDVTRC01'
+    8    uint32 taille de l'en-tête JSON (multiple de 8)
+    12   uint32 taille d'un enregistrement (octets)
+    16   en-tête JSON (application, période, colonnes, graine)
+    ...  enregistrements : float64 × (1 + colonnes), petit-boutiste
+         [instant (s depuis le début), paramètres véhicule..., capteurs...]
+
+L'enregistreur fait tourner ``VehicleSimulator`` (axil/vehicle_simulator.py)
+en temps virtuel et capture, à la période de chaque application, l'état et
+les paramètres du véhicule puis les lectures de capteurs de l'application
+(vitesse, freinage, braquage et température extérieure tirés du véhicule,
+les autres du modèle de capteurs). Les simulateurs rejouent une trace avec
+SDV_TRACE (fichier, ou répertoire contenant ``<application>.trace``), en
+temps réel ou accéléré (SDV_TRACE_SPEED).
+
+Usage :
+    python3 sensor_trace.py record --apps all --duration 600 --seed 42 --out traces/
+    python3 sensor_trace.py info traces/emergency-brake.trace
+    SDV_TRACE=traces/ SDV_TRACE_SPEED=10 python3 sdv_host.py --duration 60
+"""
+
+import os
+import sys
+import json
+import mmap
+import heapq
+import random
+import struct
+import argparse
+from array import array
+from datetime import datetime
+
+from sensor_model import np
+
+MAGIC = b'SDVTRC01'
+PREAMBLE = struct.Struct('<8sII')
+TRACE_EXTENSION = '.trace'
+
+# Capteurs dérivés des paramètres du véhicule (les autres viennent du modèle de capteurs)
+VEHICLE_SENSORS = {
+    'speed': 'speed',
+    'brake_pedal': 'brake_pressure',
+    'steering_input': 'steering_angle',
+    'exterior_temp': 'outside_temp'
+}
+
+class TraceWriter:
+    """Écriture séquentielle d'une trace (enregistrements regroupés par lots)"""
+
+    def __init__(self, path, header, batch=4096):
+        self.header = dict(header)
+        self.fields = 1 + len(self.header['columns'])
+        encoded = json.dumps(self.header).encode()
+        encoded += b' ' * (-len(encoded) % 8)
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(PREAMBLE.pack(MAGIC, len(encoded), 8 * self.fields))
+        self._file.write(encoded)
+        self._pending = array('d')
+        self._batch = batch * self.fields
+        self.records = 0
+
+    def write(self, timestamp, values):
+        self._pending.append(timestamp)
+        self._pending.extend(values)
+        self.records += 1
+        if len(self._pending) >= self._batch:
+            self._flush()
+
+    def _flush(self):
+        if sys.byteorder != 'little':
+            self._pending.byteswap()
+        self._pending.tofile(self._file)
+        self._pending = array('d')
+
+    def close(self):
+        self._flush()
+        self._file.close()
+
+class TraceReader:
+    """Trace ouverte en mémoire mappée: les enregistrements sont lus sans copie
+    (vue NumPy lignes × colonnes, ou memoryview de float64 sans NumPy)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size, record_size = PREAMBLE.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: pas une trace SDV (magic {magic!r})")
+        self.header = json.loads(bytes(self._map[PREAMBLE.size:PREAMBLE.size + header_size]))
+        self.columns = self.header['columns']
+        self.fields = record_size // 8
+        offset = PREAMBLE.size + header_size
+        self.count = (len(self._map) - offset) // record_size
+        if np is not None:
+            self.records = np.frombuffer(self._map, dtype='<f8', count=self.count * self.fields,
+                                         offset=offset).reshape(self.count, self.fields)
+        else:
+            self.records = memoryview(self._map)[offset:offset + self.count * record_size].cast('d')
+
+    def __len__(self):
+        return self.count
+
+    def column_index(self, name):
+        """Position d'une colonne dans un enregistrement (0 = instant)"""
+        return 1 + self.columns.index(name)
+
+    def rows(self, start, stop, first=0, last=None):
+        """Enregistrements [start, stop) limités aux champs [first, last), en listes"""
+        last = self.fields if last is None else last
+        if np is not None:
+            return self.records[start:stop, first:last].tolist()
+        flat = self.records[start * self.fields:stop * self.fields].tolist()
+        return [flat[index + first:index + last] for index in range(0, len(flat), self.fields)]
+
+    def duration(self):
+        return self.rows(self.count - 1, self.count, 0, 1)[0][0] if self.count else 0.0
+
+    def close(self):
+        # Les vues NumPy/memoryview doivent être libérées avant le mmap
+        self.records = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+class TraceBlockSource:
+    """Source de blocs du modèle de capteurs lue dans une trace.
+
+    Sans ``loop``, la fin de la trace appelle ``on_end`` (arrêt du
+    simulateur) et le dernier enregistrement est servi au cycle en cours.
+    """
+
+    def __init__(self, reader, first, last, block=128, loop=True, on_end=None):
+        self.reader = reader
+        self.first = first
+        self.last = last
+        self.block = block
+        self.loop = loop
+        self.on_end = on_end
+        self.position = 0
+        self.passes = 0
+
+    def next_block(self):
+        if self.position >= len(self.reader):
+            self.passes += 1
+            if not self.loop:
+                if self.on_end is not None:
+                    self.on_end()
+                return self.reader.rows(len(self.reader) - 1, len(self.reader), self.first, self.last)
+            self.position = 0
+        stop = min(self.position + self.block, len(self.reader))
+        rows = self.reader.rows(self.position, stop, self.first, self.last)
+        self.position = stop
+        return rows
+
+def trace_path(app_name, location):
+    """Fichier de trace d'une application: ``location`` est un fichier ou un répertoire"""
+    if os.path.isdir(location):
+        return os.path.join(location, f"{app_name}{TRACE_EXTENSION}")
+    return location
+
+def replay_trace(app_name, sensor_model, on_end=None):
+    """Branche le modèle de capteurs sur la trace SDV_TRACE de l'application.
+
+    Retourne le lecteur (``period_ms`` ajustée par SDV_TRACE_SPEED), ou None
+    hors rejeu. Le générateur ``random`` global est réensemencé avec la
+    graine de la trace : alertes et interventions tirées au hasard se
+    reproduisent d'une exécution à l'autre.
+    """
+    location = os.environ.get('SDV_TRACE')
+    if not location:
+        return None
+    reader = TraceReader(trace_path(app_name, location))
+    sensors = [name for name, width in reader.header['sensors']]
+    if sensors != sensor_model.sensors:
+        raise ValueError(f"{reader.path}: capteurs {sensors}, attendus {sensor_model.sensors}")
+    # Colonnes capteurs en fin d'enregistrement, après l'instant et les paramètres véhicule
+    first = reader.fields - sensor_model.columns
+    loop = os.environ.get('SDV_TRACE_LOOP', 'true') == 'true'
+    sensor_model.use_source(TraceBlockSource(reader, first, reader.fields, sensor_model.block, loop, on_end))
+    speed = float(os.environ.get('SDV_TRACE_SPEED', 1.0))
+    if speed <= 0:
+        raise ValueError("SDV_TRACE_SPEED doit être positif")
+    reader.speed = speed
+    reader.period_ms = reader.header['period_ms'] / speed
+    random.seed(reader.header.get('seed'))
+    return reader
+
+def record(apps, duration, out_dir, seed=42, change_interval=10):
+    """Enregistre une trace par application sur ``duration`` secondes de temps virtuel"""
+    from sdv_host import SIMULATORS
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.join(repo_root, 'axil'))
+    from vehicle_simulator import VehicleSimulator, STATE_CODES, PARAMETER_COLUMNS
+
+    random.seed(seed)
+    now = [0.0]
+    vehicle = VehicleSimulator(change_interval=change_interval, clock=lambda: now[0])
+    vehicle_columns = ['state'] + list(PARAMETER_COLUMNS)
+    os.makedirs(out_dir, exist_ok=True)
+
+    recorders = []
+    for index, (app_name, category) in enumerate(apps):
+        simulator = SIMULATORS[category](app_name)
+        model = simulator.sensor_model
+        model.seed = seed + index
+        period_ms = simulator.period_ms()
+        sensor_columns = [
+            name if width == 1 else f"{name}[{position}]"
+            for name, _, width in model.layout for position in range(width)
+        ]
+        header = {
+            'app': app_name,
+            'category': category,
+            'period_ms': period_ms,
+            'sensors': [[name, width] for name, _, width in model.layout],
+            'columns': vehicle_columns + sensor_columns,
+            'states': [state.value for state in STATE_CODES],
+            'seed': seed,
+            'change_interval': change_interval,
+            'created': datetime.now().isoformat(timespec='seconds')
+        }
+        overrides = [(start, VEHICLE_SENSORS[name]) for name, start, width in model.layout
+                     if name in VEHICLE_SENSORS]
+        writer = TraceWriter(os.path.join(out_dir, f"{app_name}{TRACE_EXTENSION}"), header)
+        recorders.append([period_ms / 1000, 0, model, overrides, writer])
+
+    # Échéancier en temps virtuel: véhicule chaque seconde, applications à leur période
+    heap = [(0.0, -1)] + [(0.0, index) for index in range(len(recorders))]
+    heapq.heapify(heap)
+    ticks = 0
+    while heap[0][0] < duration:
+        now[0], index = heapq.heappop(heap)
+        if index < 0:
+            # Même enchaînement que VehicleSimulator.start_simulation
+            if ticks % change_interval == 0:
+                vehicle.change_state()
+            vehicle._generate_random_event()
+            vehicle._update_continuous_parameters()
+            ticks += 1
+            heapq.heappush(heap, (float(ticks), -1))
+            continue
+        recorder = recorders[index]
+        period, ticks_app, model, overrides, writer = recorder
+        parameters = vehicle._encode_parameters()
+        row = list(model.next_row())
+        for start, parameter in overrides:
+            row[start] = float(parameters[parameter])
+        writer.write(now[0], [STATE_CODES.index(vehicle.current_state)]
+                     + [float(parameters[column]) for column in PARAMETER_COLUMNS] + row)
+        # Instants calculés depuis le rang du cycle: pas de dérive par cumul
+        recorder[1] = ticks_app + 1
+        heapq.heappush(heap, ((ticks_app + 1) * period, index))
+
+    paths = []
+    for *_, writer in recorders:
+        writer.close()
+        paths.append((writer.header['app'], writer.path, writer.records))
+    return paths
+
+def describe(path):
+    """Résumé d'une trace: en-tête, nombre d'enregistrements, occupation des états véhicule"""
+    from collections import Counter
+    reader = TraceReader(path)
+    states = Counter(row[0] for row in reader.rows(0, len(reader), 1, 2))
+    summary = {
+        **{key: reader.header[key] for key in ('app', 'category', 'period_ms', 'seed', 'created')},
+        'records': len(reader),
+        'duration_s': reader.duration(),
+        'size_bytes': os.path.getsize(path),
+        'sensors': reader.header['sensors'],
+        'states': {reader.header['states'][int(code)]: count for code, count in sorted(states.items())}
+    }
+    reader.close()
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Traces de capteurs SDV (enregistrement, résumé)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="Enregistre une trace par application")
+    record_parser.add_argument('--apps', default=os.environ.get('SDV_APPS', 'all'),
+                               help="Applications, catégories ou all (voir sdv_host.py)")
+    record_parser.add_argument('--duration', type=float, default=600, help="Durée enregistrée (s de temps virtuel)")
+    record_parser.add_argument('--seed', type=int, default=42)
+    record_parser.add_argument('--change-interval', type=int, default=10, help="Intervalle des changements d'état (s)")
+    record_parser.add_argument('--out', default='traces')
+    info_parser = commands.add_parser('info', help="Résumé d'une trace")
+    info_parser.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from sdv_host import select_apps
+        try:
+            apps = select_apps(args.apps)
+        except ValueError as e:
+            print(f"Erreur: {e}", file=sys.stderr)
+            sys.exit(2)
+        for app_name, path, records in record(apps, args.duration, args.out, args.seed, args.change_interval):
+            print(f"{app_name:<22} {records:>9} enregistrements  {path}")
+    else:
+        for path in args.paths:
+            print(json.dumps(describe(path), indent=2))
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Deployment Benchmark - SDV Testbench
+Banc de mesure reproductible baseline (manifestes statiques k8s-manifests)
+vs AXIL. Chaque mode est exécuté N fois de la même façon : nettoyage,
+déclenchement, attente des pods Ready. Les horodatages de chaque pod
+(création → ordonnancement → Running → Ready) sont relevés à la
+milliseconde à la réception des événements watch du cache informer, sans
+échantillonnage kubectl.
+
+Sorties : tables de percentiles par mode et JSON (échantillons bruts et
+résumé) pour le suivi des régressions (--compare).
+
+Usage :
+    python3 tests/deployment_benchmark.py --repetitions 5 --json bench.json
+    python3 tests/deployment_benchmark.py --compare bench.json --tolerance 0.1
+    python3 tests/deployment_benchmark.py --fake-cluster   # API en mémoire (validation du banc)
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'axil'))
+
+from kubernetes import client
+
+from api_gateway import create_api_client
+from axil_complete import AXILOrchestrator, ApplicationManager
+from cluster_cache import ClusterStateCache, is_pod_ready
+from fleet import percentile
+from manifests import ManifestRenderer
+from metrics_provider import FakeMetricsProvider
+
+logger = logging.getLogger('deployment_benchmark')
+
+PHASES = ('created', 'scheduled', 'running', 'ready')
+INTERVALS = (('created', 'scheduled'), ('scheduled', 'running'), ('running', 'ready'))
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+BASELINE_MANIFESTS = [
+    os.path.join(REPO_ROOT, 'k8s-manifests', directory)
+    for directory in ('safety-apps', 'comfort-apps', 'infotainment-apps')
+]
+DEFAULT_STATES = ('parking', 'driving', 'charging', 'emergency')
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+def is_pod_scheduled(pod):
+    """Vrai si le pod est affecté à un nœud (nodeName ou condition PodScheduled)"""
+    spec = getattr(pod, 'spec', None)
+    if spec is not None and spec.node_name:
+        return True
+    for condition in (pod.status.conditions if pod.status is not None else None) or []:
+        if condition.type == 'PodScheduled':
+            return condition.status == 'True'
+    return False
+
+class PodTimelineCache(ClusterStateCache):
+    """Cache informer qui horodate (ms) les phases de chaque pod à la
+    réception des événements watch.
+
+    ``reset_timelines`` démarre une mesure : les pods déjà présents sont
+    ignorés, seuls les pods apparus ensuite sont suivis.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timelines = {}
+        self._ignored = set()
+        self._timeline_lock = threading.Lock()
+
+    def reset_timelines(self):
+        with self._lock:
+            existing = set(self._stores['pods'])
+        with self._timeline_lock:
+            self._timelines = {}
+            self._ignored = existing
+
+    def apply_event(self, kind, event_type, obj):
+        if kind == 'pods' and event_type != 'DELETED':
+            self._stamp(obj, now_ms())
+        super().apply_event(kind, event_type, obj)
+
+    def _stamp(self, pod, timestamp):
+        key = self._key(pod)
+        with self._timeline_lock:
+            if key in self._ignored:
+                return
+            timeline = self._timelines.get(key)
+            if timeline is None:
+                timeline = self._timelines[key] = {
+                    'pod': pod.metadata.name,
+                    'app': (pod.metadata.labels or {}).get('app'),
+                    **dict.fromkeys(PHASES)
+                }
+                timeline['created'] = timestamp
+
+            # Phases franchies entre deux événements: même horodatage
+            reached = {
+                'scheduled': is_pod_scheduled(pod),
+                'running': pod.status is not None and pod.status.phase == 'Running',
+                'ready': is_pod_ready(pod)
+            }
+            for index in range(len(PHASES) - 1, 0, -1):
+                if reached[PHASES[index]]:
+                    for phase in PHASES[1:index + 1]:
+                        if timeline[phase] is None:
+                            timeline[phase] = timestamp
+                    break
+
+    def timelines(self):
+        with self._timeline_lock:
+            return [dict(timeline) for timeline in self._timelines.values()]
+
+    def ready_apps(self):
+        with self._timeline_lock:
+            return {timeline['app'] for timeline in self._timelines.values() if timeline['ready'] is not None}
+
+class DeploymentBenchmark:
+    """Exécution des modes baseline et AXIL dans les mêmes conditions.
+
+    Une répétition baseline applique tous les manifestes statiques et
+    attend que chaque application ait un pod Ready. Une répétition AXIL
+    enchaîne les états ``states`` : le premier part d'un cluster vide, les
+    suivants mesurent la transition (applications du plan sans pod Ready
+    avant le changement d'état). Avec ``fake_cluster``, l'API est simulée
+    en mémoire (simulation.py) et la baseline applique le catalogue rendu
+    par manifests.py.
+    """
+
+    def __init__(self, namespace='default', states=DEFAULT_STATES, timeout=120, tick=0.01,
+                 fake_cluster=False, warm_pool=False):
+        self.namespace = namespace
+        self.states = list(states)
+        self.timeout = timeout
+        self.tick = tick
+        self.fake_cluster = fake_cluster
+        self.warm_pool = warm_pool
+        self.catalog = ApplicationManager().apps_config
+        self.app_names = {app_config['name'] for app_config in self.catalog}
+        self.orchestrator = None
+        self._cycles = 0
+
+        if fake_cluster:
+            from simulation import FakeKubernetesApi
+            # Horloge réelle: le module time fournit time()
+            api = FakeKubernetesApi(time, seed=42)
+            self.k8s_apps = self.k8s_core = api
+            self.cache = PodTimelineCache(api, api, namespace=namespace)
+            api.attach_cache(self.cache)
+            self.on_tick = lambda: api.advance(time.time())
+            self.metrics_provider = FakeMetricsProvider(seed=42)
+        else:
+            api_client = create_api_client()
+            self.k8s_apps = client.AppsV1Api(api_client)
+            self.k8s_core = client.CoreV1Api(api_client)
+            self.cache = PodTimelineCache(self.k8s_core, self.k8s_apps, namespace=namespace)
+            self.cache.start()
+            if not self.cache.wait_for_sync(timeout=10):
+                logger.warning(" Cache cluster non synchronisé après 10s")
+            self.on_tick = None
+            self.metrics_provider = 'metrics-server'
+
+    def _wait(self, predicate, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.on_tick is not None:
+                self.on_tick()
+            if predicate():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.tick)
+
+    def _sdv_pods(self):
+        return [
+            pod for pod in self.cache.get_pods(namespace=self.namespace)
+            if (pod.metadata.labels or {}).get('app') in self.app_names
+        ]
+
+    def _ready_apps(self):
+        return {pod.metadata.labels['app'] for pod in self._sdv_pods() if is_pod_ready(pod)}
+
+    def teardown(self):
+        """Supprime les Deployments SDV (baseline et AXIL) et attend la disparition des pods"""
+        self.k8s_apps.delete_collection_namespaced_deployment(self.namespace, label_selector='category')
+        if self.orchestrator is not None and self.orchestrator.warm_pool is not None:
+            for app_name in self.app_names:
+                self.orchestrator.warm_pool.forget(f"sdv-{app_name}")
+        if not self._wait(lambda: not self._sdv_pods(), self.timeout):
+            logger.warning(f" {len(self._sdv_pods())} pods SDV encore présents après {self.timeout}s")
+
+    def _measure(self, mode, repetition, step, state, t0, expected, extra):
+        """Attend qu'un pod de chaque application attendue soit Ready et relève les horodatages"""
+        completed = self._wait(lambda: expected <= self.cache.ready_apps(), self.timeout)
+        pods = [
+            {
+                'app': timeline['app'],
+                'pod': timeline['pod'],
+                **{f"{phase}_ms": timeline[phase] - t0 if timeline[phase] is not None else None
+                   for phase in PHASES}
+            }
+            for timeline in self.cache.timelines() if timeline['app'] in expected
+        ]
+        ready = [pod['ready_ms'] for pod in pods if pod['ready_ms'] is not None]
+        if not completed:
+            logger.warning(f" {mode} #{repetition} étape {step}: "
+                           f"{len(expected - self.cache.ready_apps())} applications non Ready après {self.timeout}s")
+        return {
+            'mode': mode,
+            'repetition': repetition,
+            'step': step,
+            'state': state,
+            'expected': len(expected),
+            'all_ready_ms': max(ready) if completed and ready else None,
+            'timed_out': not completed,
+            **extra,
+            'pods': pods
+        }
+
+    def run_baseline(self, repetition):
+        self.cache.reset_timelines()
+        t0 = now_ms()
+        if self.fake_cluster:
+            renderer = ManifestRenderer(self.namespace)
+            for app_config in self.catalog:
+                manifest = renderer.render(app_config, app_config['category'])
+                self.k8s_apps.apply_namespaced_deployment(manifest.name, self.namespace, manifest.body)
+        else:
+            command = ['kubectl', 'apply']
+            for directory in BASELINE_MANIFESTS:
+                command += ['-f', directory]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.warning(f" kubectl apply: {result.stderr.strip()}")
+        apply_ms = now_ms() - t0
+
+        deployments = self.k8s_apps.list_namespaced_deployment(self.namespace, label_selector='category').items
+        expected = {(d.metadata.labels or {}).get('app') for d in deployments} & self.app_names
+        return [self._measure('baseline', repetition, 0, None, t0, expected, {'apply_ms': apply_ms})]
+
+    def _axil(self):
+        if self.orchestrator is None:
+            for name in ('axil_complete', 'placement'):
+                logging.getLogger(name).setLevel(logging.ERROR)
+            self.orchestrator = AXILOrchestrator(
+                metrics_provider=self.metrics_provider,
+                k8s_apps=self.k8s_apps,
+                k8s_core=self.k8s_core,
+                cluster_cache=self.cache,
+                namespace=self.namespace,
+                warm_pool=self.warm_pool or None
+            )
+        return self.orchestrator
+
+    def run_axil(self, repetition):
+        orchestrator = self._axil()
+        records = []
+        for step, state in enumerate(self.states):
+            ready_before = self._ready_apps()
+            self.cache.reset_timelines()
+            t0 = now_ms()
+            orchestrator.vehicle_state_manager.set_state(state)
+            self._cycles += 1
+            result = orchestrator.run_cycle(self._cycles, track_ready=False)
+            expected = set(result['app_names']) - ready_before
+            records.append(self._measure('axil', repetition, step, state, t0, expected,
+                                         {'cycle_ms': 1000 * result['duration']}))
+        return records
+
+    def run(self, modes, repetitions):
+        """Répétitions entrelacées des modes (même dérive du cluster pour chacun)"""
+        records = []
+        for repetition in range(repetitions):
+            for mode in modes:
+                self.teardown()
+                logger.info(f" {mode} #{repetition + 1}/{repetitions}")
+                records.extend(self.run_baseline(repetition) if mode == 'baseline' else self.run_axil(repetition))
+        self.teardown()
+        return records
+
+def describe(values):
+    values = sorted(values)
+    stats = {'count': len(values), 'mean': sum(values) / len(values)}
+    for q in PERCENTILES:
+        stats[f"p{round(q * 100)}"] = percentile(values, q)
+    stats['max'] = values[-1]
+    return stats
+
+def summarize(records):
+    """Percentiles par mode: phases depuis le déclenchement, intervalles entre
+    phases, délai jusqu'au dernier pod Ready, durée d'application/de cycle"""
+    summary = {}
+    for mode in sorted({record['mode'] for record in records}):
+        mode_records = [record for record in records if record['mode'] == mode]
+        pods = [pod for record in mode_records for pod in record['pods']]
+        samples = {f"{phase}_ms": [pod[f"{phase}_ms"] for pod in pods] for phase in PHASES}
+        for start, end in INTERVALS:
+            samples[f"{start}_to_{end}_ms"] = [
+                pod[f"{end}_ms"] - pod[f"{start}_ms"] for pod in pods
+                if pod[f"{start}_ms"] is not None and pod[f"{end}_ms"] is not None
+            ]
+        for key in ('all_ready_ms', 'apply_ms', 'cycle_ms'):
+            samples[key] = [record.get(key) for record in mode_records]
+
+        summary[mode] = {
+            metric: describe([value for value in values if value is not None])
+            for metric, values in samples.items()
+            if any(value is not None for value in values)
+        }
+        summary[mode]['timeouts'] = sum(record['timed_out'] for record in mode_records)
+    return summary
+
+def print_tables(summary):
+    columns = ['count'] + [f"p{round(q * 100)}" for q in PERCENTILES] + ['max']
+    for mode, metrics in summary.items():
+        print(f"\n=== {mode} (ms, {metrics['timeouts']} dépassements de délai) ===")
+        print(f"{'métrique':<28}" + ''.join(f"{column:>10}" for column in columns))
+        for metric, stats in metrics.items():
+            if metric == 'timeouts':
+                continue
+            print(f"{metric:<28}" + ''.join(
+                f"{stats[column]:>10}" if column == 'count' else f"{stats[column]:>10.1f}" for column in columns
+            ))
+
+def compare(summary, previous, tolerance=0.1, quantiles=('p50', 'p95')):
+    """Régressions par rapport à un résumé précédent: [(mode, métrique, quantile, avant, après)]"""
+    regressions = []
+    for mode, metrics in summary.items():
+        for metric, stats in metrics.items():
+            before = previous.get(mode, {}).get(metric)
+            if metric == 'timeouts' or not before:
+                continue
+            for quantile in quantiles:
+                if before[quantile] > 0 and stats[quantile] > before[quantile] * (1 + tolerance):
+                    regressions.append((mode, metric, quantile, before[quantile], stats[quantile]))
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Latence de déploiement baseline vs AXIL (horodatages watch)")
+    parser.add_argument('--modes', nargs='+', choices=('baseline', 'axil'), default=['baseline', 'axil'])
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--states', nargs='+', default=list(DEFAULT_STATES),
+                        help="Séquence d'états véhicule d'une répétition AXIL")
+    parser.add_argument('--namespace', default='default')
+    parser.add_argument('--timeout', type=float, default=120, help="Attente maximale des pods Ready (s)")
+    parser.add_argument('--warm-pool', action='store_true', help="AXIL avec pool d'attente (voir warm_pool.py)")
+    parser.add_argument('--fake-cluster', action='store_true', help="API Kubernetes en mémoire")
+    parser.add_argument('--json', help="Fichier de sortie JSON (échantillons et résumé)")
+    parser.add_argument('--compare', help="Résultats JSON précédents à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Dégradation tolérée (0.1 = +10%%)")
+    args = parser.parse_args()
+
+    try:
+        benchmark = DeploymentBenchmark(namespace=args.namespace, states=args.states, timeout=args.timeout,
+                                        fake_cluster=args.fake_cluster, warm_pool=args.warm_pool)
+    except Exception as e:
+        logger.error(f" Connexion Kubernetes impossible: {e}")
+        sys.exit(1)
+
+    records = benchmark.run(args.modes, args.repetitions)
+    summary = summarize(records)
+    print_tables(summary)
+
+    if args.json:
+        results = {
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'host': platform.node(),
+                'fake_cluster': args.fake_cluster,
+                'namespace': args.namespace,
+                'repetitions': args.repetitions,
+                'states': args.states,
+                'warm_pool': args.warm_pool
+            },
+            'summary': summary,
+            'runs': records
+        }
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRésultats exportés: {args.json}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['summary']
+        regressions = compare(summary, previous, args.tolerance)
+        for mode, metric, quantile, before, after in regressions:
+            print(f"RÉGRESSION {mode} {metric} {quantile}: {before:.1f} → {after:.1f} ms "
+                  f"(+{100 * (after / before - 1):.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"\nAucune régression au-delà de {args.tolerance:.0%}")